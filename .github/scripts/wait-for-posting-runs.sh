@@ -0,0 +1,29 @@
+#!/usr/bin/env bash
+# Wait until no older run of the posting workflows is queued or in progress.
+#
+# The posting workflows share .posting_state through the Actions cache, so
+# they must not run at the same time. Runs take turns in run ID order; unlike
+# a shared concurrency group, this never cancels a queued run.
+#
+# Needs GH_TOKEN with actions: read, GITHUB_REPOSITORY and GITHUB_RUN_ID.
+set -euo pipefail
+
+WORKFLOWS=(publish-social-media.yml drain-scheduled-posts.yml)
+STATUSES=(requested queued pending waiting in_progress)
+
+while true; do
+  OLDER_RUNS=0
+  for workflow in "${WORKFLOWS[@]}"; do
+    for status in "${STATUSES[@]}"; do
+      COUNT=$(gh api "repos/${GITHUB_REPOSITORY}/actions/workflows/${workflow}/runs?status=${status}&per_page=100" \
+        --jq "[.workflow_runs[] | select(.id < ${GITHUB_RUN_ID})] | length")
+      OLDER_RUNS=$((OLDER_RUNS + COUNT))
+    done
+  done
+
+  if [[ "$OLDER_RUNS" -eq 0 ]]; then
+    break
+  fi
+  echo "Waiting for $OLDER_RUNS older posting runs to finish..."
+  sleep 30
+done
@@ -0,0 +1,93 @@
+"""
+Benchmark rendering newsletter emails for many recipients.
+
+Compares rendering the full email for every recipient (Markdown conversion,
+template load and placeholder replacement each time) with compiling the email
+once per post and only filling in each recipient's unsubscribe URL.
+
+Usage: python scripts/benchmark_email_render.py [--recipients 10000] [--content FILE]
+
+The per-recipient render is timed on --legacy-sample recipients and
+extrapolated, since rendering all of them that way takes minutes.
+"""
+import argparse
+import time
+
+from posting.platforms.resend import ResendPlatform
+
+SAMPLE_CONTENT = """# A Sample Post
+
+Some **bold** text, a [link](https://example.com) and a list:
+
+- one
+- two
+- three
+
+```python
+def hello(name):
+    return f"Hello, {name}!"
+```
+
+| Column | Value |
+| ------ | ----- |
+| a      | 1     |
+| b      | 2     |
+"""
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark newsletter email rendering")
+    parser.add_argument("--recipients", type=int, default=10000, help="Number of recipients")
+    parser.add_argument("--legacy-sample", type=int, default=200, help="Recipients rendered the old way")
+    parser.add_argument("--content", help="Markdown file to render instead of the sample post")
+    args = parser.parse_args()
+
+    content = SAMPLE_CONTENT
+    if args.content:
+        with open(args.content, "r", encoding="utf-8") as f:
+            content = f.read()
+
+    blog_data = {
+        "title": "A Sample Post",
+        "publish_date": "2024-01-01",
+        "category": "",
+        "page_name_without_date": "a-sample-post",
+    }
+    base_url = "https://example.functions.supabase.co/email_subscriptions/unsubscribe"
+    recipient_ids = [f"{i:08d}-0000-0000-0000-000000000000" for i in range(args.recipients)]
+
+    # Full render for every recipient
+    sample = recipient_ids[: min(args.legacy_sample, args.recipients)]
+    start = time.perf_counter()
+    for recipient_id in sample:
+        ResendPlatform.compile_html_email(
+            blog_data["title"], content, "markdown", blog_data
+        ).render(f"{base_url}?id={recipient_id}")
+    legacy_per_recipient = (time.perf_counter() - start) / max(len(sample), 1)
+
+    # Compile once, then fill in the unsubscribe URL
+    start = time.perf_counter()
+    template = ResendPlatform.compile_html_email(
+        blog_data["title"], content, "markdown", blog_data
+    )
+    compile_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for recipient_id in recipient_ids:
+        template.render(f"{base_url}?id={recipient_id}")
+    render_seconds = time.perf_counter() - start
+
+    legacy_total = legacy_per_recipient * args.recipients
+    compiled_total = compile_seconds + render_seconds
+    print(f"Recipients:             {args.recipients}")
+    print(f"Render per recipient:   {legacy_total:.3f}s "
+          f"({legacy_per_recipient * 1e6:.0f} µs each, from {len(sample)} samples)")
+    print(f"Compile once + fill in: {compiled_total:.3f}s "
+          f"(compile {compile_seconds * 1e3:.1f} ms, "
+          f"{render_seconds / max(args.recipients, 1) * 1e6:.1f} µs per recipient)")
+    if compiled_total > 0:
+        print(f"Speedup:                {legacy_total / compiled_total:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from openai import OpenAI
 
 # Import the SocialMediaPoster to get available platforms
 from posting import SocialMediaPoster
+from posting.transport import get_transport
 
 # Import the ImageGenerator for automatic image generation
 from image_generation import ImageGenerator
@@ -15,7 +16,7 @@ api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
     raise ValueError("OPENAI_API_KEY environment variable is not set")
 
-client = OpenAI(api_key=api_key)
+client = OpenAI(api_key=api_key, http_client=get_transport().client())
 
 def extract_markdown_content(filepath):
     """
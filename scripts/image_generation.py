@@ -1,11 +1,16 @@
 import openai
-import requests
 import os
 import json
 import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+from posting.post_index import get_post_index
+from posting.transport import get_transport
+
 class ImageGenerator:
     def __init__(self):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -13,6 +18,13 @@ class ImageGenerator:
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
         openai.api_key = self.openai_api_key
+        # One client and one HTTP session shared by every version processed in
+        # this run, both on the shared connection pools
+        self.client = openai.OpenAI(
+            api_key=self.openai_api_key, http_client=get_transport().client()
+        )
+        self.session = get_transport().session()
+        self.post_index = get_post_index()
         self.model = "dall-e-3"
         self.size = "1024x1024"
         self.quality = "standard"
@@ -47,7 +59,7 @@ class ImageGenerator:
 
 Based on the guidelines provided in the system message, create a detailed media_prompt for image generation that combines insights from both the full blog post and social media content."""
 
-            response = openai.chat.completions.create(
+            response = self.client.chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": system_message},
@@ -104,7 +116,7 @@ Based on the guidelines provided in the system message, create a detailed media_
     def generate_image(self, prompt, output_path):
         """Generate an image from a prompt and save it"""
         try:
-            response = openai.images.generate(
+            response = self.client.images.generate(
                 model=self.model,
                 prompt=prompt,
                 size=self.size,
@@ -114,7 +126,7 @@ Based on the guidelines provided in the system message, create a detailed media_
             image_url = response.data[0].url
             
             # Download and save the image
-            image_data = requests.get(image_url).content
+            image_data = self.session.get(image_url, timeout=60).content
             
             # Ensure the directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -144,15 +156,12 @@ Based on the guidelines provided in the system message, create a detailed media_
         
         # Extract post name from path to find the corresponding blog post
         post_name = version_path.parts[-3]  # e.g., "2019-06-15-visit-a-tea-shop-to-gift-feedback"
-        blog_post_path = Path("_posts") / f"{post_name}.md"
         
-        # Read full blog post content
-        full_post_content = ""
-        if blog_post_path.exists():
-            with open(blog_post_path, 'r', encoding='utf-8') as f:
-                full_post_content = f.read()
-        else:
-            print(f"Warning: Blog post not found at {blog_post_path}")
+        # Read full blog post content; versions of the same post share one read
+        full_post_content = self.post_index.read(post_name)
+        if full_post_content is None:
+            full_post_content = ""
+            print(f"Warning: Blog post not found at {self.post_index.posts_dir / f'{post_name}.md'}")
         
         # Extract platform from path
         platform = version_path.parts[-2]  # e.g., "Resend", "X", "LinkedIn"
@@ -241,40 +250,144 @@ Based on the guidelines provided in the system message, create a detailed media_
         
         print(f"\nProcessed {processed_count} versions total")
     
+    def process_versions(self, version_paths, regenerate_mode=False, max_workers=4):
+        """
+        Process many version directories in this process with a bounded worker pool.
+
+        Args:
+            version_paths: Iterable of version directory paths
+            regenerate_mode: Reuse existing media prompts instead of generating new ones
+            max_workers: Maximum number of directories processed concurrently
+
+        Returns:
+            Dict summary with per-directory status and timings
+        """
+        # Preserve input order but drop blanks and duplicates
+        paths = list(dict.fromkeys(str(p).strip() for p in version_paths if str(p).strip()))
+
+        def run(path):
+            started = time.monotonic()
+            try:
+                ok = self.process_social_media_version(path, regenerate_mode)
+                error = None if ok else "processing failed"
+            except Exception as e:
+                ok = False
+                error = str(e)
+            entry = {
+                "path": path,
+                "status": "success" if ok else "error",
+                "duration_seconds": round(time.monotonic() - started, 3),
+            }
+            if error:
+                entry["error"] = error
+            return entry
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = list(executor.map(run, paths))
+
+        success_count = sum(1 for r in results if r["status"] == "success")
+        return {
+            "total": len(results),
+            "success": success_count,
+            "failed": len(results) - success_count,
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "results": results,
+        }
+
     def regenerate_for_changed_prompts(self, base_path="social_media"):
         """Regenerate images for versions where prompts have changed"""
         # This would typically be called by a git hook or CI/CD pipeline
         # For now, it processes all versions
         self.process_all_versions(base_path, regenerate_mode=True)
 
+def read_batch_paths(args):
+    """
+    Collect version paths for batch mode from arguments, a file or stdin.
+
+    Args:
+        args: Positional arguments following --batch; "-" reads from stdin
+
+    Returns:
+        List of version paths
+    """
+    paths = []
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg == "--from-file" and args:
+            with open(args.pop(0), 'r', encoding='utf-8') as f:
+                paths.extend(line.strip() for line in f)
+        elif arg == "-":
+            paths.extend(line.strip() for line in sys.stdin)
+        else:
+            paths.append(arg)
+    return [p for p in paths if p]
+
+def print_usage():
+    """Print the command line usage"""
+    print("Usage:")
+    print("  python image_generation.py <version_path>")
+    print("  python image_generation.py <version_path> --regenerate")
+    print("  python image_generation.py --all")
+    print("  python image_generation.py --batch [--regenerate] [--workers N] [--summary FILE] [--from-file FILE | - | <version_path> ...]")
+    print("")
+    print("Examples:")
+    print("  python image_generation.py social_media/2019-06-15-visit-a-tea-shop-to-gift-feedback/Resend/v1")
+    print("  python image_generation.py social_media/2019-06-15-visit-a-tea-shop-to-gift-feedback/Resend/v1 --regenerate")
+    print("  python image_generation.py --all")
+    print("  git diff --name-only | xargs -n1 dirname | python image_generation.py --batch --regenerate -")
+
 def main():
     """Main function to run the image generator"""
-    import sys
-    
     try:
-        generator = ImageGenerator()
-        
         if len(sys.argv) < 2:
-            print("Usage:")
-            print("  python image_generation.py <version_path>")
-            print("  python image_generation.py <version_path> --regenerate")
-            print("  python image_generation.py --all")
-            print("")
-            print("Examples:")
-            print("  python image_generation.py social_media/2019-06-15-visit-a-tea-shop-to-gift-feedback/Resend/v1")
-            print("  python image_generation.py social_media/2019-06-15-visit-a-tea-shop-to-gift-feedback/Resend/v1 --regenerate")
-            print("  python image_generation.py --all")
+            print_usage()
             return
-        
+
+        args = sys.argv[1:]
+
         # Check for regenerate flag
-        regenerate_mode = "--regenerate" in sys.argv
-        
-        if sys.argv[1] == "--all":
+        regenerate_mode = "--regenerate" in args
+        args = [a for a in args if a != "--regenerate"]
+        if not args:
+            print_usage()
+            return
+
+        generator = ImageGenerator()
+
+        if args[0] == "--batch":
+            # Process many version directories in one process
+            args = args[1:]
+            max_workers = 4
+            summary_path = None
+            if "--workers" in args:
+                index = args.index("--workers")
+                max_workers = int(args[index + 1])
+                del args[index:index + 2]
+            if "--summary" in args:
+                index = args.index("--summary")
+                summary_path = args[index + 1]
+                del args[index:index + 2]
+
+            summary = generator.process_versions(
+                read_batch_paths(args), regenerate_mode, max_workers
+            )
+            summary_json = json.dumps(summary, indent=2)
+            if summary_path:
+                with open(summary_path, 'w', encoding='utf-8') as f:
+                    f.write(summary_json)
+            print(summary_json)
+            get_transport().report_metrics()
+
+            if summary["failed"]:
+                sys.exit(1)
+        elif args[0] == "--all":
             # Process all existing social media versions
             generator.process_all_versions(regenerate_mode=regenerate_mode)
         else:
             # Process single version
-            version_path = sys.argv[1]
+            version_path = args[0]
             if generator.process_social_media_version(version_path, regenerate_mode):
                 print(f"✓ Successfully processed {version_path}")
             else:
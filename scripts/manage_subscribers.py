@@ -5,18 +5,27 @@ Script to manage email subscribers for the blog.
 import os
 import sys
 import argparse
+import time
 from typing import List, Dict, Any
 
 # Add the parent directory to the path so we can import the modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from scripts.posting.email_subscribers import EmailSubscriberManager
+from scripts.posting.subscriber_cache import SubscriberCache
+from scripts.posting.email_campaigns import CampaignLedger
 
-def list_subscribers(manager: EmailSubscriberManager, args: argparse.Namespace) -> None:
+def list_subscribers(cache: SubscriberCache, args: argparse.Namespace) -> None:
     """List all subscribers."""
     if args.all:
-        subscribers = manager.get_all_subscribers()
+        # The cache only downloads active subscribers
+        subscribers = cache.manager.get_all_subscribers()
     else:
-        subscribers = manager.get_active_subscribers()
+        try:
+            # Only changes since the last run are downloaded
+            cache.sync()
+            subscribers = cache.get_subscribers()
+        except Exception as e:
+            print(f"Error fetching subscribers from Supabase: {str(e)}")
+            subscribers = []
     
     if not subscribers:
         print("No subscribers found.")
@@ -30,6 +39,44 @@ def list_subscribers(manager: EmailSubscriberManager, args: argparse.Namespace)
         print(f"{i}. {email} ({status})")
     print("-" * 50)
 
+def list_campaigns(ledger: CampaignLedger, args: argparse.Namespace) -> None:
+    """List email campaigns with their recipient counts."""
+    campaigns = ledger.campaigns(page_name=args.page)
+    
+    if not campaigns:
+        print("No campaigns found.")
+        return
+    
+    print(f"Found {len(campaigns)} campaigns:")
+    print("-" * 50)
+    for campaign in campaigns:
+        created = time.strftime("%Y-%m-%d %H:%M", time.localtime(campaign["created_at"]))
+        print(f"{campaign['campaign_id']} ({created})")
+        print(f"   {campaign['subject']}")
+        print(f"   Sent: {campaign['sent']}, Failed: {campaign['failed']}, Skipped: {campaign['skipped']}")
+    print("-" * 50)
+
+def show_campaign(ledger: CampaignLedger, args: argparse.Namespace) -> None:
+    """Show the recipients of a campaign, or the campaigns sent to an email."""
+    recipients = ledger.recipients(
+        campaign_id=args.campaign_id, status=args.status, email=args.email
+    )
+    
+    if not recipients:
+        print("No recipients found.")
+        return
+    
+    print(f"Found {len(recipients)} recipients:")
+    print("-" * 50)
+    for i, recipient in enumerate(recipients, 1):
+        detail = recipient["message_id"] or recipient["error"] or ""
+        # The ledger only keeps a hash of each address
+        line = f"{i}. {recipient['subscriber_id']} ({recipient['status']}) {detail}"
+        if not args.campaign_id:
+            line += f" [{recipient['campaign_id']}]"
+        print(line)
+    print("-" * 50)
+
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description="Manage email subscribers for the blog")
@@ -39,14 +86,28 @@ def main():
     list_parser = subparsers.add_parser("list", help="List subscribers")
     list_parser.add_argument("--all", action="store_true", help="Include inactive subscribers")
     
-    args = parser.parse_args()
+    # List email campaigns
+    campaigns_parser = subparsers.add_parser("campaigns", help="List email campaigns")
+    campaigns_parser.add_argument("--page", help="Only list campaigns of this page")
+    
+    # Show the recipients of a campaign
+    campaign_parser = subparsers.add_parser("campaign", help="Show campaign recipients")
+    campaign_parser.add_argument("campaign_id", nargs="?", help="Campaign ID from the campaigns command")
+    campaign_parser.add_argument("--status", choices=["sent", "failed", "skipped"], help="Only show recipients with this status")
+    campaign_parser.add_argument("--email", help="Only show this email address")
     
-    # Initialize subscriber manager
-    manager = EmailSubscriberManager()
+    args = parser.parse_args()
     
     # Execute command
     if args.command == "list":
-        list_subscribers(manager, args)
+        # Initialize the local subscriber cache
+        list_subscribers(SubscriberCache(), args)
+    elif args.command == "campaigns":
+        list_campaigns(CampaignLedger(), args)
+    elif args.command == "campaign":
+        if not args.campaign_id and not args.email:
+            campaign_parser.error("give a campaign ID or --email")
+        show_campaign(CampaignLedger(), args)
     else:
         parser.print_help()
 
@@ -2,91 +2,140 @@
 Post content to social media platforms.
 
 This script posts content from the social_media directory to social media platforms.
-It can be run in two modes:
+It can be run in four modes:
 1. Post content from a specific folder: python post_social_media.py social_media/folder_name
-2. Post content from all folders: python post_social_media.py social_media
+2. Post content from several folders: python post_social_media.py social_media/a social_media/b
+3. Post content from all pending folders: python post_social_media.py social_media
+4. Finish jobs left in the outbox by an interrupted run: python post_social_media.py --resume
+
+With --schedule, folders are not posted right away: each platform is given a
+publish time inside its posting windows (config/schedule.json). Running with
+--drain publishes every scheduled post that is due, e.g. from a cron job.
+
+Folders are processed concurrently (--workers, default 4) and share per-platform
+rate limits. The results file can be given with --output, or as a trailing
+*.json argument for compatibility with older invocations.
 
 The script automatically detects the platforms from the subfolders in each folder.
 """
 import os
 import sys
+import time
+import argparse
 from pathlib import Path
+from typing import List
 
 from posting import SocialMediaPoster
+from posting.scheduler import PublishScheduler
+from posting.transport import get_transport
 
 
-def post_content(folder_path: str, output_path: str = "posting_results.json") -> None:
+def post_content(
+    folder_paths: List[str],
+    output_path: str = "posting_results.json",
+    max_workers: int = 4,
+    resume: bool = False,
+    schedule: bool = False,
+    drain: bool = False,
+) -> None:
     """
-    Post content from a folder or all folders to social media platforms.
-    
+    Post content from folders or all pending folders to social media platforms.
+
     Args:
-        folder_path: Path to the folder containing platform folders or the base directory
+        folder_paths: Paths to page folders, or the social_media base directory
         output_path: Path to save the posting results
+        max_workers: Maximum number of folders processed concurrently
+        resume: First finish publish jobs left outstanding by earlier runs
+        schedule: Schedule the folders for later instead of posting them now
+        drain: Publish scheduled posts that are due
     """
-    folder_path = Path(folder_path)
-    
+    if isinstance(folder_paths, (str, Path)):
+        folder_paths = [folder_paths]
+
     # Create poster
     poster = SocialMediaPoster(output_path)
-    
-    # Check if folder is the social_media directory (post from all folders)
-    if folder_path.name == "social_media":
-        # Get all page folders
-        page_folders = [p for p in folder_path.iterdir() if p.is_dir()]
-        
-        # Post from each folder
-        all_results = []
-        for folder in page_folders:
-            # Handle folder names with spaces by using the string representation
-            folder_str = str(folder)
-            print(f"\nProcessing folder: {folder_str}")
-            results = poster.post_from_folder(folder_str)
-            all_results.extend(results)
-        
-        # Print summary
-        if all_results:
-            success_count = sum(1 for r in all_results if r.get("status") == "success")
-            print(f"\n✅ Posted {success_count}/{len(all_results)} items")
-            print(f"✅ Results saved to {output_path}")
+
+    # Finish interrupted work before starting anything new
+    if resume:
+        poster.resume_outbox(max_workers)
+
+    page_folders = []
+    for folder_path in map(Path, folder_paths):
+        # Check if folder is the social_media directory (post from all pending folders)
+        if folder_path.name == "social_media":
+            pending = poster.find_pending_folders(str(folder_path))
+            print(f"Found {len(pending)} pending folders in {folder_path}")
+            page_folders.extend(pending)
+        else:
+            page_folders.append(folder_path)
+
+    if schedule or drain:
+        scheduler = PublishScheduler()
+
+        # Handle folder names with spaces by using the string representation
+        for folder in page_folders if schedule else []:
+            publish_times = scheduler.schedule(str(folder), poster.folder_platforms(str(folder)))
+            for platform, publish_at in publish_times.items():
+                when = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(publish_at))
+                print(f"🗓️  Scheduled {folder.name} on {platform} for {when}")
+
+        if drain:
+            scheduler.drain(poster, max_workers)
     else:
-        # Post from specific folder
         # Handle folder names with spaces by using the string representation
-        folder_str = str(folder_path)
-        print(f"\nProcessing folder: {folder_str}")
-        results = poster.post_from_folder(folder_str)
-        
-        # Print summary
-        if results:
-            success_count = sum(1 for r in results if r.get("status") == "success")
-            print(f"\n✅ Posted {success_count}/{len(results)} items")
-            print(f"✅ Results saved to {output_path}")
+        poster.post_from_folders([str(folder) for folder in page_folders], max_workers)
+
+    # Write the JSON views of the results log
+    results = poster.save_results()
+
+    # Print summary
+    if results:
+        success_count = sum(1 for r in results if r.get("status") == "success")
+        print(f"\n✅ Posted {success_count}/{len(results)} items")
+        print(f"✅ Results saved to {output_path}")
+
+    # Report how often API calls reused pooled connections
+    get_transport().report_metrics()
 
 
 def main():
     """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python post_social_media.py <folder_path> [output_file]")
-        sys.exit(1)
-    
-    # Get folder path
-    folder_path = sys.argv[1]
-    
-    # Default output file
-    output_file = "posting_results.json"
-    if len(sys.argv) > 2:
-        output_file = sys.argv[2]
-    
-    # Check if folder exists
-    if not os.path.exists(folder_path):
-        print(f"Folder not found: {folder_path}")
-        sys.exit(1)
-    
-    # Check if folder is a directory
-    if not os.path.isdir(folder_path):
-        print(f"Not a directory: {folder_path}")
+    parser = argparse.ArgumentParser(description="Post content to social media platforms")
+    parser.add_argument("folders", nargs="*", help="Page folders or the social_media directory")
+    parser.add_argument("--output", default=None, help="Path to save the posting results")
+    parser.add_argument("--workers", type=int, default=4, help="Folders processed concurrently")
+    parser.add_argument("--resume", action="store_true", help="Finish outstanding outbox jobs first")
+    parser.add_argument("--schedule", action="store_true", help="Schedule folders instead of posting now")
+    parser.add_argument("--drain", action="store_true", help="Publish scheduled posts that are due")
+    args = parser.parse_args()
+
+    if not args.folders and not (args.resume or args.drain):
+        parser.print_usage()
         sys.exit(1)
-    
+
+    folder_paths = args.folders
+
+    # Default output file, also accepted as a trailing positional argument
+    output_file = args.output or "posting_results.json"
+    if len(folder_paths) > 1 and folder_paths[-1].endswith(".json"):
+        output_file = args.output or folder_paths[-1]
+        folder_paths = folder_paths[:-1]
+
+    for folder_path in folder_paths:
+        # Check if folder exists
+        if not os.path.exists(folder_path):
+            print(f"Folder not found: {folder_path}")
+            sys.exit(1)
+
+        # Check if folder is a directory
+        if not os.path.isdir(folder_path):
+            print(f"Not a directory: {folder_path}")
+            sys.exit(1)
+
     # Post content
-    post_content(folder_path, output_file)
+    post_content(
+        folder_paths, output_file, args.workers, args.resume, args.schedule, args.drain
+    )
 
 
 if __name__ == "__main__":
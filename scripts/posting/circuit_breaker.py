@@ -0,0 +1,149 @@
+"""
+Circuit breakers for platform outages.
+
+After a run of consecutive failures a platform's breaker opens and further
+publishes are deferred straight away instead of waiting on requests that are
+bound to fail. Once the recovery timeout passes, the breaker lets a trial
+request through (half-open) and closes again if it succeeds.
+
+Thresholds are configured in config/circuit_breakers.json (or the file named
+by CIRCUIT_BREAKER_CONFIG).
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_CONFIG_PATH = os.path.join("config", "circuit_breakers.json")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_config: Optional[Dict[str, Any]] = None
+_config_lock = threading.Lock()
+
+
+def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load the circuit breaker configuration file once per process.
+
+    Args:
+        config_path: Path to the JSON config file
+
+    Returns:
+        Configuration dict, empty if the file does not exist
+    """
+    global _config
+    with _config_lock:
+        if _config is None or config_path:
+            config_path = config_path or os.getenv(
+                "CIRCUIT_BREAKER_CONFIG", DEFAULT_CONFIG_PATH
+            )
+            _config = {}
+            if os.path.exists(config_path):
+                try:
+                    with open(config_path, "r", encoding="utf-8") as f:
+                        _config = json.load(f)
+                except Exception as e:
+                    print(
+                        f"Warning: Could not load circuit breaker config '{config_path}': {str(e)}"
+                    )
+        return _config
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for one platform."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 300.0,
+        half_open_max_calls: int = 1,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Name of the platform
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds the circuit stays open before a trial call
+            half_open_max_calls: Trial calls allowed while half-open
+        """
+        self.name = name
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.recovery_timeout = float(recovery_timeout)
+        self.half_open_max_calls = max(int(half_open_max_calls), 1)
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_platform(cls, name: str) -> "CircuitBreaker":
+        """
+        Create a breaker with the configured thresholds for a platform.
+
+        Args:
+            name: Name of the platform
+
+        Returns:
+            The circuit breaker
+        """
+        config = load_config()
+        settings = config.get("platforms", {}).get(name) or config.get("default") or {}
+        return cls(name, **settings)
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be made now.
+
+        Returns:
+            True if the circuit is closed or has a half-open trial slot free
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self.half_open_calls = 0
+                print(f"🔌 {self.name} circuit half-open, trying a request")
+
+            if self.state == HALF_OPEN:
+                if self.half_open_calls >= self.half_open_max_calls:
+                    return False
+                self.half_open_calls += 1
+
+            return True
+
+    def record_success(self):
+        """Record a successful request, closing the circuit."""
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"🔌 {self.name} circuit closed")
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """Record a failed request, opening the circuit past the threshold."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(
+                        f"🔌 {self.name} circuit open after {self.failures} failures, "
+                        f"deferring requests for {self.recovery_timeout:.0f}s"
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        """Return the number of seconds until the circuit allows a trial request."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(self.recovery_timeout - (time.monotonic() - self.opened_at), 0.0)
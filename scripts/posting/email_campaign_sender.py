@@ -0,0 +1,863 @@
+"""
+Sending a post's email to every subscriber as a campaign.
+
+A campaign's recipients are queued in outbox batches of subscriber IDs as
+they stream in, and the batches are sent concurrently (from threads, an
+event loop, or one worker process per shard) under the Resend rate limits.
+Every recipient's outcome is recorded in the campaign ledger as its batch
+returns, so a resumed or repeated publish only sends what is left.
+ResendPlatform renders the email and hands it to EmailCampaignSender.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from .email_campaigns import CampaignLedger, SENT, FAILED, SKIPPED, redact_emails
+from .outbox import Outbox, DONE, LEASED, PENDING, FAILED as FAILED_JOB
+from .platforms.resend_batch import ResendBatchSender, MAX_BATCH_SIZE, idempotency_key
+from .rate_limit import RateLimiter, get_rate_limiter
+from .subscriber_cache import SubscriberCache
+from .transport import get_transport
+
+# Number of recipients per outbox job, sent with one batch request
+EMAIL_BATCH_SIZE = MAX_BATCH_SIZE
+
+# Batches in flight at once
+EMAIL_SEND_WORKERS = 4
+
+# Batches in flight at once when sending from an event loop
+EMAIL_ASYNC_BATCHES_IN_FLIGHT = 32
+
+
+# A campaign can be split into shards (EMAIL_SHARDS) by a hash of the
+# subscriber ID. Each shard is sent by its own worker process, and the
+# workers share one budget of the Resend rate limits.
+MAX_EMAIL_SHARDS = 32
+
+
+def shard_of(subscriber_id: str, shards: int) -> int:
+    """
+    Get the shard a subscriber is sent from.
+
+    Args:
+        subscriber_id: ID of the subscriber
+        shards: Number of shards
+
+    Returns:
+        Shard index from 0 to shards - 1
+    """
+    digest = hashlib.sha256(str(subscriber_id).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shards
+
+
+def shard_group(campaign_key: str, shard: int, shards: int) -> str:
+    """
+    Get the outbox group holding a shard's batches.
+
+    Args:
+        campaign_key: Key of the campaign in the outbox
+        shard: Shard index
+        shards: Number of shards
+
+    Returns:
+        The group key; the campaign key itself when there is one shard
+    """
+    return campaign_key if shards == 1 else f"{campaign_key}/shard-{shard}"
+
+
+def _init_shard_worker(buckets: Dict[Tuple[str, str], Any]):
+    """
+    Set up a shard worker process to draw from the coordinator's rate budget.
+
+    Args:
+        buckets: Process-shared token buckets from RateLimiter.shared_buckets
+    """
+    get_rate_limiter().use_buckets(buckets)
+
+
+def _send_shard(
+    campaign_key: str,
+    campaign_id: str,
+    shard: int,
+    shards: int,
+    wait_for_queue: bool,
+    email: Dict[str, Any],
+) -> int:
+    """
+    Send one shard of a campaign. Runs in a worker process.
+
+    Args:
+        campaign_key: Key of the campaign in the outbox
+        campaign_id: ID of the campaign in the campaign ledger
+        shard: Shard index
+        shards: Number of shards
+        wait_for_queue: Keep waiting for batches until the campaign is queued
+        email: Keyword arguments for EmailCampaignSender._send_batch
+
+    Returns:
+        Number of emails sent
+    """
+    # Imported here since the platform imports this module; creating it sets
+    # up the Resend SDK in this process
+    from .platforms.resend import ResendPlatform
+
+    sender = ResendPlatform().campaign_sender
+
+    def queue_done() -> bool:
+        if not wait_for_queue:
+            return True
+        campaign = sender.outbox.jobs("email_campaign", campaign_key)
+        return not campaign or campaign[0]["status"] != LEASED
+
+    return sender._send_queued(
+        shard_group(campaign_key, shard, shards), campaign_id, queue_done, email
+    )
+
+
+class EmailCampaignSender:
+    """Queues and sends email campaigns through the outbox."""
+
+    def __init__(
+        self,
+        batch_sender: ResendBatchSender,
+        rate_limiter: RateLimiter,
+        platform_name: str = "Resend",
+        subscriber_cache: Optional[SubscriberCache] = None,
+        outbox: Optional[Outbox] = None,
+        campaigns: Optional[CampaignLedger] = None,
+    ):
+        """
+        Initialize the sender.
+
+        Args:
+            batch_sender: Sender of Resend requests, under the platform's rate limits
+            rate_limiter: Rate limiter holding the platform's buckets
+            platform_name: Name of the platform in the rate limit config
+            subscriber_cache: Cache of the subscribers to send to
+            outbox: Outbox holding the campaign and batch jobs
+            campaigns: Ledger of each recipient's outcome
+        """
+        self.batch_sender = batch_sender
+        self.rate_limiter = rate_limiter
+        self.platform_name = platform_name
+        self.subscriber_cache = subscriber_cache or SubscriberCache()
+        self.outbox = outbox or Outbox()
+        self.campaigns = campaigns or CampaignLedger()
+
+    def start(
+        self,
+        campaign_id: str,
+        page_name: str,
+        version: str,
+        content_hash: str,
+        email: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Record a campaign and start queueing its recipients.
+
+        Batches are queued as subscriber pages arrive, so sending can start
+        with the first one. A campaign already queued by an earlier run is
+        resumed; only its unfinished batches are sent.
+
+        Args:
+            campaign_id: ID of the campaign, from CampaignLedger.campaign_id
+            page_name: The name of the page
+            version: Version folder of the post, or ""
+            content_hash: Hash of the email's subject, content and media
+            email: Keyword arguments for _send_batch
+
+        Returns:
+            Dict with the campaign's ledger "id", outbox "key", number of
+            "shards", the "queueing" thread (or None) and the "email"
+        """
+        self.campaigns.start(campaign_id, page_name, version, content_hash, email["subject"])
+        campaign_key = f"Resend/{campaign_id}"
+        queueing = self._queue_recipients(campaign_key, campaign_id, self._email_shards())
+        return {
+            "id": campaign_id,
+            "key": campaign_key,
+            "shards": self._campaign_shards(campaign_key),
+            "queueing": queueing,
+            "email": email,
+        }
+
+    def send(self, campaign: Dict[str, Any]) -> int:
+        """
+        Send a started campaign's batches until none are left.
+
+        Args:
+            campaign: The campaign from start()
+
+        Returns:
+            Number of emails sent by this call
+        """
+        queueing = campaign["queueing"]
+        if campaign["shards"] == 1:
+            sent = self._send_queued(
+                campaign["key"],
+                campaign["id"],
+                lambda: queueing is None or not queueing.is_alive(),
+                campaign["email"],
+            )
+        else:
+            sent = self._send_sharded(
+                campaign["key"],
+                campaign["id"],
+                campaign["shards"],
+                queueing is not None,
+                campaign["email"],
+            )
+        if queueing is not None:
+            queueing.join()
+        return sent
+
+    async def send_async(self, campaign: Dict[str, Any]) -> int:
+        """
+        Send a started campaign's batches from an event loop until none are left.
+
+        Batches are sent with an async HTTP client, many at a time. Sharded
+        campaigns are still sent by worker processes.
+
+        Args:
+            campaign: The campaign from start()
+
+        Returns:
+            Number of emails sent by this call
+        """
+        queueing = campaign["queueing"]
+        if campaign["shards"] == 1:
+            sent = await self._send_queued_async(
+                campaign["key"],
+                campaign["id"],
+                lambda: queueing is None or not queueing.is_alive(),
+                campaign["email"],
+            )
+        else:
+            sent = await asyncio.to_thread(
+                self._send_sharded,
+                campaign["key"],
+                campaign["id"],
+                campaign["shards"],
+                queueing is not None,
+                campaign["email"],
+            )
+        if queueing is not None:
+            await asyncio.to_thread(queueing.join)
+        return sent
+
+    def status(self, campaign: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check how far a campaign has been sent.
+
+        Args:
+            campaign: The campaign from start()
+
+        Returns:
+            Dict with the number of batches still "leased" by a worker and
+            "pending" a retry, the seconds until one is "ready_in", the
+            number of "recipients" queued, and the campaign's counts of
+            sent, failed and skipped recipients across all runs
+
+        Raises:
+            ValueError: If the subscriber list could not be fetched, or
+                batches used up their retries
+        """
+        # A failed subscriber fetch fails the publish, so it is retried
+        # and the rest of the list is queued then
+        marker = self.outbox.jobs("email_campaign", campaign["key"])[0]
+        if marker["status"] not in (DONE, LEASED):
+            raise ValueError(
+                f"Could not fetch all subscribers: {marker['error']}"
+            )
+
+        # Recipients still being queued, or batches leased by another
+        # (possibly dead) worker or waiting to be retried, are not finished
+        groups = [
+            shard_group(campaign["key"], shard, campaign["shards"])
+            for shard in range(campaign["shards"])
+        ]
+        unfinished = self.outbox.outstanding("email_batch", groups)
+        if marker["status"] == LEASED:
+            unfinished[LEASED] += 1
+            unfinished["ready_in"] = max(
+                unfinished["ready_in"], (marker["lease_expires"] or 0) - time.time()
+            )
+        status = {
+            "leased": unfinished[LEASED],
+            "pending": unfinished[PENDING],
+            "ready_in": unfinished["ready_in"],
+            "recipients": (marker["result"] or {}).get("recipients", 0),
+            **self.campaigns.status_counts(campaign["id"]),
+        }
+        if status["leased"] or status["pending"]:
+            return status
+
+        # Batches that used up their retries fail the publish; retrying it
+        # returns them to the queue
+        failed_batches = sum(
+            1
+            for group in groups
+            for job in self.outbox.jobs("email_batch", group)
+            if job["status"] == FAILED_JOB
+        )
+        if failed_batches:
+            raise ValueError(
+                f"{failed_batches} batches could not be sent after retries "
+                f"(sent to {status[SENT]} subscribers so far)"
+            )
+        return status
+
+    def _email_shards(self) -> int:
+        """
+        Read the number of shards to split campaigns into from EMAIL_SHARDS.
+
+        Returns:
+            Number of shards, 1 when unset or invalid
+        """
+        value = os.getenv("EMAIL_SHARDS") or "1"
+        try:
+            shards = int(value)
+        except ValueError:
+            print(f"WARNING: Invalid EMAIL_SHARDS '{value}', sending from one process")
+            return 1
+        return min(max(shards, 1), MAX_EMAIL_SHARDS)
+
+    def _campaign_shards(self, campaign_key: str) -> int:
+        """
+        Get the number of shards a campaign was queued with.
+
+        A resumed campaign keeps its shard count even if EMAIL_SHARDS changed,
+        since its batches are already in the outbox groups of those shards.
+
+        Args:
+            campaign_key: Key of the campaign in the outbox
+
+        Returns:
+            Number of shards
+        """
+        campaign = self.outbox.jobs("email_campaign", campaign_key)
+        return campaign[0]["payload"].get("shards", 1) if campaign else 1
+
+    def _send_queued(
+        self,
+        group_key: str,
+        campaign_id: str,
+        queue_done: Callable[[], bool],
+        email: Dict[str, Any],
+    ) -> int:
+        """
+        Send the batches of an outbox group until none are left.
+
+        Leased batches are sent concurrently; the rate limiter paces the requests.
+
+        Args:
+            group_key: Outbox group of the batches
+            campaign_id: ID of the campaign in the campaign ledger
+            queue_done: Returns True once no more batches will be queued
+            email: Keyword arguments for _send_batch
+
+        Returns:
+            Number of emails sent
+        """
+        sent = 0
+        with ThreadPoolExecutor(max_workers=EMAIL_SEND_WORKERS) as executor:
+            while True:
+                # Checked before leasing, so batches queued last are not missed
+                done = queue_done()
+                jobs = self.outbox.lease("email_batch", group_key, limit=EMAIL_SEND_WORKERS)
+                if not jobs:
+                    # Failed batches are retried once their backoff is over
+                    if done and not self.outbox.outstanding("email_batch", [group_key])[PENDING]:
+                        return sent
+                    time.sleep(0.1)
+                    continue
+
+                futures = [
+                    executor.submit(
+                        self._send_batch, campaign_id, job["payload"]["recipients"], **email
+                    )
+                    for job in jobs
+                ]
+                for job, future in zip(jobs, futures):
+                    try:
+                        sent += self._settle_batch(job, future.result())
+                    except Exception as e:
+                        self.outbox.fail(job["id"], redact_emails(str(e)), self._retry_delay(job))
+
+    async def _send_queued_async(
+        self,
+        group_key: str,
+        campaign_id: str,
+        queue_done: Callable[[], bool],
+        email: Dict[str, Any],
+    ) -> int:
+        """
+        Send the batches of an outbox group from an event loop until none are left.
+
+        Up to EMAIL_ASYNC_BATCHES_IN_FLIGHT batches are sent at once over one
+        HTTP client; the rate limiter paces the requests.
+
+        Args:
+            group_key: Outbox group of the batches
+            campaign_id: ID of the campaign in the campaign ledger
+            queue_done: Returns True once no more batches will be queued
+            email: Keyword arguments for _send_batch
+
+        Returns:
+            Number of emails sent
+        """
+
+        # Outbox calls wait on SQLite's lock, so they run in worker threads
+        # to keep the event loop free for the requests in flight
+        async def send(job: Dict[str, Any]) -> int:
+            try:
+                outcomes = await self._send_batch_async(
+                    client, campaign_id, job["payload"]["recipients"], **email
+                )
+                return await asyncio.to_thread(self._settle_batch, job, outcomes)
+            except Exception as e:
+                await asyncio.to_thread(
+                    self.outbox.fail, job["id"], redact_emails(str(e)), self._retry_delay(job)
+                )
+                return 0
+
+        sent = 0
+        tasks = set()
+        async with get_transport().async_client() as client:
+            while True:
+                # Checked before leasing, so batches queued last are not missed
+                done = await asyncio.to_thread(queue_done)
+                free = EMAIL_ASYNC_BATCHES_IN_FLIGHT - len(tasks)
+                jobs = (
+                    await asyncio.to_thread(self.outbox.lease, "email_batch", group_key, free)
+                    if free
+                    else []
+                )
+                tasks.update(asyncio.create_task(send(job)) for job in jobs)
+                if not tasks:
+                    # Failed batches are retried once their backoff is over
+                    outstanding = await asyncio.to_thread(
+                        self.outbox.outstanding, "email_batch", [group_key]
+                    )
+                    if done and not outstanding[PENDING]:
+                        return sent
+                    await asyncio.sleep(0.1)
+                    continue
+
+                finished, tasks = await asyncio.wait(
+                    tasks, timeout=0.1, return_when=asyncio.FIRST_COMPLETED
+                )
+                sent += sum(task.result() for task in finished)
+
+    def _retry_delay(self, job: Dict[str, Any]) -> float:
+        """Get the backoff before a failed batch is leased again."""
+        return self.rate_limiter.backoff_delay(max(job["attempts"] - 1, 0))
+
+    def _settle_batch(self, job: Dict[str, Any], outcomes: List[Dict[str, Any]]) -> int:
+        """
+        Acknowledge a sent batch, or return it to the outbox to be retried
+        with backoff if any of its emails failed for a reason other than
+        Resend rejecting them. Its recipients already sent are left out of
+        the retry.
+
+        Args:
+            job: The batch's outbox job
+            outcomes: Outcomes of the batch
+
+        Returns:
+            Number of emails sent
+        """
+        counts = self._outcome_counts(outcomes)
+        retryable = [o for o in outcomes if o["status"] == FAILED and not o.get("rejected")]
+        if retryable:
+            self.outbox.fail(
+                job["id"],
+                f"{len(retryable)} emails failed: {redact_emails(retryable[0].get('error'))}",
+                self._retry_delay(job),
+            )
+        else:
+            self.outbox.ack(job["id"], counts)
+        return counts[SENT]
+
+    @staticmethod
+    def _outcome_counts(outcomes: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Count a batch's outcomes by status."""
+        return {
+            status: sum(1 for o in outcomes if o["status"] == status)
+            for status in (SENT, FAILED, SKIPPED)
+        }
+
+    def _send_sharded(
+        self,
+        campaign_key: str,
+        campaign_id: str,
+        shards: int,
+        wait_for_queue: bool,
+        email: Dict[str, Any],
+    ) -> int:
+        """
+        Send a campaign's shards from one worker process each.
+
+        Args:
+            campaign_key: Key of the campaign in the outbox
+            campaign_id: ID of the campaign in the campaign ledger
+            shards: Number of shards
+            wait_for_queue: Whether this process is still queueing recipients
+            email: Keyword arguments for _send_batch
+
+        Returns:
+            Number of emails sent by all shards
+
+        Raises:
+            ValueError: If a shard's worker process failed
+        """
+        print(f"Sending campaign from {shards} worker processes")
+        sent = 0
+        errors = []
+        # Worker processes are spawned rather than forked, since this process
+        # has threads and open databases
+        context = multiprocessing.get_context("spawn")
+        buckets = self.rate_limiter.shared_buckets(self.platform_name, context)
+        with ProcessPoolExecutor(
+            max_workers=shards,
+            mp_context=context,
+            initializer=_init_shard_worker,
+            initargs=(buckets,),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _send_shard, campaign_key, campaign_id, shard, shards, wait_for_queue, email
+                )
+                for shard in range(shards)
+            ]
+            for shard, future in enumerate(futures):
+                try:
+                    sent += future.result()
+                except Exception as e:
+                    print(f"❌ Shard {shard} failed: {str(e)}")
+                    errors.append(f"shard {shard}: {str(e)}")
+        if errors:
+            raise ValueError(f"Failed to send {len(errors)} of {shards} shards ({'; '.join(errors)})")
+        return sent
+
+    def _queue_recipients(
+        self, campaign_key: str, campaign_id: str, shards: int = 1
+    ) -> Optional[threading.Thread]:
+        """
+        Start queueing a campaign's recipients in outbox batches as they stream in.
+
+        Recipients come from SubscriberCache.stream: the local cache after a
+        delta fetch or, when the cache is empty as in each CI run, Supabase's
+        pages as they are downloaded, so the first batch is queued as soon as
+        the first page arrives. The campaign has an "email_campaign"
+        outbox job that is acknowledged once every recipient is queued; the
+        worker that leases it does the queueing. As each batch is queued, the
+        ID of its last subscriber is saved in the campaign job, so queueing
+        again after a failure resumes the scan after it rather than counting
+        batches, which would skip or repeat subscribers if the list changed in
+        between. With several shards, each shard's batches go to its own
+        outbox group and is resumed from its own last ID.
+
+        Args:
+            campaign_key: Key of the campaign in the outbox
+            campaign_id: ID of the campaign in the campaign ledger
+            shards: Number of shards for a new campaign
+
+        Returns:
+            The queueing thread, or None if the recipients are already queued
+            or another worker is queueing them
+        """
+        # A campaign that failed is queued again with its saved progress
+        existing = self.outbox.jobs("email_campaign", campaign_key)
+        payload = existing[0]["payload"] if existing else {"shards": shards}
+        self.outbox.enqueue("email_campaign", campaign_key, campaign_key, payload)
+        leased = self.outbox.lease("email_campaign", campaign_key)
+        if not leased:
+            # Batches only hold subscriber IDs; an empty cache looks up their
+            # addresses as each batch is sent instead of downloading the list
+            self.subscriber_cache.sync(full=False)
+            # A campaign published again retries the batches that used up
+            # their attempts last time
+            shards = payload.get("shards", 1)
+            self.outbox.retry_failed(
+                "email_batch",
+                [shard_group(campaign_key, shard, shards) for shard in range(shards)],
+            )
+            return None
+        campaign = leased[0]
+        progress = dict(campaign["payload"])
+        shards = progress.get("shards", 1)
+        last_ids = progress.setdefault("last_ids", [""] * shards)
+        indexes = progress.setdefault("indexes", [0] * shards)
+        progress.setdefault("queued", 0)
+
+        def enqueue(shard: int, batch: List[str]):
+            group_key = shard_group(campaign_key, shard, shards)
+            self.outbox.enqueue(
+                "email_batch", f"{group_key}/{indexes[shard]}", group_key, {"recipients": batch}
+            )
+            indexes[shard] += 1
+            last_ids[shard] = batch[-1]
+            progress["queued"] += len(batch)
+            self.outbox.checkpoint(campaign["id"], progress)
+
+        def queue():
+            batches = [[] for _ in range(shards)]
+            try:
+                for subscriber in self.subscriber_cache.stream(after_id=min(last_ids)):
+                    if subscriber.get("id") and subscriber["id"] <= last_ids[shard_of(subscriber["id"], shards)]:
+                        # Already queued by an earlier attempt
+                        continue
+                    if not subscriber.get("id") or not subscriber.get("email"):
+                        print(f"Skipping subscriber with missing ID or email: {subscriber}")
+                        if subscriber.get("id"):
+                            self.campaigns.record(campaign_id, [{
+                                "id": subscriber["id"],
+                                "status": SKIPPED,
+                                "error": "Missing email",
+                            }])
+                        continue
+                    shard = shard_of(subscriber["id"], shards)
+                    batch = batches[shard]
+                    # Only the ID is queued; the address is looked up when sending
+                    batch.append(subscriber["id"])
+                    if len(batch) == EMAIL_BATCH_SIZE:
+                        enqueue(shard, batch)
+                        batches[shard] = []
+                for shard, batch in enumerate(batches):
+                    if batch:
+                        enqueue(shard, batch)
+                self.outbox.ack(campaign["id"], {"recipients": progress["queued"]})
+                print(f"Queued {progress['queued']} subscribers for sending")
+            except Exception as e:
+                print(f"Error fetching subscribers: {str(e)}")
+                self.outbox.fail(campaign["id"], redact_emails(str(e)))
+
+        thread = threading.Thread(target=queue, daemon=True)
+        thread.start()
+        return thread
+
+    def _send_batch(
+        self,
+        campaign_id: str,
+        recipients: List[Dict[str, Any]],
+        from_email: str,
+        subject: str,
+        content: str,
+        email_template: Any,
+        base_url: str,
+        attachments: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Send the email to one batch of recipients and record the outcomes.
+
+        Recipients the campaign ledger shows as already sent are left out, and
+        subscribers who unsubscribed since the batch was queued are skipped.
+
+        Args:
+            campaign_id: ID of the campaign in the campaign ledger
+            recipients: Subscriber IDs (or, in batches queued by older
+                versions, recipients with "id" and "email")
+            from_email: Sender address
+            subject: Email subject
+            content: Email content, sent as the plain text part
+            email_template: The post's compiled email HTML (an EmailTemplate)
+            base_url: Base URL of the unsubscribe endpoint
+            attachments: Attachments to include
+
+        Returns:
+            One outcome per recipient handled in this call, with the
+            recipient's "id", "email" and "status" and either the Resend
+            message "message_id" or an "error"
+        """
+        pending, skipped, messages = self._prepare_batch(
+            campaign_id, recipients, from_email, subject, content,
+            email_template, base_url, attachments,
+        )
+        # The batch endpoint does not accept attachments
+        results = (
+            self.batch_sender.send(
+                messages,
+                use_batch=not attachments,
+                keys=[idempotency_key(campaign_id, r["id"]) for r in pending],
+            )
+            if messages
+            else []
+        )
+        return self._finish_batch(campaign_id, pending, skipped, results)
+
+    async def _send_batch_async(
+        self,
+        client: httpx.AsyncClient,
+        campaign_id: str,
+        recipients: List[Dict[str, Any]],
+        from_email: str,
+        subject: str,
+        content: str,
+        email_template: Any,
+        base_url: str,
+        attachments: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Send the email to one batch of recipients from an event loop and
+        record the outcomes, as _send_batch does.
+
+        Args:
+            client: Client used for the Resend requests
+            campaign_id: ID of the campaign in the campaign ledger
+            recipients: Subscriber IDs (or, in batches queued by older
+                versions, recipients with "id" and "email")
+            from_email: Sender address
+            subject: Email subject
+            content: Email content, sent as the plain text part
+            email_template: The post's compiled email HTML (an EmailTemplate)
+            base_url: Base URL of the unsubscribe endpoint
+            attachments: Attachments to include
+
+        Returns:
+            One outcome per recipient handled in this call
+        """
+        pending, skipped, messages = await asyncio.to_thread(
+            self._prepare_batch, campaign_id, recipients, from_email, subject,
+            content, email_template, base_url, attachments,
+        )
+        results = (
+            await self.batch_sender.send_async(
+                client,
+                messages,
+                use_batch=not attachments,
+                keys=[idempotency_key(campaign_id, r["id"]) for r in pending],
+            )
+            if messages
+            else []
+        )
+        return await asyncio.to_thread(
+            self._finish_batch, campaign_id, pending, skipped, results
+        )
+
+    def _prepare_batch(
+        self,
+        campaign_id: str,
+        recipients: List[Dict[str, Any]],
+        from_email: str,
+        subject: str,
+        content: str,
+        email_template: Any,
+        base_url: str,
+        attachments: List[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Work out who in a batch to send to and build their messages.
+
+        Args:
+            campaign_id: ID of the campaign in the campaign ledger
+            recipients: Subscriber IDs (or, in batches queued by older
+                versions, recipients with "id" and "email")
+            from_email: Sender address
+            subject: Email subject
+            content: Email content, sent as the plain text part
+            email_template: The post's compiled email HTML (an EmailTemplate)
+            base_url: Base URL of the unsubscribe endpoint
+            attachments: Attachments to include
+
+        Returns:
+            The recipients to send to, the outcomes of the skipped ones, and
+            one Resend message per recipient to send to
+        """
+        ids = [r["id"] if isinstance(r, dict) else r for r in recipients]
+        already_sent = self.campaigns.sent_ids(campaign_id, ids)
+        emails = self.subscriber_cache.active_emails(ids)
+
+        pending = []
+        skipped = []
+        for subscriber_id in ids:
+            if subscriber_id in already_sent:
+                continue
+            if subscriber_id not in emails:
+                skipped.append({
+                    "id": subscriber_id,
+                    "status": SKIPPED,
+                    "error": "Unsubscribed",
+                })
+                continue
+            pending.append({"id": subscriber_id, "email": emails[subscriber_id]})
+        if len(pending) < len(recipients):
+            print(
+                f"Leaving out {len(already_sent)} recipients already sent and "
+                f"{len(skipped)} unsubscribed"
+            )
+
+        messages = []
+        for recipient in pending:
+            params = {
+                "from": from_email,
+                "to": recipient["email"],
+                "subject": subject,
+                "html": email_template.render(f"{base_url}?id={recipient['id']}"),
+                "text": content,
+            }
+
+            # Add attachments if any
+            if attachments:
+                params["attachments"] = attachments
+            messages.append(params)
+        return pending, skipped, messages
+
+    def _finish_batch(
+        self,
+        campaign_id: str,
+        pending: List[Dict[str, Any]],
+        skipped: List[Dict[str, Any]],
+        results: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Record the outcomes of a sent batch in the campaign ledger.
+
+        Args:
+            campaign_id: ID of the campaign in the campaign ledger
+            pending: Recipients the batch was sent to
+            skipped: Outcomes of the skipped recipients
+            results: Sender results, one per pending recipient
+
+        Returns:
+            The outcomes of the batch, skipped recipients included
+        """
+        outcomes = []
+        for recipient, result in zip(pending, results):
+            outcome = {"id": recipient["id"], "email": recipient["email"], "status": result["status"]}
+            if result["status"] == "sent":
+                outcome["message_id"] = result["id"]
+            else:
+                outcome["error"] = result["error"]
+                outcome["rejected"] = result.get("rejected", False)
+            outcomes.append(outcome)
+
+        if results:
+            sent = sum(1 for o in outcomes if o["status"] == SENT)
+            print(f"✅ Sent batch of {len(results)} emails ({len(results) - sent} failed)")
+
+        # Record the batch straight away, so a crash before the outbox job
+        # is acknowledged does not send these emails again
+        outcomes.extend(skipped)
+        self.campaigns.record(campaign_id, outcomes)
+        return outcomes
+
+    def campaign_outcomes(self, campaign_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the outcome for every recipient of a campaign recorded so far.
+
+        Args:
+            campaign_id: ID of the campaign in the campaign ledger
+
+        Returns:
+            List of per-recipient outcomes
+        """
+        return self.campaigns.recipients(campaign_id)
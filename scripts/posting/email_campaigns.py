@@ -0,0 +1,319 @@
+"""
+Ledger of email campaigns and what was sent to each recipient.
+
+A campaign is one post's email, keyed by page, version and a hash of the
+content and media. Every recipient's outcome (sent, failed or skipped) is
+recorded with the Resend message ID as soon as its batch returns, so a
+resumed campaign only sends to recipients who have not received it yet.
+
+The ledger is kept in the state directory, which CI caches between runs, so
+it holds no email addresses: recipients are recorded by subscriber ID and a
+hash of their address, and addresses are removed from error messages.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .state import state_path
+
+SENT = "sent"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+
+def email_hash(email: Optional[str]) -> str:
+    """
+    Hash an email address for the ledger.
+
+    Args:
+        email: The address
+
+    Returns:
+        sha256 hex digest of the trimmed, lowercased address, or "" if there is none
+    """
+    if not email:
+        return ""
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()
+
+
+def redact_emails(text: Optional[str]) -> Optional[str]:
+    """
+    Remove email addresses from a message, e.g. a Resend error.
+
+    Args:
+        text: The message
+
+    Returns:
+        The message with each address replaced by "<email>"
+    """
+    return EMAIL_PATTERN.sub("<email>", text) if text else text
+
+
+class CampaignLedger:
+    """SQLite-backed record of email campaigns and per-recipient outcomes."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the ledger.
+
+        Args:
+            db_path: Path to the SQLite database; defaults to campaigns.db in the state directory
+        """
+        self.db_path = str(db_path or state_path("campaigns.db"))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS campaigns (
+                campaign_id TEXT PRIMARY KEY,
+                page_name TEXT NOT NULL,
+                version TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS recipients (
+                campaign_id TEXT NOT NULL,
+                subscriber_id TEXT NOT NULL,
+                email_hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                message_id TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (campaign_id, subscriber_id)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS recipients_status_idx ON recipients(campaign_id, status)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(recipients)")}
+        if "email" in columns:
+            # Ledgers from before addresses were hashed
+            self._conn.create_function("hash_email", 1, email_hash)
+            self._conn.create_function("redact_emails", 1, redact_emails)
+            self._conn.execute("DROP INDEX IF EXISTS recipients_email_idx")
+            self._conn.execute("ALTER TABLE recipients RENAME COLUMN email TO email_hash")
+            self._conn.execute(
+                "UPDATE recipients SET email_hash = hash_email(email_hash), "
+                "error = redact_emails(error)"
+            )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS recipients_email_hash_idx ON recipients(email_hash)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def campaign_id(page_name: str, version: str, content_hash: str) -> str:
+        """
+        Build the ID of a campaign.
+
+        Args:
+            page_name: Name of the page
+            version: Version folder name (empty for legacy folders)
+            content_hash: Hash of the email content and media
+
+        Returns:
+            The campaign ID
+        """
+        return f"{page_name}/{version or '-'}/{content_hash[:16]}"
+
+    def start(
+        self,
+        campaign_id: str,
+        page_name: str,
+        version: str,
+        content_hash: str,
+        subject: str,
+    ):
+        """
+        Register a campaign unless it already exists.
+
+        Args:
+            campaign_id: ID from campaign_id()
+            page_name: Name of the page
+            version: Version folder name
+            content_hash: Hash of the email content and media
+            subject: Email subject
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO campaigns VALUES (?, ?, ?, ?, ?, ?)",
+                (campaign_id, page_name, version, content_hash, subject, time.time()),
+            )
+            self._conn.commit()
+
+    def sent_ids(self, campaign_id: str, subscriber_ids: Iterable[str]) -> Set[str]:
+        """
+        Find which subscribers have already been sent a campaign.
+
+        Args:
+            campaign_id: ID of the campaign
+            subscriber_ids: Subscriber IDs to check
+
+        Returns:
+            Set of the subscriber IDs with a successful send
+        """
+        subscriber_ids = list(subscriber_ids)
+        if not subscriber_ids:
+            return set()
+        placeholders = ",".join("?" * len(subscriber_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT subscriber_id FROM recipients WHERE campaign_id = ? AND status = ? "
+                f"AND subscriber_id IN ({placeholders})",
+                [campaign_id, SENT] + subscriber_ids,
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def record(self, campaign_id: str, outcomes: List[Dict[str, Any]]):
+        """
+        Record recipient outcomes. A recipient already sent the campaign keeps
+        its sent status. Addresses are stored hashed and removed from errors.
+
+        Args:
+            campaign_id: ID of the campaign
+            outcomes: Outcomes with "id", "email", "status" and "message_id" or "error"
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO recipients
+                    (campaign_id, subscriber_id, email_hash, status, message_id, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (campaign_id, subscriber_id) DO UPDATE SET
+                    status = excluded.status,
+                    message_id = excluded.message_id,
+                    error = excluded.error,
+                    attempts = recipients.attempts + 1,
+                    updated_at = excluded.updated_at
+                WHERE recipients.status != 'sent'
+                """,
+                [
+                    (
+                        campaign_id,
+                        outcome["id"],
+                        email_hash(outcome.get("email")),
+                        outcome["status"],
+                        outcome.get("message_id"),
+                        redact_emails(outcome.get("error")),
+                        now,
+                    )
+                    for outcome in outcomes
+                ],
+            )
+            self._conn.commit()
+
+    def status_counts(self, campaign_id: str) -> Dict[str, int]:
+        """
+        Count a campaign's recipients by status.
+
+        Args:
+            campaign_id: ID of the campaign
+
+        Returns:
+            Dict with the number of sent, failed and skipped recipients
+        """
+        counts = {SENT: 0, FAILED: 0, SKIPPED: 0}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM recipients WHERE campaign_id = ? GROUP BY status",
+                (campaign_id,),
+            ).fetchall()
+        counts.update(dict(rows))
+        return counts
+
+    def campaigns(self, page_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List campaigns with their recipient counts, newest first.
+
+        Args:
+            page_name: Only list campaigns of this page
+
+        Returns:
+            List of campaign dictionaries
+        """
+        page_clause = "WHERE c.page_name = ?" if page_name else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT c.campaign_id, c.page_name, c.version, c.subject, c.created_at,
+                       SUM(r.status = 'sent'), SUM(r.status = 'failed'), SUM(r.status = 'skipped')
+                FROM campaigns c LEFT JOIN recipients r ON r.campaign_id = c.campaign_id
+                {page_clause}
+                GROUP BY c.campaign_id ORDER BY c.created_at DESC
+                """,
+                (page_name,) if page_name else (),
+            ).fetchall()
+        return [
+            {
+                "campaign_id": row[0],
+                "page_name": row[1],
+                "version": row[2],
+                "subject": row[3],
+                "created_at": row[4],
+                SENT: row[5] or 0,
+                FAILED: row[6] or 0,
+                SKIPPED: row[7] or 0,
+            }
+            for row in rows
+        ]
+
+    def recipients(
+        self,
+        campaign_id: Optional[str] = None,
+        status: Optional[str] = None,
+        email: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        List recorded recipient outcomes.
+
+        Args:
+            campaign_id: Only list recipients of this campaign
+            status: Only list recipients with this status
+            email: Only list outcomes for this email address
+
+        Returns:
+            List of recipient dictionaries, with the "email_hash" of each address
+        """
+        clauses = []
+        params = []
+        for column, value in (
+            ("campaign_id", campaign_id),
+            ("status", status),
+            ("email_hash", email_hash(email)),
+        ):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT campaign_id, subscriber_id, email_hash, status, message_id, error, "
+                f"attempts, updated_at FROM recipients {where} ORDER BY updated_at",
+                params,
+            ).fetchall()
+        keys = (
+            "campaign_id", "subscriber_id", "email_hash", "status",
+            "message_id", "error", "attempts", "updated_at",
+        )
+        return [dict(zip(keys, row)) for row in rows]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -2,70 +2,203 @@
 Email subscriber management for the blog using Supabase.
 """
 import os
-import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
+
+from .transport import get_transport
+
+# Rows fetched per request; at most Supabase's default max-rows limit
+PAGE_SIZE = 1000
 
 class EmailSubscriberManager:
     """Manages email subscribers for the blog using Supabase."""
-    
+
     def __init__(self):
         """Initialize the subscriber manager."""
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    
-    def _fetch_subscribers_from_supabase(self) -> List[Dict[str, Any]]:
+        self.session = get_transport().session()
+
+    def iter_subscribers(
+        self,
+        active_only: bool = True,
+        columns: str = "id,email",
+        page_size: int = PAGE_SIZE,
+        after_id: str = "",
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Fetch subscribers from Supabase database.
-        
+        Stream subscribers from Supabase page by page.
+
+        Pages are fetched with keyset pagination on the id column, and the
+        active filter and column list are applied by the server, so each
+        subscriber can be used as soon as its page arrives.
+
+        Args:
+            active_only: Only fetch active subscribers
+            columns: Columns to fetch, in PostgREST select syntax
+            page_size: Rows fetched per request
+            after_id: Only fetch subscribers whose ID sorts after this one
+
+        Yields:
+            Subscriber dictionaries with the selected columns and "active"
+
+        Raises:
+            ValueError: If Supabase returns an error
+        """
+        if not self.supabase_url or not self.supabase_key:
+            print("Supabase credentials not found in environment variables")
+            return
+
+        last_id = after_id or None
+        while True:
+            params = {"select": columns, "order": "id.asc", "limit": page_size}
+            if active_only:
+                params["active"] = "eq.true"
+            if last_id is not None:
+                params["id"] = f"gt.{last_id}"
+
+            # Stop on an empty page rather than a short one, in case the
+            # server caps pages below page_size
+            rows = self._get_page("email_subscribers", params)
+            if not rows:
+                return
+
+            for row in rows:
+                subscriber = dict(row)
+                subscriber.setdefault("active", True)
+                yield subscriber
+            last_id = rows[-1]["id"]
+
+    def iter_changes(
+        self,
+        table: str,
+        column: str,
+        since: Optional[str] = None,
+        columns: str = "*",
+        page_size: int = PAGE_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the rows of a table changed at or after a timestamp.
+
+        Args:
+            table: Name of the table
+            column: Timestamp column to compare, e.g. "updated_at"
+            since: Timestamp to start from; all rows when omitted
+            columns: Columns to fetch, in PostgREST select syntax
+            page_size: Rows fetched per request
+
+        Yields:
+            Row dictionaries in order of the timestamp column
+
+        Raises:
+            ValueError: If Supabase returns an error, e.g. because the table
+                or column does not exist
+        """
+        if not self.supabase_url or not self.supabase_key:
+            print("Supabase credentials not found in environment variables")
+            return
+
+        offset = 0
+        while True:
+            params = {
+                "select": columns,
+                "order": f"{column}.asc,id.asc",
+                "limit": page_size,
+                "offset": offset,
+            }
+            if since:
+                params[column] = f"gte.{since}"
+
+            rows = self._get_page(table, params)
+            if not rows:
+                return
+
+            yield from rows
+            offset += len(rows)
+
+    def get_subscribers_by_id(
+        self, subscriber_ids: List[str], active_only: bool = True, columns: str = "id,email"
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch specific subscribers from Supabase.
+
+        Args:
+            subscriber_ids: IDs of the subscribers, at most a page's worth
+            active_only: Only fetch active subscribers
+            columns: Columns to fetch, in PostgREST select syntax
+
         Returns:
-            List of subscriber dictionaries
+            List of subscriber dictionaries with the selected columns and "active"
+
+        Raises:
+            ValueError: If Supabase returns an error
         """
+        if not subscriber_ids:
+            return []
         if not self.supabase_url or not self.supabase_key:
             print("Supabase credentials not found in environment variables")
             return []
-        
+
+        params = {"select": columns, "id": f"in.({','.join(subscriber_ids)})"}
+        if active_only:
+            params["active"] = "eq.true"
+        subscribers = []
+        for row in self._get_page("email_subscribers", params):
+            subscriber = dict(row)
+            subscriber.setdefault("active", True)
+            subscribers.append(subscriber)
+        return subscribers
+
+    def _get_page(self, table: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Fetch one page of rows with the Supabase REST API.
+
+        Args:
+            table: Name of the table
+            params: PostgREST query parameters
+
+        Returns:
+            List of rows
+        """
+        # Set up headers with Supabase API key
+        headers = {
+            "apikey": self.supabase_key,
+            "Authorization": f"Bearer {self.supabase_key}",
+            "Content-Type": "application/json"
+        }
+
+        response = self.session.get(
+            f"{self.supabase_url}/rest/v1/{table}",
+            headers=headers,
+            params=params,
+        )
+        if response.status_code != 200:
+            raise ValueError(
+                f"Failed to fetch {table} from Supabase: {response.status_code} - {response.text}"
+            )
+        return response.json()
+
+    def _fetch_subscribers_from_supabase(self, active_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Fetch subscribers from Supabase database.
+
+        Args:
+            active_only: Only fetch active subscribers
+
+        Returns:
+            List of subscriber dictionaries
+        """
         try:
-            # Construct the Supabase REST API URL for the email_subscribers table
-            api_url = f"{self.supabase_url}/rest/v1/email_subscribers"
-            
-            # Set up headers with Supabase API key
-            headers = {
-                "apikey": self.supabase_key,
-                "Authorization": f"Bearer {self.supabase_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Make the request to Supabase
-            response = requests.get(api_url, headers=headers)
-            
-            # Check if request was successful
-            if response.status_code == 200:
-                subscribers = response.json()
-                print(f"Successfully fetched {len(subscribers)} subscribers from Supabase")
-                
-                # Transform the data to match our expected format if needed
-                formatted_subscribers = []
-                for sub in subscribers:
-                    formatted_subscribers.append({
-                        "email": sub.get("email", ""),
-                        "active": sub.get("active", True),
-                        "id": sub.get("id", "")
-                    })
-                
-                return formatted_subscribers
-            else:
-                print(f"Failed to fetch subscribers from Supabase: {response.status_code} - {response.text}")
-                return []
-                
+            subscribers = list(self.iter_subscribers(active_only, columns="id,email,active"))
+            print(f"Successfully fetched {len(subscribers)} subscribers from Supabase")
+            return subscribers
         except Exception as e:
             print(f"Error fetching subscribers from Supabase: {str(e)}")
             return []
-    
+
     def get_active_subscribers(self) -> List[Dict[str, Any]]:
         """Get all active subscribers."""
-        subscribers = self._fetch_subscribers_from_supabase()
-        return [s for s in subscribers if s.get("active", True)]
-    
+        return self._fetch_subscribers_from_supabase(active_only=True)
+
     def get_all_subscribers(self) -> List[Dict[str, Any]]:
         """Get all subscribers."""
         return self._fetch_subscribers_from_supabase()
@@ -0,0 +1,131 @@
+"""
+Durable ledger of successful publishes.
+
+Each entry is keyed by page, platform, version and a hash of the posted
+content and media, so re-running a partially failed publish only retries
+what did not succeed.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .state import state_path
+
+
+class PublishLedger:
+    """SQLite-backed record of what has already been published."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the ledger.
+
+        Args:
+            db_path: Path to the SQLite database; defaults to ledger.db in the state directory
+        """
+        self.db_path = str(db_path or state_path("ledger.db"))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS publishes (
+                page_name TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                version TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                remote_id TEXT,
+                url TEXT,
+                result TEXT NOT NULL,
+                published_at TEXT NOT NULL,
+                PRIMARY KEY (page_name, platform, version, content_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def content_hash(content: str, media_files: Iterable[str] = ()) -> str:
+        """
+        Hash the content and media that make up a publish.
+
+        Args:
+            content: The text being posted
+            media_files: Paths of the media files being posted
+
+        Returns:
+            Hex sha256 digest
+        """
+        digest = hashlib.sha256(content.encode("utf-8"))
+        for media_file in sorted(str(m) for m in media_files):
+            digest.update(Path(media_file).name.encode("utf-8"))
+            with open(media_file, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(
+        self, page_name: str, platform: str, version: str, content_hash: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a successful publish.
+
+        Args:
+            page_name: Name of the page
+            platform: Name of the platform
+            version: Version folder name (empty for legacy folders)
+            content_hash: Hash from content_hash()
+
+        Returns:
+            The recorded result, or None if this publish has not succeeded yet
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM publishes WHERE page_name = ? AND platform = ? "
+                "AND version = ? AND content_hash = ?",
+                (page_name, platform, version, content_hash),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record_success(
+        self,
+        page_name: str,
+        platform: str,
+        version: str,
+        content_hash: str,
+        result: Dict[str, Any],
+    ):
+        """
+        Record a successful publish.
+
+        Args:
+            page_name: Name of the page
+            platform: Name of the platform
+            version: Version folder name (empty for legacy folders)
+            content_hash: Hash from content_hash()
+            result: Result returned by the platform
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO publishes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    page_name,
+                    platform,
+                    version,
+                    content_hash,
+                    str(result.get("id", "")),
+                    result.get("url", ""),
+                    json.dumps(result),
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+                ),
+            )
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,203 @@
+"""
+Cache of media already uploaded to a platform.
+
+Uploaded media is recorded by platform, account and the sha256 of the file,
+together with the remote media ID and when that ID expires. Retrying a post,
+or posting the same image again, reuses the ID instead of uploading the same
+bytes a second time.
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+from .state import state_path
+
+
+class MediaCache:
+    """SQLite-backed map of uploaded files to remote media IDs."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: Path to the SQLite database; defaults to media_cache.db in the state directory
+        """
+        self.db_path = str(db_path or state_path("media_cache.db"))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS media (
+                platform TEXT NOT NULL,
+                account TEXT NOT NULL,
+                file_hash TEXT NOT NULL,
+                media_id TEXT NOT NULL,
+                uploaded_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (platform, account, file_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def file_hash(media_file: str) -> str:
+        """
+        Hash the contents of a media file.
+
+        Args:
+            media_file: Path to the media file
+
+        Returns:
+            Hex sha256 digest
+        """
+        digest = hashlib.sha256()
+        with open(media_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, platform: str, account: str, file_hash: str) -> Optional[str]:
+        """
+        Look up an unexpired media ID.
+
+        Args:
+            platform: Name of the platform
+            account: Account the media was uploaded to
+            file_hash: Hash from file_hash()
+
+        Returns:
+            The media ID, or None if there is no valid one
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT media_id FROM media WHERE platform = ? AND account = ? "
+                "AND file_hash = ? AND expires_at > ?",
+                (platform, account, file_hash, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(
+        self, platform: str, account: str, file_hash: str, media_id: str, ttl: float
+    ):
+        """
+        Record an uploaded media ID.
+
+        Args:
+            platform: Name of the platform
+            account: Account the media was uploaded to
+            file_hash: Hash from file_hash()
+            media_id: Remote media ID
+            ttl: Seconds the platform keeps the media ID usable
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?)",
+                (platform, account, file_hash, media_id, now, now + ttl),
+            )
+            self._conn.commit()
+
+    def invalidate(self, platform: str, account: str, file_hash: str):
+        """
+        Forget a media ID, e.g. after the platform rejected it.
+
+        Args:
+            platform: Name of the platform
+            account: Account the media was uploaded to
+            file_hash: Hash from file_hash()
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM media WHERE platform = ? AND account = ? AND file_hash = ?",
+                (platform, account, file_hash),
+            )
+            self._conn.commit()
+
+    def get_or_upload(
+        self,
+        platform: str,
+        account: str,
+        media_file: str,
+        upload: Callable[[str], Optional[str]],
+        ttl: float,
+    ) -> Optional[str]:
+        """
+        Return the cached media ID of a file, uploading it if there is none.
+
+        Args:
+            platform: Name of the platform
+            account: Account the media is uploaded to
+            media_file: Path to the media file
+            upload: Called with the file path to upload it; returns the media ID
+            ttl: Seconds the platform keeps the media ID usable
+
+        Returns:
+            The media ID, or whatever upload returned if it failed
+        """
+        file_hash = self.file_hash(media_file)
+        media_id = self.get(platform, account, file_hash)
+        if media_id:
+            print(f"Reusing uploaded media for {media_file}")
+            return media_id
+
+        media_id = upload(media_file)
+        if media_id:
+            self.put(platform, account, file_hash, media_id, ttl)
+        return media_id
+
+    async def get_or_upload_async(
+        self,
+        platform: str,
+        account: str,
+        media_file: str,
+        upload: Callable[[str], Awaitable[Optional[str]]],
+        ttl: float,
+    ) -> Optional[str]:
+        """
+        Return the cached media ID of a file, awaiting its upload if there is none.
+
+        Args:
+            platform: Name of the platform
+            account: Account the media is uploaded to
+            media_file: Path to the media file
+            upload: Coroutine function called with the file path; returns the media ID
+            ttl: Seconds the platform keeps the media ID usable
+
+        Returns:
+            The media ID, or whatever upload returned if it failed
+        """
+        file_hash = await asyncio.to_thread(self.file_hash, media_file)
+        media_id = self.get(platform, account, file_hash)
+        if media_id:
+            print(f"Reusing uploaded media for {media_file}")
+            return media_id
+
+        media_id = await upload(media_file)
+        if media_id:
+            self.put(platform, account, file_hash, media_id, ttl)
+        return media_id
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_media_cache: Optional[MediaCache] = None
+_media_cache_lock = threading.Lock()
+
+
+def get_media_cache() -> MediaCache:
+    """Return the process-wide media cache."""
+    global _media_cache
+    with _media_cache_lock:
+        if _media_cache is None:
+            _media_cache = MediaCache()
+        return _media_cache
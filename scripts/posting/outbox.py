@@ -0,0 +1,345 @@
+"""
+Persistent outbox of publish jobs.
+
+Jobs are stored in SQLite and handed out with leases: a worker leases a job,
+does the work and acknowledges it. If the worker dies, the lease expires and
+any other worker can pick the job up again, while acknowledged jobs are never
+repeated. Jobs are grouped (a page folder, an email campaign) so a worker can
+drain one group at a time.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from .state import state_path
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+def make_worker_id() -> str:
+    """Return an identifier unique to this worker process."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class Outbox:
+    """SQLite-backed job queue with lease and acknowledge semantics."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        lease_seconds: float = 600.0,
+        max_attempts: int = 5,
+    ):
+        """
+        Initialize the outbox.
+
+        Args:
+            db_path: Path to the SQLite database; defaults to outbox.db in the state directory
+            lease_seconds: How long a leased job stays reserved for its worker
+            max_attempts: Attempts after which a failing job is marked failed
+        """
+        self.db_path = str(db_path or state_path("outbox.db"))
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = make_worker_id()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                job_key TEXT NOT NULL UNIQUE,
+                group_key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                available_at REAL NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_group_idx ON jobs(kind, group_key, status)"
+        )
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._conn.row_factory = sqlite3.Row
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.row_factory = None
+        return [self._row_to_job(row) for row in rows]
+
+    def enqueue(
+        self, kind: str, job_key: str, group_key: str, payload: Dict[str, Any]
+    ) -> bool:
+        """
+        Add a job unless one with the same key already exists.
+
+        A job that used up its attempts and was marked failed is queued
+        again with the new payload and a fresh set of attempts.
+
+        Args:
+            kind: Kind of job, e.g. "publish" or "email_batch"
+            job_key: Unique key identifying the unit of work
+            group_key: Key of the group the job belongs to
+            payload: JSON-serializable job data
+
+        Returns:
+            True if the job was added or queued again, False if it already existed
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (kind, job_key, group_key, payload, status, "
+                "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (job_key) DO UPDATE SET status = excluded.status, "
+                "payload = excluded.payload, attempts = 0, error = NULL, "
+                "available_at = excluded.available_at, updated_at = excluded.updated_at "
+                "WHERE jobs.status = ?",
+                (kind, job_key, group_key, json.dumps(payload), PENDING, now, now, now, FAILED),
+            )
+        return cursor.rowcount > 0
+
+    def lease(
+        self, kind: str, group_key: Optional[str] = None, limit: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Lease available jobs: pending ones that are due, or ones whose lease expired.
+
+        Args:
+            kind: Kind of job to lease
+            group_key: Only lease jobs of this group
+            limit: Maximum number of jobs to lease
+
+        Returns:
+            List of leased jobs
+        """
+        now = time.time()
+        group_clause = "AND group_key = ?" if group_key is not None else ""
+        params = (kind,) + ((group_key,) if group_key is not None else ())
+
+        with self._lock:
+            self._conn.row_factory = sqlite3.Row
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                rows = self._conn.execute(
+                    f"""
+                    SELECT * FROM jobs
+                    WHERE kind = ? {group_clause}
+                      AND ((status = ? AND available_at <= ?)
+                           OR (status = ? AND lease_expires < ?))
+                    ORDER BY id LIMIT ?
+                    """,
+                    params + (PENDING, now, LEASED, now, limit),
+                ).fetchall()
+                for row in rows:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, "
+                        "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (LEASED, self.worker_id, now + self.lease_seconds, now, row["id"]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._conn.row_factory = None
+
+        jobs = [self._row_to_job(row) for row in rows]
+        for job in jobs:
+            job["status"] = LEASED
+            job["attempts"] += 1
+        return jobs
+
+    def ack(self, job_id: int, result: Optional[Dict[str, Any]] = None):
+        """
+        Mark a leased job as done.
+
+        Args:
+            job_id: ID of the job
+            result: JSON-serializable outcome of the job
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ?",
+                (DONE, json.dumps(result) if result is not None else None, time.time(), job_id),
+            )
+
+    def checkpoint(self, job_id: int, payload: Dict[str, Any]):
+        """
+        Save the progress of a leased job in its payload.
+
+        The payload is kept if the job fails, so the next attempt can
+        resume from it.
+
+        Args:
+            job_id: ID of the job
+            payload: JSON-serializable job data
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET payload = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(payload), time.time(), job_id),
+            )
+
+    def fail(self, job_id: int, error: str, retry_in: float = 0.0):
+        """
+        Release a leased job after a failure.
+
+        The job returns to the queue after retry_in seconds, or is marked failed
+        once it has used up its attempts.
+
+        Args:
+            job_id: ID of the job
+            error: Error message
+            retry_in: Seconds before the job becomes available again
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = ?, lease_owner = NULL, lease_expires = NULL, available_at = ?, "
+                "updated_at = ? WHERE id = ?",
+                (self.max_attempts, FAILED, PENDING, error, now + retry_in, now, job_id),
+            )
+
+    def release(self, job_id: int, retry_in: float = 0.0, error: Optional[str] = None):
+        """
+        Return a leased job to the queue without counting the attempt.
+
+        Args:
+            job_id: ID of the job
+            retry_in: Seconds before the job becomes available again
+            error: Reason the job was deferred, if any
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), "
+                "error = COALESCE(?, error), lease_owner = NULL, lease_expires = NULL, "
+                "available_at = ?, updated_at = ? WHERE id = ?",
+                (PENDING, error, now + retry_in, now, job_id),
+            )
+
+    def retry_failed(self, kind: str, group_keys: List[str]) -> int:
+        """
+        Return the failed jobs of some groups to the queue with fresh attempts.
+
+        Args:
+            kind: Kind of job
+            group_keys: Keys of the groups
+
+        Returns:
+            Number of jobs returned to the queue
+        """
+        if not group_keys:
+            return 0
+        placeholders = ",".join("?" * len(group_keys))
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET status = ?, attempts = 0, available_at = ?, updated_at = ? "
+                f"WHERE kind = ? AND status = ? AND group_key IN ({placeholders})",
+                (PENDING, now, now, kind, FAILED, *group_keys),
+            )
+        return cursor.rowcount
+
+    def jobs(self, kind: str, group_key: str) -> List[Dict[str, Any]]:
+        """
+        List every job of a group.
+
+        Args:
+            kind: Kind of job
+            group_key: Key of the group
+
+        Returns:
+            List of jobs ordered by creation
+        """
+        return self._query(
+            "SELECT * FROM jobs WHERE kind = ? AND group_key = ? ORDER BY id",
+            (kind, group_key),
+        )
+
+    def outstanding(self, kind: str, group_keys: List[str]) -> Dict[str, Any]:
+        """
+        Count the unfinished jobs of some groups.
+
+        Args:
+            kind: Kind of job
+            group_keys: Keys of the groups
+
+        Returns:
+            Dict with the number of "pending" and "leased" jobs, and "ready_in",
+            the seconds until every one of them can be leased (pending jobs
+            once due, leased ones once their lease expires)
+        """
+        summary = {PENDING: 0, LEASED: 0, "ready_in": 0.0}
+        if not group_keys:
+            return summary
+        placeholders = ",".join("?" * len(group_keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT status, COUNT(*),
+                       MAX(CASE WHEN status = ? THEN available_at ELSE lease_expires END)
+                FROM jobs WHERE kind = ? AND group_key IN ({placeholders})
+                  AND status IN (?, ?)
+                GROUP BY status
+                """,
+                (PENDING, kind, *group_keys, PENDING, LEASED),
+            ).fetchall()
+        now = time.time()
+        for status, count, ready_at in rows:
+            summary[status] = count
+            summary["ready_in"] = max(summary["ready_in"], (ready_at or now) - now)
+        return summary
+
+    def outstanding_groups(self, kind: str) -> List[str]:
+        """
+        List groups that still have pending or leased jobs.
+
+        Args:
+            kind: Kind of job
+
+        Returns:
+            List of group keys
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT group_key FROM jobs WHERE kind = ? AND status IN (?, ?) "
+                "ORDER BY group_key",
+                (kind, PENDING, LEASED),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -2,9 +2,14 @@
 Base classes for social media platforms.
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+import asyncio
 import time
 
+from ..rate_limit import get_rate_limiter
+from ..media_cache import get_media_cache
+from ..circuit_breaker import CircuitBreaker
+
 
 class SocialMediaPlatform(ABC):
     """Base class for social media platforms."""
@@ -12,6 +17,9 @@ class SocialMediaPlatform(ABC):
     def __init__(self, name: str):
         """Initialize the platform."""
         self.name = name
+        self.rate_limiter = get_rate_limiter()
+        self.media_cache = get_media_cache()
+        self.circuit_breaker = CircuitBreaker.for_platform(name)
     
     @abstractmethod
     def post_content(self, content: str, page_name: str, platform_folder: Optional[str] = None) -> Dict[str, Any]:
@@ -28,6 +36,55 @@ class SocialMediaPlatform(ABC):
         """
         pass
     
+    async def post_content_async(self, content: str, page_name: str, platform_folder: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Post content to the platform from an event loop.
+        
+        Platforms with an async HTTP client override this; by default the
+        synchronous post_content runs in a worker thread.
+        
+        Args:
+            content: The content to post
+            page_name: The name of the page
+            platform_folder: Path to the platform folder (for finding media)
+            
+        Returns:
+            Dict containing the result of the posting operation
+        """
+        return await asyncio.to_thread(self.post_content, content, page_name, platform_folder)
+    
+    def rate_limited(self, endpoint: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call an API function under this platform's rate limit for an endpoint.
+        
+        Args:
+            endpoint: Name of the endpoint, as used in config/rate_limits.json
+            func: Function making the request
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            Whatever func returns
+        """
+        return self.rate_limiter.call(self.name, endpoint, func, *args, **kwargs)
+    
+    async def rate_limited_async(
+        self, endpoint: str, func: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        """
+        Await an async API function under this platform's rate limit for an endpoint.
+        
+        Args:
+            endpoint: Name of the endpoint, as used in config/rate_limits.json
+            func: Coroutine function making the request
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            Whatever func returns
+        """
+        return await self.rate_limiter.call_async(self.name, endpoint, func, *args, **kwargs)
+    
     def find_media_files(self, platform_folder: str) -> List[str]:
         """
         Find media files in the platform folder.
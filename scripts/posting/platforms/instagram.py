@@ -76,6 +76,9 @@ class InstagramPlatform(SocialMediaPlatform):
             # PLACEHOLDER: In a real implementation, this would use the Instagram API
             # to post the content and media files
 
+            # Respect the platform rate limit as a real API call would
+            self.rate_limiter.acquire(self.name)
+
             # For now, just log what would be posted
             print(f"[PLACEHOLDER] Would post to Instagram:")
             print(f"Caption: {content}")
@@ -3,12 +3,41 @@ LinkedIn platform implementation using LinkedIn API for personal profile posts
 """
 import os
 import glob
+import json
+import time
+import asyncio
+import hashlib
+import threading
+import httpx
 import requests
 import mimetypes
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
 from ..platforms import SocialMediaPlatform
+from ..media_cache import MediaCache
+from ..results_log import write_json_atomic
+from ..state import state_path
+from ..transport import get_transport
+
+UGC_POSTS_URL = "https://api.linkedin.com/v2/ugcPosts"
+REGISTER_UPLOAD_URL = "https://api.linkedin.com/v2/assets?action=registerUpload"
+
+# Bytes read from disk at a time when streaming an upload
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# How long a cached member ID is trusted before asking LinkedIn again
+USER_ID_TTL = 7 * 24 * 3600
+
+# Files uploaded (or parts of one file) at the same time
+UPLOAD_WORKERS = 4
+
+# Videos larger than this use LinkedIn's multipart upload
+MULTIPART_THRESHOLD = 200 * 1024 * 1024
+
+# How long an uploaded asset URN is reused for the same file
+MEDIA_ID_TTL = 30 * 24 * 3600
 
 class LinkedInPlatform(SocialMediaPlatform):
     """LinkedIn platform implementation using LinkedIn API for personal profile posts."""
@@ -17,6 +46,11 @@ class LinkedInPlatform(SocialMediaPlatform):
         super().__init__("LinkedIn")
         self._verify_credentials()
         
+        # Keep-alive session on the shared connection pools
+        self.session = get_transport().session()
+        self.user_id = os.getenv("LINKEDIN_USER_ID") or None
+        self._user_id_lock = threading.Lock()
+        
     
     def _verify_credentials(self):
         required_creds = ["LINKEDIN_ACCESS_TOKEN"]
@@ -25,6 +59,40 @@ class LinkedInPlatform(SocialMediaPlatform):
             raise ValueError(f"Missing credentials: {', '.join(missing)}")
     
     def _get_user_id(self) -> str:
+        """
+        Get the user's LinkedIn ID.
+        
+        Uses LINKEDIN_USER_ID when set, then a cache on disk keyed by the access
+        token, and only asks the userinfo endpoint when neither has it.
+        """
+        with self._user_id_lock:
+            if self.user_id:
+                return self.user_id
+            
+            token = os.getenv("LINKEDIN_ACCESS_TOKEN", "")
+            token_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+            cache_file = state_path("linkedin_user_ids.json")
+            
+            cache = {}
+            if cache_file.exists():
+                try:
+                    with open(cache_file, "r", encoding="utf-8") as f:
+                        cache = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    cache = {}
+            
+            entry = cache.get(token_key)
+            if entry and time.time() - entry.get("fetched_at", 0) < USER_ID_TTL:
+                self.user_id = entry["user_id"]
+                return self.user_id
+            
+            self.user_id = self._fetch_user_id()
+            if self.user_id:
+                cache[token_key] = {"user_id": self.user_id, "fetched_at": time.time()}
+                write_json_atomic(cache_file, cache)
+            return self.user_id
+    
+    def _fetch_user_id(self) -> str:
         """Get the user's LinkedIn ID using the userinfo endpoint."""
         try:
             headers = {
@@ -32,7 +100,9 @@ class LinkedInPlatform(SocialMediaPlatform):
                 "Content-Type": "application/json",
             }
             
-            response = requests.get(
+            response = self.rate_limited(
+                "default",
+                self.session.get,
                 "https://api.linkedin.com/v2/userinfo",
                 headers=headers
             )
@@ -99,8 +169,8 @@ class LinkedInPlatform(SocialMediaPlatform):
         Returns:
             Dict containing the result of the posting operation
         """
-        self.user_id = self._get_user_id()
         try:
+            self._get_user_id()
             if not self.user_id:
                 raise ValueError("LinkedIn user ID not available")
             
@@ -118,183 +188,223 @@ class LinkedInPlatform(SocialMediaPlatform):
             error_msg = f"LinkedIn API Error: {str(e)}"
             return self.create_error_result(page_name, content, error_msg)
     
-    def _post_text_only(self, content: str) -> Dict[str, Any]:
-        """Post text content without media."""
-        headers = {
+    def _api_headers(self) -> Dict[str, str]:
+        """Headers for LinkedIn REST API calls."""
+        return {
             "Authorization": f"Bearer {os.getenv('LINKEDIN_ACCESS_TOKEN')}",
             "Content-Type": "application/json",
             "X-Restli-Protocol-Version": "2.0.0",
         }
+    
+    def _share_data(
+        self, content: str, media_files: List[str] = (), media_ids: List[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        Build the ugcPosts request body.
+        
+        Args:
+            content: The text of the post
+            media_files: Paths of the media files, to tell images from video
+            media_ids: Uploaded asset URNs; a text-only post when empty
+            
+        Returns:
+            The request body
+        """
+        share_content = {
+            "shareCommentary": {
+                "text": content
+            },
+            "shareMediaCategory": "NONE"
+        }
         
-        post_data = {
+        if media_ids:
+            # Determine media category based on the first media file
+            mime_type, _ = mimetypes.guess_type(media_files[0])
+            is_video = bool(mime_type and mime_type.startswith('video/'))
+            share_content["shareMediaCategory"] = "VIDEO" if is_video else "IMAGE"
+            
+            # For videos, don't include a title/caption
+            media_entities = []
+            for media_id in media_ids:
+                media_entity = {
+                    "status": "READY",
+                    "media": media_id
+                }
+                if not is_video:
+                    media_entity["title"] = {
+                        "text": "Media content"
+                    }
+                media_entities.append(media_entity)
+            share_content["media"] = media_entities
+        
+        return {
             "author": f"urn:li:person:{self.user_id}",
             "lifecycleState": "PUBLISHED",
             "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {
-                        "text": content
-                    },
-                    "shareMediaCategory": "NONE"
-                }
+                "com.linkedin.ugc.ShareContent": share_content
             },
             "visibility": {
                 "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
             }
         }
+    
+    def _share_result(
+        self, response: Any, content: str, media_files: List[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        Turn the ugcPosts response into a result.
         
-        response = requests.post(
-            "https://api.linkedin.com/v2/ugcPosts",
-            headers=headers,
-            json=post_data
-        )
-        
+        Args:
+            response: requests or httpx response
+            content: The text of the post
+            media_files: Paths of the media files attached to the post
+            
+        Returns:
+            The success result
+            
+        Raises:
+            ValueError: If LinkedIn did not create the post
+        """
         if response.status_code == 201:
-            post_data = response.json()
             # Get the post ID from the response
-            post_id = post_data.get("id", "")
-            
-            # Extract the activity ID from the post ID
-            activity_id = post_id.split(":")[-1] if ":" in post_id else post_id
+            post_id = response.json().get("id", "")
             
             # Construct the URL - use the original post ID format for the URL
             post_url = f"https://www.linkedin.com/feed/update/{post_id}"
             return self.create_success_result("personal_profile", content, post_id, post_url)
-        else:
-            raise ValueError(f"LinkedIn API Error: {response.status_code} - {response.text}")
+        
+        # A rejected asset should be uploaded afresh on the next attempt
+        if media_files and response.status_code in (400, 422):
+            for media_file in media_files:
+                self.media_cache.invalidate(
+                    self.name, self.user_id, MediaCache.file_hash(media_file)
+                )
+        raise ValueError(f"LinkedIn API Error: {response.status_code} - {response.text}")
+    
+    def _post_text_only(self, content: str) -> Dict[str, Any]:
+        """Post text content without media."""
+        response = self.rate_limited(
+            "ugcPosts",
+            self.session.post,
+            UGC_POSTS_URL,
+            headers=self._api_headers(),
+            json=self._share_data(content)
+        )
+        return self._share_result(response, content)
     
     def _post_with_media(self, content: str, media_files: List[str]) -> Dict[str, Any]:
         """Post content with media attachments."""
         if not media_files:
             return self._post_text_only(content)
         
-        media_ids = []
-        for media_file in media_files:
-            media_id = self._upload_media(media_file)
-            if media_id:
-                media_ids.append(media_id)
+        # Register and upload every file at once, keeping the post's order;
+        # files already uploaded to this account reuse their asset URN
+        def upload(media_file: str) -> Optional[str]:
+            return self.media_cache.get_or_upload(
+                self.name, self.user_id, media_file, self._upload_media, MEDIA_ID_TTL
+            )
+        
+        with ThreadPoolExecutor(max_workers=min(len(media_files), UPLOAD_WORKERS)) as executor:
+            uploaded = list(executor.map(upload, media_files))
+        media_ids = [media_id for media_id in uploaded if media_id]
         
         if not media_ids:
             # Fall back to text-only post if media upload fails
             return self._post_text_only(content)
         
-        # Create post with media
-        headers = {
-            "Authorization": f"Bearer {os.getenv('LINKEDIN_ACCESS_TOKEN')}",
-            "Content-Type": "application/json",
-            "X-Restli-Protocol-Version": "2.0.0",
-        }
+        response = self.rate_limited(
+            "ugcPosts",
+            self.session.post,
+            UGC_POSTS_URL,
+            headers=self._api_headers(),
+            json=self._share_data(content, media_files, media_ids)
+        )
+        return self._share_result(response, content, media_files)
+    
+    def _register_request(self, media_file: str) -> Tuple[Dict[str, Any], str, int]:
+        """
+        Build the registerUpload request body for a file.
+        
+        Args:
+            media_file: Path to the media file
+            
+        Returns:
+            Tuple of (request body, MIME type, file size)
+        """
+        mime_type, _ = mimetypes.guess_type(media_file)
         
-        # Determine media category based on the first media file
-        first_media_file = media_files[0]
-        mime_type, _ = mimetypes.guess_type(first_media_file)
+        if not mime_type:
+            raise ValueError(f"Could not determine MIME type for {media_file}")
         
-        if mime_type and mime_type.startswith('video/'):
-            media_category = "VIDEO"
+        file_size = os.path.getsize(media_file)
+        
+        # Determine the appropriate recipe based on media type
+        is_video = mime_type and mime_type.startswith('video/')
+        
+        if is_video:
+            recipe = "urn:li:digitalmediaRecipe:feedshare-video"
         else:
-            media_category = "IMAGE"
+            recipe = "urn:li:digitalmediaRecipe:feedshare-image"
         
-        # Create media entities
-        media_entities = []
-        for media_id in media_ids:
-            # For videos, don't include a title/caption
-            if mime_type and mime_type.startswith('video/'):
-                media_entity = {
-                    "status": "READY",
-                    "media": media_id
-                }
-            else:
-                media_entity = {
-                    "status": "READY",
-                    "media": media_id,
-                    "title": {
-                        "text": "Media content"
+        register_data = {
+            "registerUploadRequest": {
+                "recipes": [
+                    recipe
+                ],
+                "owner": f"urn:li:person:{self.user_id}",
+                "serviceRelationships": [
+                    {
+                        "relationshipType": "OWNER",
+                        "identifier": "urn:li:userGeneratedContent"
                     }
-                }
-            media_entities.append(media_entity)
-        
-        # Create post data
-        post_data = {
-            "author": f"urn:li:person:{self.user_id}",
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {
-                        "text": content
-                    },
-                    "shareMediaCategory": media_category,
-                    "media": media_entities
-                }
-            },
-            "visibility": {
-                "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
+                ]
             }
         }
         
-        # Send request to LinkedIn API
-        response = requests.post(
-            "https://api.linkedin.com/v2/ugcPosts",
-            headers=headers,
-            json=post_data
-        )
+        # Large videos are uploaded in parts
+        if is_video and file_size > MULTIPART_THRESHOLD:
+            register_data["registerUploadRequest"]["supportedUploadMechanism"] = ["MULTIPART_UPLOAD"]
+            register_data["registerUploadRequest"]["fileSize"] = file_size
         
-        # Process response
-        if response.status_code == 201:
-            post_data = response.json()
-            # Get the post ID from the response
-            post_id = post_data.get("id", "")
-            
-            # Extract the activity ID from the post ID
-            activity_id = post_id.split(":")[-1] if ":" in post_id else post_id
+        return register_data, mime_type, file_size
+    
+    @staticmethod
+    def _single_upload(upload_mechanism: Dict[str, Any], mime_type: str) -> Tuple[str, Dict[str, str]]:
+        """
+        Get the URL and headers for uploading a file in one request.
+        
+        Args:
+            upload_mechanism: "uploadMechanism" of the registerUpload response
+            mime_type: MIME type of the file
             
-            # Construct the URL - use the original post ID format for the URL
-            post_url = f"https://www.linkedin.com/feed/update/{post_id}"
-            return self.create_success_result("personal_profile", content, post_id, post_url)
-        else:
-            raise ValueError(f"LinkedIn API Error: {response.status_code} - {response.text}")
+        Returns:
+            Tuple of (upload URL, headers)
+        """
+        # Extract the upload URL from the nested structure
+        upload_request = upload_mechanism.get("com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest", {})
+        upload_url = upload_request.get("uploadUrl", "")
+        
+        # Set up headers with authorization and content type
+        upload_headers = {
+            "Authorization": f"Bearer {os.getenv('LINKEDIN_ACCESS_TOKEN')}",
+            "Content-Type": mime_type  # Set the correct content type based on the file
+        }
+        
+        # Add any additional headers from the response
+        upload_headers.update(upload_request.get("headers", {}))
+        return upload_url, upload_headers
     
     def _upload_media(self, media_file: str) -> Optional[str]:
         """Upload media to LinkedIn and return the media URN."""
         try:
-            access_token = os.getenv("LINKEDIN_ACCESS_TOKEN")
-            mime_type, _ = mimetypes.guess_type(media_file)
-            
-            if not mime_type:
-                raise ValueError(f"Could not determine MIME type for {media_file}")
-            
             # Step 1: Register upload
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json",
-                "X-Restli-Protocol-Version": "2.0.0",
-            }
-            
-            # Determine the appropriate recipe based on media type
-            is_video = mime_type and mime_type.startswith('video/')
-            
-            if is_video:
-                recipe = "urn:li:digitalmediaRecipe:feedshare-video"
-            else:
-                recipe = "urn:li:digitalmediaRecipe:feedshare-image"
-            
-            register_data = {
-                "registerUploadRequest": {
-                    "recipes": [
-                        recipe
-                    ],
-                    "owner": f"urn:li:person:{self.user_id}",
-                    "serviceRelationships": [
-                        {
-                            "relationshipType": "OWNER",
-                            "identifier": "urn:li:userGeneratedContent"
-                        }
-                    ]
-                }
-            }
-            
-            init_url = "https://api.linkedin.com/v2/assets?action=registerUpload"
+            register_data, mime_type, file_size = self._register_request(media_file)
+            headers = self._api_headers()
             
-            response = requests.post(
-                init_url,
+            response = self.rate_limited(
+                "assets",
+                self.session.post,
+                REGISTER_UPLOAD_URL,
                 headers=headers,
                 json=register_data
             )
@@ -304,39 +414,226 @@ class LinkedInPlatform(SocialMediaPlatform):
             
             response_json = response.json()
             
-            # Extract the upload URL from the nested structure
-            upload_mechanism = response_json.get("value", {}).get("uploadMechanism", {})
-            upload_request = upload_mechanism.get("com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest", {})
-            upload_url = upload_request.get("uploadUrl", "")
-            
             # Get the asset ID
             asset_id = response_json.get("value", {}).get("asset", "")
+            upload_mechanism = response_json.get("value", {}).get("uploadMechanism", {})
             
+            # Step 2: Upload the file
+            if "com.linkedin.digitalmedia.uploading.MultipartUpload" in upload_mechanism:
+                self._upload_parts(
+                    media_file,
+                    mime_type,
+                    response_json["value"],
+                    upload_mechanism["com.linkedin.digitalmedia.uploading.MultipartUpload"],
+                    headers
+                )
+                return asset_id
+            
+            upload_url, upload_headers = self._single_upload(upload_mechanism, mime_type)
             if not upload_url or not asset_id:
                 raise ValueError("Failed to get upload URL or asset ID")
             
-            # Step 2: Upload the file
-            with open(media_file, "rb") as f:
-                file_data = f.read()
+            upload_response = self.rate_limited(
+                "assets",
+                self._put_file,
+                upload_url,
+                upload_headers,
+                media_file,
+                0,
+                file_size
+            )
+            
+            if upload_response.status_code not in (200, 201):
+                raise ValueError(f"Failed to upload media: {upload_response.status_code} - {upload_response.text}")
+            
+            return asset_id
+            
+        except Exception as e:
+            print(f"Error uploading media: {str(e)}")
+            return None
+    
+    def _put_file(
+        self, url: str, headers: Dict[str, str], media_file: str, offset: int, length: int
+    ) -> requests.Response:
+        """
+        PUT a byte range of a file, streaming it from disk.
+        
+        The file is opened on every call so a rate-limited retry sends the
+        whole range again.
+        
+        Args:
+            url: Upload URL
+            headers: Request headers
+            media_file: Path to the media file
+            offset: First byte of the range
+            length: Number of bytes in the range
+            
+        Returns:
+            The HTTP response
+        """
+        with open(media_file, "rb") as f:
+            return self.session.put(
+                url,
+                headers=headers,
+                data=_FileRange(f, offset, length)
+            )
+    
+    def _upload_parts(
+        self,
+        media_file: str,
+        mime_type: str,
+        register_value: Dict[str, Any],
+        multipart_upload: Dict[str, Any],
+        headers: Dict[str, str]
+    ):
+        """
+        Upload a large file in the parts LinkedIn asked for, then complete the upload.
+        
+        Args:
+            media_file: Path to the media file
+            mime_type: MIME type of the file
+            register_value: "value" of the registerUpload response
+            multipart_upload: The MultipartUpload upload mechanism
+            headers: Headers for LinkedIn API calls
+        """
+        def upload_part(part: Dict[str, Any]) -> Dict[str, Any]:
+            byte_range = part["byteRange"]
+            first_byte = byte_range["firstByte"]
+            length = byte_range["lastByte"] - first_byte + 1
+            part_headers = {"Content-Type": mime_type}
+            part_headers.update(part.get("headers", {}))
+            
+            response = self.rate_limited(
+                "assets",
+                self._put_file,
+                part["url"],
+                part_headers,
+                media_file,
+                first_byte,
+                length
+            )
+            if response.status_code not in (200, 201):
+                raise ValueError(f"Failed to upload part: {response.status_code} - {response.text}")
+            return {
+                "httpStatusCode": response.status_code,
+                "headers": {"ETag": response.headers.get("ETag", "")}
+            }
+        
+        parts = multipart_upload.get("partUploadRequests", [])
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+            part_responses = list(executor.map(upload_part, parts))
+        
+        complete_data = {
+            "completeMultipartUploadRequest": {
+                "mediaArtifact": register_value.get("mediaArtifact", ""),
+                "metadata": multipart_upload.get("metadata", ""),
+                "partUploadResponses": part_responses
+            }
+        }
+        response = self.rate_limited(
+            "assets",
+            self.session.post,
+            "https://api.linkedin.com/v2/assets?action=completeMultipartUpload",
+            headers=headers,
+            json=complete_data
+        )
+        if response.status_code not in (200, 201):
+            raise ValueError(f"Failed to complete upload: {response.status_code} - {response.text}")
+
+
+    async def post_content_async(
+        self, 
+        content: str, 
+        page_name: str, 
+        platform_folder: str = None
+    ) -> Dict[str, Any]:
+        """
+        Post content to LinkedIn personal profile with an async HTTP client.
+        
+        Args:
+            content: The content to post
+            page_name: Not used (kept for compatibility)
+            platform_folder: Path to the platform folder (for finding media)
+            
+        Returns:
+            Dict containing the result of the posting operation
+        """
+        try:
+            # Usually answered from LINKEDIN_USER_ID or the cache on disk
+            await asyncio.to_thread(self._get_user_id)
+            if not self.user_id:
+                raise ValueError("LinkedIn user ID not available")
+            
+            media_files = self.find_media_files(platform_folder) if platform_folder else []
+            
+            async with get_transport().async_client() as client:
+                # Files already uploaded to this account reuse their asset URN
+                async def upload(media_file: str) -> Optional[str]:
+                    return await self._upload_media_async(client, media_file)
                 
-                # Get additional headers if provided in the response
-                additional_headers = upload_request.get("headers", {})
+                uploaded = await asyncio.gather(*(
+                    self.media_cache.get_or_upload_async(
+                        self.name, self.user_id, media_file, upload, MEDIA_ID_TTL
+                    )
+                    for media_file in media_files
+                ))
+                media_ids = [media_id for media_id in uploaded if media_id]
                 
-                # Set up headers with authorization and content type
-                upload_headers = {
-                    "Authorization": f"Bearer {access_token}",
-                    "Content-Type": mime_type  # Set the correct content type based on the file
-                }
+                # Fall back to a text-only post if media upload fails
+                if not media_ids:
+                    media_files = []
                 
-                # Add any additional headers from the response
-                upload_headers.update(additional_headers)
+                response = await self.rate_limited_async(
+                    "ugcPosts",
+                    client.post,
+                    UGC_POSTS_URL,
+                    headers=self._api_headers(),
+                    json=self._share_data(content, media_files, media_ids),
+                )
+                return self._share_result(response, content, media_files)
                 
-                upload_response = requests.put(
-                    upload_url,
-                    headers=upload_headers,
-                    data=file_data
+        except Exception as e:
+            error_msg = f"LinkedIn API Error: {str(e)}"
+            return self.create_error_result(page_name, content, error_msg)
+    
+    async def _upload_media_async(self, client: httpx.AsyncClient, media_file: str) -> Optional[str]:
+        """Upload media to LinkedIn from an event loop and return the media URN."""
+        try:
+            register_data, mime_type, file_size = self._register_request(media_file)
+            headers = self._api_headers()
+            
+            response = await self.rate_limited_async(
+                "assets", client.post, REGISTER_UPLOAD_URL, headers=headers, json=register_data
+            )
+            if response.status_code != 200:
+                raise ValueError(f"Failed to initialize upload: {response.status_code} - {response.text}")
+            
+            value = response.json().get("value", {})
+            asset_id = value.get("asset", "")
+            upload_mechanism = value.get("uploadMechanism", {})
+            
+            # Large videos are uploaded in parts by the thread-based uploader
+            if "com.linkedin.digitalmedia.uploading.MultipartUpload" in upload_mechanism:
+                await asyncio.to_thread(
+                    self._upload_parts,
+                    media_file,
+                    mime_type,
+                    value,
+                    upload_mechanism["com.linkedin.digitalmedia.uploading.MultipartUpload"],
+                    headers
                 )
+                return asset_id
+            
+            upload_url, upload_headers = self._single_upload(upload_mechanism, mime_type)
+            if not upload_url or not asset_id:
+                raise ValueError("Failed to get upload URL or asset ID")
             
+            # A fresh stream of the file is made for every attempt
+            upload_headers["Content-Length"] = str(file_size)
+            upload_response = await self.rate_limited_async(
+                "assets",
+                lambda: client.put(upload_url, headers=upload_headers, content=_read_chunks(media_file)),
+            )
             if upload_response.status_code not in (200, 201):
                 raise ValueError(f"Failed to upload media: {upload_response.status_code} - {upload_response.text}")
             
@@ -345,3 +642,36 @@ class LinkedInPlatform(SocialMediaPlatform):
         except Exception as e:
             print(f"Error uploading media: {str(e)}")
             return None
+
+
+async def _read_chunks(media_file: str):
+    """Stream a file for an async upload without blocking the event loop on disk reads."""
+    with open(media_file, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+
+class _FileRange:
+    """Read-only view of a byte range of an open file, streamed by requests."""
+    
+    def __init__(self, f, offset: int, length: int):
+        self._file = f
+        self._remaining = length
+        self._length = length
+        f.seek(offset)
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
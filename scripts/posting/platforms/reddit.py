@@ -81,6 +81,9 @@ class RedditPlatform(SocialMediaPlatform):
             # PLACEHOLDER: In a real implementation, this would use the Reddit API
             # to post the content and media files
 
+            # Respect the platform rate limit as a real API call would
+            self.rate_limiter.acquire(self.name)
+
             # For now, just log what would be posted
             print(f"[PLACEHOLDER] Would post to Reddit:")
             print(f"Title: {page_name}")
@@ -3,20 +3,109 @@ Resend platform implementation using Resend API for email sending
 """
 
 import os
+import asyncio
 import glob
 import json
+import requests
 import resend
 import markdown
 import base64
-from typing import Dict, Any, List, Optional, Literal
+from typing import Dict, Any, List, Optional, Literal, Tuple
+from html import escape
 from pathlib import Path
+from urllib.parse import quote
 from ..platforms import SocialMediaPlatform
+from ..post_index import get_post_index, split_page_name
 from ..email_subscribers import EmailSubscriberManager
+from ..subscriber_cache import SubscriberCache
+from ..ledger import PublishLedger
+from ..email_campaigns import CampaignLedger, SENT, FAILED, SKIPPED
+from ..email_campaign_sender import EmailCampaignSender
+from ..transport import get_transport
+from .resend_batch import ResendBatchSender
 import time
 
 # Define content type literals
 ContentType = Literal["plain", "markdown", "html"]
 
+# How media from the media/ folder goes into emails (EMAIL_MEDIA_MODE):
+# "attach" sends every file base64-encoded with each email, and "hosted"
+# links to the published files with <img> tags
+EMAIL_MEDIA_MODES = ("attach", "hosted")
+
+
+class PooledResendClient:
+    """HTTP client for the Resend SDK that uses the shared connection pools."""
+
+    def __init__(self):
+        self.session = get_transport().session()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        json: Optional[Any] = None,
+        files: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, str]] = None,
+    ) -> Tuple[bytes, int, Dict[str, str]]:
+        """
+        Make a request for the SDK.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            headers: Request headers
+            json: JSON body, unless data or files are given
+            files: Files to upload
+            data: Form data
+
+        Returns:
+            The response body, status code and headers
+
+        Raises:
+            RuntimeError: If the request fails, which the SDK reports as an HTTP client error
+        """
+        try:
+            response = self.session.request(
+                method,
+                url,
+                headers=headers,
+                json=json if data is None and files is None else None,
+                files=files,
+                data=data,
+            )
+            return response.content, response.status_code, response.headers
+        except requests.RequestException as e:
+            raise RuntimeError(f"Request failed: {e}") from e
+
+
+class EmailTemplate:
+    """Email HTML rendered once per post, with a slot for each subscriber's unsubscribe URL."""
+
+    SLOT = "{{unsubscribe_url}}"
+
+    def __init__(self, html: str):
+        """
+        Precompile the rendered HTML.
+
+        Args:
+            html: Email HTML with every placeholder but the unsubscribe URL filled in
+        """
+        self.parts = html.split(self.SLOT)
+
+    def render(self, unsubscribe_url: str) -> str:
+        """
+        Fill in the unsubscribe URL.
+
+        Args:
+            unsubscribe_url: The subscriber's unsubscribe URL
+
+        Returns:
+            The subscriber's email HTML
+        """
+        return unsubscribe_url.join(self.parts)
+
 
 class ResendPlatform(SocialMediaPlatform):
     """Resend platform implementation for sending emails."""
@@ -25,6 +114,21 @@ class ResendPlatform(SocialMediaPlatform):
         super().__init__("Resend")
         self._verify_credentials()
         self.subscriber_manager = EmailSubscriberManager()
+        self.session = get_transport().session()
+        self.batch_sender = ResendBatchSender(
+            self.rate_limited,
+            self.rate_limited_async,
+            backoff_delay=self.rate_limiter.backoff_delay,
+        )
+        # Queueing, sending and tracking campaigns is left to the sender;
+        # this class renders the email and talks to Resend
+        self.campaign_sender = EmailCampaignSender(
+            self.batch_sender,
+            self.rate_limiter,
+            self.name,
+            subscriber_cache=SubscriberCache(manager=self.subscriber_manager),
+            campaigns=CampaignLedger(),
+        )
 
     def _verify_credentials(self):
         required_creds = ["RESEND_API_KEY"]
@@ -34,6 +138,8 @@ class ResendPlatform(SocialMediaPlatform):
 
         # Initialize Resend client
         resend.api_key = os.getenv("RESEND_API_KEY")
+        # Send SDK requests over the shared connection pools
+        resend.default_http_client = PooledResendClient()
 
     def find_media_files(self, platform_folder: str) -> List[str]:
         """
@@ -71,8 +177,6 @@ class ResendPlatform(SocialMediaPlatform):
         platform_folder: str = None,
         content_type: ContentType = "markdown",
     ) -> Dict[str, Any]:
-        # Extract blog post data from the original markdown file
-        blog_data = self._extract_blog_post_data(page_name)
         """
         Send content via email to all subscribers using Resend.
 
@@ -85,162 +189,338 @@ class ResendPlatform(SocialMediaPlatform):
             Dict containing the result of the sending operation
         """
         try:
-            # Get sender email from environment variable or use default
-            from_email = os.getenv("RESEND_FROM_EMAIL", "onboarding@resend.dev")
-
-            # Get active subscribers
-            subscribers = self.subscriber_manager.get_active_subscribers()
-
-            if not subscribers:
-                return self.create_success_result(
-                    page_name,
-                    content,
-                    f"",
-                    "No active subscribers found.",
-                )
+            campaign = self._start_campaign(content, page_name, platform_folder, content_type)
+            content = campaign["email"]["content"]
 
-            # Check if there are media files
-            media_files = (
-                self.find_media_files(platform_folder) if platform_folder else []
+            started = time.monotonic()
+            sent_this_run = self.campaign_sender.send(campaign)
+            return self._campaign_result(
+                page_name, campaign, sent_this_run, time.monotonic() - started
             )
-            blog_data = self._extract_blog_post_data(page_name)
-            readable_page_name = blog_data["title"]
-
-            # Extract subject from content if it starts with "SUBJECT:"
-            subject_line = None
-            if content.startswith("SUBJECT:"):
-                # Extract the subject line from the content
-                subject_line_end = content.find("\n")
-                if subject_line_end > 0:
-                    subject_line = content[8:subject_line_end].strip()
-                    # Remove the subject line from the content
-                    content = content[subject_line_end:].strip()
-
-            # Use extracted subject or fallback to page name
-            subject = subject_line or f"Blog Post: {readable_page_name}"
-
-            # Prepare attachments if there are media files
-            attachments = []
-            for media_file in media_files:
-                try:
-                    with open(media_file, "rb") as f:
-                        file_content = f.read()
-                        # Encode file content as base64 string
-                        file_content_b64 = base64.b64encode(file_content).decode('utf-8')
-                        filename = os.path.basename(media_file)
-                        
-                        # Determine MIME type based on file extension
-                        file_ext = os.path.splitext(filename)[1].lower()
-                        mime_type_map = {
-                            '.jpg': 'image/jpeg',
-                            '.jpeg': 'image/jpeg',
-                            '.png': 'image/png',
-                            '.gif': 'image/gif'
-                        }
-                        content_type = mime_type_map.get(file_ext, 'application/octet-stream')
-                        
-                        attachments.append({
-                            "content": file_content_b64,
-                            "filename": filename,
-                            "type": content_type
-                        })
-                except Exception as e:
-                    print(f"Error reading media file {media_file}: {str(e)}")
-
-            # Get all subscriber emails
-            subscriber_emails = [s.get("email") for s in subscribers]
-
-            # Remove any None or empty emails
-            subscriber_emails = [email for email in subscriber_emails if email]
-
-            if not subscriber_emails:
-                raise ValueError("No valid subscriber emails found")
+        except Exception as e:
+            error_msg = f"Resend API Error: {str(e)}"
+            return self.create_error_result(page_name, content, error_msg)
 
-            print(
-                f"Sending email to {len(subscriber_emails)} subscribers in batch mode..."
-            )
+    async def post_content_async(
+        self,
+        content: str,
+        page_name: str,
+        platform_folder: str = None,
+        content_type: ContentType = "markdown",
+    ) -> Dict[str, Any]:
+        """
+        Send content via email to all subscribers from an event loop.
 
-            # Get the base URL for the unsubscribe endpoint
-            base_url = os.getenv("SUPABASE_SUBSCRIBE_FUNCTION_URL", "")
-            if not base_url:
-                # Fallback to constructing from SUPABASE_URL if available
-                supabase_url = os.getenv("SUPABASE_URL", "")
-                if supabase_url:
-                    # Convert from https://project-ref.supabase.co to https://project-ref.functions.supabase.co
-                    base_url = supabase_url.replace(
-                        ".supabase.co", ".functions.supabase.co"
-                    )
-                    base_url = f"{base_url}/email_subscriptions/unsubscribe"
-
-            # Send emails individually to each subscriber
-            successful_sends = 0
-            failed_sends = 0
-
-            print(f"Sending individual emails to {len(subscribers)} subscribers...")
-
-            for subscriber in subscribers:
-                subscriber_id = subscriber.get("id", "")
-                subscriber_email = subscriber.get("email", "")
-                blog_data["unsubscribe_url"] = f"{base_url}?id={subscriber_id}"
-                html_content = self._generate_html_email(
-                    page_name, content, content_type, blog_data
-                )
+        Batches are sent with an async HTTP client, many at a time, under the
+        Resend rate limits. Sharded campaigns are still sent by worker processes.
 
-                if not subscriber_id or not subscriber_email:
-                    print(f"Skipping subscriber with missing ID or email: {subscriber}")
-                    continue
-
-                try:
-                    # Prepare email parameters for individual sending
-                    params = {
-                        "from": from_email,
-                        "to": subscriber_email,
-                        "subject": subject,
-                        "html": html_content,
-                        "text": content,
-                    }
-
-                    # Add attachments if any
-                    if attachments:
-                        params["attachments"] = attachments
-
-                    # Send the email to the individual subscriber
-                    print(f"Sending email to {subscriber_email}...")
-                    response = resend.Emails.send(params)
-
-                    # Check if send was successful
-                    if response.get("id"):
-                        print(f"✅ Successfully sent to {subscriber_email}")
-                        successful_sends += 1
-                    else:
-                        print(
-                            f"❌ Failed to send to {subscriber_email}: No ID returned"
-                        )
-                        failed_sends += 1
-                    time.sleep(0.5)
-
-                except Exception as e:
-                    print(f"❌ Error sending to {subscriber_email}: {str(e)}")
-                    failed_sends += 1
-
-            # Create result based on overall success
-            if successful_sends > 0:
-                result_message = f"Sent to {successful_sends} subscribers"
-                if failed_sends > 0:
-                    result_message += f" ({failed_sends} failed)"
-
-                return self.create_success_result(
-                    page_name,
-                    content,
-                    f"batch-{page_name.replace(' ', '-')}",
-                    f"Sent to {successful_sends} subscribers",
-                )
-            else:
-                raise ValueError(f"Failed to send emails to any subscribers")
+        Args:
+            content: The content to send
+            page_name: The name of the page (used as email subject)
+            platform_folder: Path to the platform folder (for finding media)
+
+        Returns:
+            Dict containing the result of the sending operation
+        """
+        try:
+            # Reads the post and media files and renders the email
+            campaign = await asyncio.to_thread(
+                self._start_campaign, content, page_name, platform_folder, content_type
+            )
+            content = campaign["email"]["content"]
+
+            started = time.monotonic()
+            sent_this_run = await self.campaign_sender.send_async(campaign)
+            return await asyncio.to_thread(
+                self._campaign_result,
+                page_name,
+                campaign,
+                sent_this_run,
+                time.monotonic() - started,
+            )
         except Exception as e:
             error_msg = f"Resend API Error: {str(e)}"
             return self.create_error_result(page_name, content, error_msg)
 
+    def _start_campaign(
+        self,
+        content: str,
+        page_name: str,
+        platform_folder: Optional[str],
+        content_type: ContentType,
+    ) -> Dict[str, Any]:
+        """
+        Prepare a post's email and start queueing its recipients.
+
+        Args:
+            content: The content to send, optionally starting with a "SUBJECT:" line
+            page_name: The name of the page
+            platform_folder: Path to the platform folder (for finding media)
+            content_type: Type of the content
+
+        Returns:
+            Dict with the campaign's ledger "id", outbox "key", number of
+            "shards", the "queueing" thread (or None) and the "email"
+            keyword arguments for _send_batch
+        """
+        # Get sender email from environment variable or use default
+        from_email = os.getenv("RESEND_FROM_EMAIL", "onboarding@resend.dev")
+
+        # Check if there are media files
+        media_files = (
+            self.find_media_files(platform_folder) if platform_folder else []
+        )
+        blog_data = self._extract_blog_post_data(page_name)
+        readable_page_name = blog_data["title"]
+
+        # Extract subject from content if it starts with "SUBJECT:"
+        subject_line = None
+        if content.startswith("SUBJECT:"):
+            # Extract the subject line from the content
+            subject_line_end = content.find("\n")
+            if subject_line_end > 0:
+                subject_line = content[8:subject_line_end].strip()
+                # Remove the subject line from the content
+                content = content[subject_line_end:].strip()
+
+        # Use extracted subject or fallback to page name
+        subject = subject_line or f"Blog Post: {readable_page_name}"
+
+        # Attach the media, or reference it from the email body
+        attachments, media_html = self._prepare_media(media_files)
+
+        # Get the base URL for the unsubscribe endpoint
+        base_url = os.getenv("SUPABASE_SUBSCRIBE_FUNCTION_URL", "")
+        if not base_url:
+            # Fallback to constructing from SUPABASE_URL if available
+            supabase_url = os.getenv("SUPABASE_URL", "")
+            if supabase_url:
+                # Convert from https://project-ref.supabase.co to https://project-ref.functions.supabase.co
+                base_url = supabase_url.replace(
+                    ".supabase.co", ".functions.supabase.co"
+                )
+                base_url = f"{base_url}/email_subscriptions/unsubscribe"
+
+        # A campaign is this page, version and email; each recipient's
+        # outcome is recorded in the campaign ledger
+        version = ""
+        if platform_folder:
+            folder = Path(platform_folder)
+            if folder.is_file():
+                folder = folder.parent
+            if folder.name != self.name:
+                version = folder.name
+        content_hash = PublishLedger.content_hash(f"{subject}\n{content}", media_files)
+        campaign_id = CampaignLedger.campaign_id(page_name, version, content_hash)
+
+        # Render the email once; only the unsubscribe URL differs per subscriber
+        email = {
+            "from_email": from_email,
+            "subject": subject,
+            "content": content,
+            "email_template": self.compile_html_email(
+                page_name, content, content_type, blog_data, media_html
+            ),
+            "base_url": base_url,
+            "attachments": attachments,
+        }
+        return self.campaign_sender.start(campaign_id, page_name, version, content_hash, email)
+
+    def _campaign_result(
+        self,
+        page_name: str,
+        campaign: Dict[str, Any],
+        sent_this_run: int,
+        duration: float,
+    ) -> Dict[str, Any]:
+        """
+        Build the result of a campaign once its batches are sent.
+
+        Args:
+            page_name: The name of the page
+            campaign: The campaign from _start_campaign
+            sent_this_run: Emails sent by this run
+            duration: Seconds spent sending
+
+        Returns:
+            Dict containing the result of the sending operation. While batches
+            are left to other workers it is an error result whose "retry_in"
+            says when the publish can be tried again.
+
+        Raises:
+            ValueError: If the subscriber list could not be fetched, batches
+                used up their retries or no email was sent
+        """
+        content = campaign["email"]["content"]
+        campaign_id = campaign["id"]
+
+        sends_per_second = sent_this_run / duration if duration > 0 else 0.0
+        print(
+            f"📧 Sent {sent_this_run} emails in {duration:.1f}s "
+            f"({sends_per_second:.1f} emails/s)"
+        )
+
+        # Recipients still being queued, or batches leased by another
+        # (possibly dead) worker or waiting to be retried, are not finished:
+        # the publish is deferred until they can be taken over rather than
+        # reported done without them
+        status = self.campaign_sender.status(campaign)
+        if status["leased"] or status["pending"]:
+            result = self.create_error_result(
+                page_name,
+                content,
+                f"Campaign is not finished (leased elsewhere: {status['leased']}, "
+                f"waiting to be retried: {status['pending']})",
+            )
+            result["retry_in"] = status["ready_in"]
+            return result
+
+        if not status["recipients"]:
+            return self.create_success_result(
+                page_name,
+                content,
+                f"",
+                "No active subscribers found.",
+            )
+
+        # Count sends across the whole campaign, including earlier runs
+        successful_sends = status[SENT]
+        failed_sends = status[FAILED]
+
+        # Create result based on overall success
+        if successful_sends > 0:
+            result_message = f"Sent to {successful_sends} subscribers"
+            if failed_sends > 0:
+                result_message += f" ({failed_sends} failed)"
+
+            result = self.create_success_result(
+                page_name,
+                content,
+                f"batch-{page_name.replace(' ', '-')}",
+                result_message,
+            )
+            result["emails"] = {
+                "campaign_id": campaign_id,
+                "sent": successful_sends,
+                "failed": failed_sends,
+                "skipped": status[SKIPPED],
+                "duration_seconds": round(duration, 3),
+                "sends_per_second": round(sends_per_second, 2),
+            }
+            return result
+        else:
+            raise ValueError(f"Failed to send emails to any subscribers")
+
+    def _prepare_media(
+        self, media_files: List[str]
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Prepare the post's media for the email according to EMAIL_MEDIA_MODE.
+
+        Args:
+            media_files: Paths of the media files
+
+        Returns:
+            Tuple of (attachments, HTML for the template's {{media}} slot)
+        """
+        mode = (os.getenv("EMAIL_MEDIA_MODE") or "attach").lower()
+        if mode not in EMAIL_MEDIA_MODES:
+            print(f"WARNING: Unrecognized EMAIL_MEDIA_MODE '{mode}', attaching media")
+            mode = "attach"
+
+        mime_type_map = {
+            ".jpg": "image/jpeg",
+            ".jpeg": "image/jpeg",
+            ".png": "image/png",
+            ".gif": "image/gif",
+        }
+
+        attachments = []
+        images = []
+        for media_file in media_files:
+            filename = os.path.basename(media_file)
+            try:
+                if mode == "hosted":
+                    url = self.media_url(media_file)
+                    # The files are only hosted once the blog is deployed
+                    # with them; until then the email carries them instead
+                    if self._is_hosted(url):
+                        images.append((url, filename))
+                        continue
+                    print(f"WARNING: {url} is not reachable, attaching {filename} instead")
+
+                with open(media_file, "rb") as f:
+                    file_content_b64 = base64.b64encode(f.read()).decode("utf-8")
+                file_ext = os.path.splitext(filename)[1].lower()
+                attachments.append({
+                    "content": file_content_b64,
+                    "filename": filename,
+                    "content_type": mime_type_map.get(file_ext, "application/octet-stream"),
+                })
+            except Exception as e:
+                print(f"Error reading media file {media_file}: {str(e)}")
+
+        media_html = "".join(
+            f'<p><img src="{escape(src)}" alt="{escape(alt)}" /></p>' for src, alt in images
+        )
+        return attachments, media_html
+
+    def _is_hosted(self, url: str) -> bool:
+        """
+        Check that a media URL serves the file.
+
+        Args:
+            url: URL of the hosted file
+
+        Returns:
+            True if a HEAD request (or a GET, for hosts that refuse HEAD) succeeds
+        """
+        try:
+            response = self.session.head(url, allow_redirects=True)
+            if response.status_code == 405:
+                with self.session.get(url, stream=True) as response:
+                    return response.status_code < 400
+            return response.status_code < 400
+        except requests.RequestException as e:
+            print(f"Could not check {url}: {str(e)}")
+            return False
+
+    @staticmethod
+    def media_url(media_file: str) -> str:
+        """
+        Get the public URL of a media file published with the blog.
+
+        The file's path relative to the repository root is appended to
+        EMAIL_MEDIA_BASE_URL, or to BLOG_BASE_URL when that is not set.
+
+        Args:
+            media_file: Path to the media file
+
+        Returns:
+            URL of the hosted file
+        """
+        base_url = os.getenv("EMAIL_MEDIA_BASE_URL") or os.getenv(
+            "BLOG_BASE_URL", "https://blog.dannycastonguay.com"
+        )
+        path = Path(media_file).resolve()
+        try:
+            relative_path = path.relative_to(Path.cwd().resolve())
+        except ValueError:
+            relative_path = Path(path.name)
+        return f"{base_url.rstrip('/')}/{quote(relative_path.as_posix())}"
+
+    def campaign_outcomes(self, campaign_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the outcome for every recipient of a campaign recorded so far.
+
+        Args:
+            campaign_id: ID of the campaign in the campaign ledger
+
+        Returns:
+            List of per-recipient outcomes
+        """
+        return self.campaign_sender.campaign_outcomes(campaign_id)
+
     def _generate_html_email(
         self,
         title: str,
@@ -259,6 +539,32 @@ class ResendPlatform(SocialMediaPlatform):
         Returns:
             HTML formatted email content
         """
+        unsubscribe_url = (blog_data or {}).get("unsubscribe_url", "")
+        return self.compile_html_email(title, content, content_type, blog_data).render(
+            unsubscribe_url
+        )
+
+    @staticmethod
+    def compile_html_email(
+        title: str,
+        content: str,
+        content_type: ContentType = "plain",
+        blog_data: Optional[Dict[str, Any]] = None,
+        media_html: str = "",
+    ) -> EmailTemplate:
+        """
+        Render the HTML email for a post, leaving the unsubscribe URL as a slot.
+
+        Args:
+            title: The title of the blog post
+            content: The content of the blog post
+            content_type: The type of content being provided (plain, markdown, or html)
+            blog_data: Blog post data for the template
+            media_html: HTML for the post's images, placed in the {{media}} slot
+
+        Returns:
+            The compiled email template
+        """
         if not blog_data:
             blog_data = {
                 "title": title,
@@ -299,7 +605,6 @@ class ResendPlatform(SocialMediaPlatform):
         publish_date = blog_data["publish_date"] or "2023-10-01"
         category = blog_data["category"]
         page_name_without_date = blog_data["page_name_without_date"]
-        unsubscribe_url = blog_data["unsubscribe_url"]
 
         # Construct post URL with category and page name without date
         base_url = os.getenv("BLOG_BASE_URL", "https://blog.dannycastonguay.com")
@@ -313,29 +618,34 @@ class ResendPlatform(SocialMediaPlatform):
             with open(template_path, "r", encoding="utf-8") as f:
                 template = f.read()
 
+            # Templates without a media slot get the images after the content
+            if "{{media}}" not in template:
+                formatted_content += media_html
+                media_html = ""
+
             # Replace placeholders with actual content
             html = (
                 template.replace("{{title}}", readable_title)
                 .replace("{{content}}", formatted_content)
                 .replace("{{publish_date}}", publish_date)
                 .replace("{{post_url}}", post_url)
-                .replace("{{unsubscribe_url}}", unsubscribe_url)
+                .replace("{{media}}", media_html)
             )
 
-            return html
+            return EmailTemplate(html)
 
         except Exception as e:
             print(f"ERROR: Failed to load email template: {str(e)}")
             # Fallback to a simple template if the file can't be loaded
-            return f"""
+            return EmailTemplate(f"""
             <html>
             <body>
                 <h1>{title}</h1>
-                <div>{formatted_content}</div>
+                <div>{formatted_content}{media_html}</div>
                 <p>Thank you for subscribing to our blog updates!</p>
             </body>
             </html>
-            """
+            """)
 
     def get_subscribers(self) -> List[Dict[str, Any]]:
         """Get all active subscribers."""
@@ -345,74 +655,32 @@ class ResendPlatform(SocialMediaPlatform):
         """
         Extract data from the original blog post file.
 
+        The front matter comes from the post index, so the post file is only
+        read again if it changed since it was last indexed.
+
         Args:
             page_name: The name of the page (filename without extension)
 
         Returns:
             Dict containing blog post data (title, category, publish_date, etc.)
         """
-        import yaml
-        import os
-        from pathlib import Path
-
-        # Initialize default data
+        # Defaults from the page name, e.g. YYYY-MM-DD-my-post
+        name = split_page_name(page_name)
         data = {
-            "title": page_name.replace("-", " ").title(),
+            "title": name["slug"].replace("-", " ").title(),
             "category": "",
-            "publish_date": "",
-            "page_name_without_date": page_name,
+            "publish_date": name["date"],
+            "page_name_without_date": name["slug"],
         }
 
-        # Extract date from page_name if it has a date prefix (YYYY-MM-DD-)
-        if (
-            len(page_name) > 11
-            and page_name[4] == "-"
-            and page_name[7] == "-"
-            and page_name[10] == "-"
-        ):
-            data["publish_date"] = page_name[:10]  # Extract YYYY-MM-DD
-            data["page_name_without_date"] = page_name[11:]  # Remove date prefix
-            data["title"] = data["page_name_without_date"].replace("-", " ").title()
-
-        # Try to find the original blog post file
-        posts_dir = "_posts"
-        possible_filenames = [
-            f"{posts_dir}/{page_name}.md",  # Try exact match first
-            f"{posts_dir}/{data['publish_date']}-{data['page_name_without_date']}.md",  # Try with date prefix
-        ]
-
-        blog_file_path = None
-        for filename in possible_filenames:
-            if os.path.exists(filename):
-                blog_file_path = filename
-                break
-
-        if not blog_file_path:
+        post = get_post_index().get(page_name)
+        if not post:
             print(f"WARNING: Could not find original blog post file for {page_name}")
             return data
 
-        # Read the blog post file
-        try:
-            with open(blog_file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Extract front matter
-            parts = content.split("---", 2)
-            if len(parts) >= 3:
-                front_matter = yaml.safe_load(parts[1])
-
-                # Extract data from front matter
-                if front_matter:
-                    # Get title from front matter
-                    if "title" in front_matter:
-                        data["title"] = front_matter["title"]
-
-                    # Get category from front matter - only use 'category' field
-                    if "category" in front_matter:
-                        data["category"] = front_matter["category"]
-
-            return data
-
-        except Exception as e:
-            print(f"ERROR: Failed to extract blog post data: {str(e)}")
-            return data
+        if post["title"] is not None:
+            data["title"] = post["title"]
+        # Only the 'category' field is used
+        if post["category"] is not None:
+            data["category"] = post["category"]
+        return data
@@ -0,0 +1,340 @@
+"""
+Batch sending for Resend.
+
+Messages are sent up to 100 per request with Resend's batch endpoint, and
+several batches can be in flight at once under the platform's rate limit.
+When Resend rejects a batch request (a 4xx other than 429), nothing in it was
+sent, so it is split in half and each half retried, down to single messages:
+one bad address costs a handful of extra requests and does not fail the rest
+of the batch. Other failures, such as timeouts, 5xx responses or rate
+limiting that outlasted its retries, may have sent the batch, so its messages
+are reported failed rather than sent again. Every request carries an
+idempotency key derived from the recipients' keys, so retrying the same
+messages later within Resend's 24 hour window does not send them twice.
+
+send_async() does the same with an httpx.AsyncClient, for callers running
+in an event loop.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import resend
+
+# Resend accepts up to 100 emails per batch request
+MAX_BATCH_SIZE = 100
+
+EMAILS_URL = "https://api.resend.com/emails"
+BATCH_URL = "https://api.resend.com/emails/batch"
+
+
+class ResendAPIError(ValueError):
+    """Error response from the Resend API, for the async requests."""
+
+    def __init__(self, status_code: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(f"Resend API returned {status_code}: {message}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """
+    Get the HTTP status of a failed Resend request.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        The status code, or None if the request got no response
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rejected(error: Exception) -> bool:
+    """
+    Check whether Resend refused a request without sending anything.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        True for 4xx responses other than 429
+    """
+    status = error_status(error)
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+def idempotency_key(*parts: str) -> str:
+    """
+    Build a Resend idempotency key.
+
+    Args:
+        *parts: Values identifying the request, e.g. a campaign ID and
+            subscriber IDs
+
+    Returns:
+        sha256 hex digest of the parts
+    """
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResendBatchSender:
+    """Sends lists of Resend messages and reports the outcome for each one."""
+
+    def __init__(
+        self,
+        request_wrapper: Optional[Callable[..., Any]] = None,
+        async_request_wrapper: Optional[Callable[..., Awaitable[Any]]] = None,
+        max_retries: int = 3,
+        backoff_delay: Optional[Callable[[int], float]] = None,
+    ):
+        """
+        Initialize the sender.
+
+        Args:
+            request_wrapper: Called as request_wrapper(endpoint, func, *args) around
+                every API call, e.g. ResendPlatform.rate_limited
+            async_request_wrapper: Awaited as async_request_wrapper(endpoint, func, *args)
+                around every async API call, e.g. ResendPlatform.rate_limited_async
+            max_retries: Attempts per message when it is sent on its own
+            backoff_delay: Returns the delay before retry number attempt
+        """
+        self.request_wrapper = request_wrapper or (
+            lambda endpoint, func, *args, **kwargs: func(*args, **kwargs)
+        )
+        self.async_request_wrapper = async_request_wrapper or self._call_async
+        self.max_retries = max(int(max_retries), 1)
+        self.backoff_delay = backoff_delay or (lambda attempt: 2 ** attempt)
+
+    @staticmethod
+    def _keys(messages: List[Dict[str, Any]], keys: Optional[List[str]]) -> List[str]:
+        """Use the given message keys, or key messages by their recipients."""
+        if keys is not None:
+            return keys
+        return [idempotency_key(str(message.get("to"))) for message in messages]
+
+    @staticmethod
+    def _batch_outcomes(
+        response: Any, messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Read the outcomes of a batch request.
+
+        Raises:
+            ValueError: If the response does not have one ID per message
+        """
+        data = response.get("data") if isinstance(response, dict) else response
+        if data and len(data) == len(messages) and all(d.get("id") for d in data):
+            return [{"status": "sent", "id": d["id"]} for d in data]
+        raise ValueError(f"Unexpected batch response: {response}")
+
+    def send(
+        self,
+        messages: List[Dict[str, Any]],
+        use_batch: bool = True,
+        keys: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Send messages, with one batch request where possible.
+
+        Resend's batch endpoint does not take attachments, so messages with
+        attachments should be sent with use_batch=False.
+
+        Args:
+            messages: Resend send parameters, at most MAX_BATCH_SIZE of them
+            use_batch: Send the messages with a single batch request
+            keys: A stable key per message, e.g. from idempotency_key() of the
+                campaign and subscriber IDs; defaults to the recipients' addresses
+
+        Returns:
+            One outcome per message, in order: {"status": "sent", "id": ...}
+            or {"status": "failed", "error": ...}, with "rejected": True when
+            Resend refused the message, so sending it again would fail too
+        """
+        keys = self._keys(messages, keys)
+        if use_batch and 1 < len(messages) <= MAX_BATCH_SIZE:
+            try:
+                response = self.request_wrapper(
+                    "emails",
+                    resend.Batch.send,
+                    messages,
+                    {"idempotency_key": idempotency_key(*keys)},
+                )
+                return self._batch_outcomes(response, messages)
+            except Exception as e:
+                if not is_rejected(e):
+                    print(f"❌ Batch of {len(messages)} emails failed: {str(e)}")
+                    return [{"status": "failed", "error": str(e)}] * len(messages)
+                print(f"⚠️  Batch of {len(messages)} emails rejected ({str(e)}), splitting it")
+                middle = len(messages) // 2
+                return (
+                    self.send(messages[:middle], keys=keys[:middle])
+                    + self.send(messages[middle:], keys=keys[middle:])
+                )
+
+        return [self._send_one(message, key) for message, key in zip(messages, keys)]
+
+    def _send_one(self, message: Dict[str, Any], key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Send a single message, retrying failures with backoff.
+
+        Retries reuse the message's idempotency key, so a request that timed
+        out after Resend accepted it is not sent twice. Rejected messages are
+        not retried.
+
+        Args:
+            message: Resend send parameters
+            key: Stable key of the message
+
+        Returns:
+            The outcome of the message
+        """
+        options = {"idempotency_key": key or self._keys([message], None)[0]}
+        error = "No ID returned"
+        rejected = False
+        for attempt in range(self.max_retries):
+            try:
+                response = self.request_wrapper("emails", resend.Emails.send, message, options)
+                if response.get("id"):
+                    return {"status": "sent", "id": response["id"]}
+                error = "No ID returned"
+            except Exception as e:
+                error = str(e)
+                rejected = is_rejected(e)
+                if rejected:
+                    break
+
+            if attempt < self.max_retries - 1:
+                time.sleep(self.backoff_delay(attempt))
+
+        print(f"❌ Failed to send to {message.get('to')}: {error}")
+        return {"status": "failed", "error": error, "rejected": rejected}
+
+    @staticmethod
+    async def _call_async(endpoint: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        return await func(*args, **kwargs)
+
+    async def send_async(
+        self,
+        client: httpx.AsyncClient,
+        messages: List[Dict[str, Any]],
+        use_batch: bool = True,
+        keys: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Send messages from an event loop, with one batch request where possible.
+
+        Messages sent on their own are sent concurrently.
+
+        Args:
+            client: Client used for the requests
+            messages: Resend send parameters, at most MAX_BATCH_SIZE of them
+            use_batch: Send the messages with a single batch request
+            keys: A stable key per message, as for send()
+
+        Returns:
+            One outcome per message, in order, as returned by send()
+        """
+        keys = self._keys(messages, keys)
+        if use_batch and 1 < len(messages) <= MAX_BATCH_SIZE:
+            try:
+                response = await self.async_request_wrapper(
+                    "emails",
+                    self._request_async,
+                    client,
+                    BATCH_URL,
+                    messages,
+                    idempotency_key(*keys),
+                )
+                return self._batch_outcomes(response, messages)
+            except Exception as e:
+                if not is_rejected(e):
+                    print(f"❌ Batch of {len(messages)} emails failed: {str(e)}")
+                    return [{"status": "failed", "error": str(e)}] * len(messages)
+                print(f"⚠️  Batch of {len(messages)} emails rejected ({str(e)}), splitting it")
+                middle = len(messages) // 2
+                halves = await asyncio.gather(
+                    self.send_async(client, messages[:middle], keys=keys[:middle]),
+                    self.send_async(client, messages[middle:], keys=keys[middle:]),
+                )
+                return halves[0] + halves[1]
+
+        return list(
+            await asyncio.gather(
+                *(
+                    self._send_one_async(client, message, key)
+                    for message, key in zip(messages, keys)
+                )
+            )
+        )
+
+    async def _send_one_async(
+        self, client: httpx.AsyncClient, message: Dict[str, Any], key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a single message from an event loop, retrying failures with backoff.
+
+        Args:
+            client: Client used for the request
+            message: Resend send parameters
+            key: Stable key of the message
+
+        Returns:
+            The outcome of the message
+        """
+        key = key or self._keys([message], None)[0]
+        error = "No ID returned"
+        rejected = False
+        for attempt in range(self.max_retries):
+            try:
+                response = await self.async_request_wrapper(
+                    "emails", self._request_async, client, EMAILS_URL, message, key
+                )
+                if response.get("id"):
+                    return {"status": "sent", "id": response["id"]}
+                error = "No ID returned"
+            except Exception as e:
+                error = str(e)
+                rejected = is_rejected(e)
+                if rejected:
+                    break
+
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(self.backoff_delay(attempt))
+
+        print(f"❌ Failed to send to {message.get('to')}: {error}")
+        return {"status": "failed", "error": error, "rejected": rejected}
+
+    @staticmethod
+    async def _request_async(
+        client: httpx.AsyncClient, url: str, payload: Any, key: Optional[str] = None
+    ) -> Any:
+        """
+        Make one Resend API request.
+
+        Args:
+            client: Client used for the request
+            url: The endpoint URL
+            payload: JSON body of the request
+            key: Idempotency key of the request
+
+        Returns:
+            The decoded response
+
+        Raises:
+            ResendAPIError: If Resend returns an error
+        """
+        headers = {"Authorization": f"Bearer {resend.api_key}"}
+        if key:
+            headers["Idempotency-Key"] = key
+        response = await client.post(url, json=payload, headers=headers)
+        if not response.is_success:
+            raise ResendAPIError(response.status_code, response.text, dict(response.headers))
+        return response.json()
@@ -99,6 +99,9 @@ class TikTokPlatform(SocialMediaPlatform):
             # to post the video with caption and possibly use the script sections
             # for video editing/captioning
 
+            # Respect the platform rate limit as a real API call would
+            self.rate_limiter.acquire(self.name)
+
             # For now, just log what would be posted
             print(f"[PLACEHOLDER] Would post to TikTok:")
             print(f"Video: {media_files['videos'][0]}")
@@ -3,11 +3,31 @@ Twitter (X) platform implementation using Tweepy API v2
 """
 import os
 import glob
+import asyncio
+import hashlib
+import threading
+import httpx
 import tweepy
+from concurrent.futures import ThreadPoolExecutor
+from oauthlib.oauth1 import Client as OAuth1Client
 from typing import Dict, Any, List
 from pathlib import Path
 
 from ..platforms import SocialMediaPlatform
+from ..media_cache import MediaCache
+from ..transport import get_transport
+from .twitter_upload import ChunkedMediaUploader, MediaUploadError
+
+# X allows up to 4 images, or a single video or GIF, per tweet
+MAX_IMAGES = 4
+
+# X keeps uploaded media usable for 24 hours
+MEDIA_ID_TTL = 23 * 3600
+
+# Endpoints used by the async client
+TWEETS_URL = "https://api.twitter.com/2/tweets"
+USERS_ME_URL = "https://api.twitter.com/2/users/me"
+MEDIA_UPLOAD_URL = "https://upload.twitter.com/1.1/media/upload.json"
 
 class TwitterPlatform(SocialMediaPlatform):
     """Twitter (X) platform implementation using API v2."""
@@ -15,6 +35,20 @@ class TwitterPlatform(SocialMediaPlatform):
     def __init__(self):
         super().__init__("X")
         self._verify_credentials()
+
+        # Clients are built once and reuse their HTTP sessions across posts
+        self._client = None
+        self._api = None
+        self._uploader = None
+        self._username = os.getenv("TWITTER_USERNAME") or None
+        self._lock = threading.Lock()
+        # Held while the username is looked up, so concurrent posts call get_me once
+        self._username_lock = threading.Lock()
+
+        # Uploaded media is cached per account without storing the token itself
+        self._account = hashlib.sha256(
+            os.getenv("TWITTER_ACCESS_TOKEN").encode("utf-8")
+        ).hexdigest()[:16]
     
     def _verify_credentials(self):
         required_creds = [
@@ -28,13 +62,17 @@ class TwitterPlatform(SocialMediaPlatform):
             raise ValueError(f"Missing credentials: {', '.join(missing)}")
     
     def get_client(self) -> tweepy.Client:
-        """Initialize and return Twitter v2 API client."""
-        return tweepy.Client(
-            consumer_key=os.getenv("TWITTER_API_KEY"),
-            consumer_secret=os.getenv("TWITTER_API_SECRET"),
-            access_token=os.getenv("TWITTER_ACCESS_TOKEN"),
-            access_token_secret=os.getenv("TWITTER_ACCESS_SECRET"),
-        )
+        """Return the Twitter v2 API client, initializing it on first use."""
+        with self._lock:
+            if self._client is None:
+                self._client = tweepy.Client(
+                    consumer_key=os.getenv("TWITTER_API_KEY"),
+                    consumer_secret=os.getenv("TWITTER_API_SECRET"),
+                    access_token=os.getenv("TWITTER_ACCESS_TOKEN"),
+                    access_token_secret=os.getenv("TWITTER_ACCESS_SECRET"),
+                )
+                get_transport().session(self._client.session)
+            return self._client
     
     def get_auth(self) -> tweepy.OAuth1UserHandler:
         """Initialize and return Twitter OAuth1 handler for v1.1 API."""
@@ -47,9 +85,221 @@ class TwitterPlatform(SocialMediaPlatform):
         return auth
     
     def get_api(self) -> tweepy.API:
-        """Initialize and return Twitter v1.1 API."""
-        auth = self.get_auth()
-        return tweepy.API(auth)
+        """Return the Twitter v1.1 API, initializing it on first use."""
+        with self._lock:
+            if self._api is None:
+                self._api = tweepy.API(self.get_auth())
+                get_transport().session(self._api.session)
+            return self._api
+
+    def get_uploader(self) -> ChunkedMediaUploader:
+        """Return the chunked media uploader, initializing it on first use."""
+        with self._lock:
+            if self._uploader is None:
+                self._uploader = ChunkedMediaUploader(
+                    lambda func, *args, **kwargs: self.rate_limited(
+                        "media_upload", func, *args, **kwargs
+                    )
+                )
+            return self._uploader
+
+    def upload_media(self, media_files: List[str]) -> List[str]:
+        """
+        Upload the media for one tweet.
+
+        A video or GIF is uploaded on its own with the chunked uploader;
+        otherwise up to four images are uploaded concurrently. Files uploaded
+        within the last day are not uploaded again.
+
+        Args:
+            media_files: Paths of the media files found for the post
+
+        Returns:
+            List of media IDs, in the order of the files
+        """
+        chunked = [
+            f for f in media_files
+            if ChunkedMediaUploader.media_category(f) != "tweet_image"
+        ]
+        if chunked:
+            self._warn_dropped_media(chunked[0], media_files)
+
+            def upload_chunked(media_file: str) -> str:
+                print(f"Uploading media: {media_file}")
+                return self.get_uploader().upload(media_file)
+
+            return [self._cached_upload(chunked[0], upload_chunked)]
+
+        images = media_files[:MAX_IMAGES]
+        api = self.get_api()
+
+        def upload_image(media_file: str) -> str:
+            print(f"Uploading media: {media_file}")
+            media = self.rate_limited("media_upload", api.media_upload, media_file)
+            return media.media_id_string
+
+        with ThreadPoolExecutor(max_workers=len(images) or 1) as executor:
+            return list(
+                executor.map(lambda f: self._cached_upload(f, upload_image), images)
+            )
+
+    @staticmethod
+    def _warn_dropped_media(video: str, media_files: List[str]):
+        """
+        Warn about media left out of a tweet with a video or GIF.
+
+        X does not allow other media in a tweet with a video or GIF.
+
+        Args:
+            video: The video or GIF that is posted
+            media_files: Paths of all the media files found for the post
+        """
+        dropped = [f for f in media_files if f != video]
+        if dropped:
+            print(
+                f"WARNING: X allows a single video or GIF per tweet; posting {video} "
+                f"and leaving out {', '.join(dropped)}"
+            )
+
+    def _cached_upload(self, media_file: str, upload) -> str:
+        return self.media_cache.get_or_upload(
+            self.name, self._account, media_file, upload, MEDIA_ID_TTL
+        )
+
+    def forget_media(self, media_files: List[str]):
+        """
+        Drop cached media IDs for files, so the next attempt uploads them again.
+
+        Args:
+            media_files: Paths of the media files
+        """
+        for media_file in media_files:
+            self.media_cache.invalidate(
+                self.name, self._account, MediaCache.file_hash(media_file)
+            )
+
+    def _oauth_headers(self, method: str, url: str) -> Dict[str, str]:
+        """
+        Sign a request with OAuth 1.0a user context.
+
+        Only the URL is signed, which is all X expects for JSON and multipart bodies.
+
+        Args:
+            method: HTTP method
+            url: Request URL, including any query string
+
+        Returns:
+            Headers with the Authorization header
+        """
+        oauth = OAuth1Client(
+            os.getenv("TWITTER_API_KEY"),
+            client_secret=os.getenv("TWITTER_API_SECRET"),
+            resource_owner_key=os.getenv("TWITTER_ACCESS_TOKEN"),
+            resource_owner_secret=os.getenv("TWITTER_ACCESS_SECRET"),
+        )
+        _, headers, _ = oauth.sign(url, http_method=method)
+        return headers
+
+    async def _request_async(
+        self, client: httpx.AsyncClient, method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        """Send a request signed afresh, so a rate-limited retry gets a new nonce."""
+        return await client.request(
+            method, url, headers=self._oauth_headers(method, url), **kwargs
+        )
+
+    async def upload_media_async(
+        self, client: httpx.AsyncClient, media_files: List[str]
+    ) -> List[str]:
+        """
+        Upload the media for one tweet from an event loop.
+
+        Images are uploaded concurrently with the async client. A video or GIF
+        goes through the chunked uploader in a worker thread.
+
+        Args:
+            client: Async HTTP client
+            media_files: Paths of the media files found for the post
+
+        Returns:
+            List of media IDs, in the order of the files
+        """
+        chunked = [
+            f for f in media_files
+            if ChunkedMediaUploader.media_category(f) != "tweet_image"
+        ]
+        if chunked:
+            self._warn_dropped_media(chunked[0], media_files)
+
+            async def upload_chunked(media_file: str) -> str:
+                print(f"Uploading media: {media_file}")
+                return await asyncio.to_thread(self.get_uploader().upload, media_file)
+
+            return [await self._cached_upload_async(chunked[0], upload_chunked)]
+
+        async def upload_image(media_file: str) -> str:
+            print(f"Uploading media: {media_file}")
+            data = await asyncio.to_thread(Path(media_file).read_bytes)
+            response = await self.rate_limited_async(
+                "media_upload",
+                self._request_async,
+                client,
+                "POST",
+                MEDIA_UPLOAD_URL,
+                files={"media": (Path(media_file).name, data)},
+            )
+            if not response.is_success:
+                raise MediaUploadError(
+                    f"Failed to upload {media_file}: {response.status_code} - {response.text}"
+                )
+            return response.json()["media_id_string"]
+
+        return list(await asyncio.gather(*(
+            self._cached_upload_async(f, upload_image) for f in media_files[:MAX_IMAGES]
+        )))
+
+    async def _cached_upload_async(self, media_file: str, upload) -> str:
+        return await self.media_cache.get_or_upload_async(
+            self.name, self._account, media_file, upload, MEDIA_ID_TTL
+        )
+
+    async def get_username_async(self, client: httpx.AsyncClient) -> str:
+        """
+        Return the authenticated account's username from an event loop.
+
+        Args:
+            client: Async HTTP client
+        """
+        if self._username is not None:
+            return self._username
+        # Posts on other threads run their own event loops, so the lookup is
+        # guarded by the same thread lock as get_username()
+        await asyncio.to_thread(self._username_lock.acquire)
+        try:
+            if self._username is None:
+                response = await self.rate_limited_async(
+                    "default", self._request_async, client, "GET", USERS_ME_URL
+                )
+                if not response.is_success:
+                    raise ValueError(f"{response.status_code} - {response.text}")
+                self._username = response.json()["data"]["username"]
+            return self._username
+        finally:
+            self._username_lock.release()
+
+    def get_username(self) -> str:
+        """
+        Return the authenticated account's username.
+
+        Uses TWITTER_USERNAME when set, otherwise looks it up once and caches it.
+        """
+        if self._username is not None:
+            return self._username
+        with self._username_lock:
+            if self._username is None:
+                user_info = self.rate_limited("default", self.get_client().get_me, user_auth=True)
+                self._username = user_info.data.username
+            return self._username
 
     def find_media_files(self, platform_folder: str) -> List[str]:
         """
@@ -98,34 +348,87 @@ class TwitterPlatform(SocialMediaPlatform):
         try:
             # Find media files if platform_folder is provided
             media_ids = []
+            media_files = []
             if platform_folder:
                 media_files = self.find_media_files(platform_folder)
                 
                 if media_files:
                     # Upload media using v1.1 API
-                    api = self.get_api()
-                    
-                    for media_file in media_files:
-                        print(f"Uploading media: {media_file}")
-                        media = api.media_upload(media_file)
-                        media_ids.append(media.media_id)
+                    media_ids = self.upload_media(media_files)
             
             # Post tweet with or without media
             client = self.get_client()
             
             if media_ids:
-                response = client.create_tweet(text=content, media_ids=media_ids)
+                try:
+                    response = self.rate_limited(
+                        "tweets", client.create_tweet, text=content, media_ids=media_ids
+                    )
+                except tweepy.TweepyException:
+                    # The tweet may have been rejected for an expired media ID
+                    self.forget_media(media_files)
+                    raise
             else:
-                response = client.create_tweet(text=content)
+                response = self.rate_limited("tweets", client.create_tweet, text=content)
                 
             tweet_id = response.data['id']
-            
-            user_info = client.get_me(user_auth=True)
-            username = user_info.data.username
 
-            tweet_url = f"https://x.com/{username}/status/{tweet_id}"
+            # The tweet is already posted, so a failed username lookup only
+            # changes the URL format
+            try:
+                tweet_url = f"https://x.com/{self.get_username()}/status/{tweet_id}"
+            except tweepy.TweepyException as e:
+                print(f"Could not resolve X username: {str(e)}")
+                tweet_url = f"https://x.com/i/web/status/{tweet_id}"
+
             return self.create_success_result(page_name, content, tweet_id, tweet_url)
             
-        except tweepy.TweepyException as e:
+        except (tweepy.TweepyException, MediaUploadError) as e:
+            error_msg = f"Twitter API Error: {str(e)}"
+            return self.create_error_result(page_name, content, error_msg)
+
+    async def post_content_async(self, content: str, page_name: str, platform_folder: str = None) -> Dict[str, Any]:
+        """
+        Post content to Twitter using API v2 with an async HTTP client.
+        
+        Args:
+            content: The content to post
+            page_name: The name of the page
+            platform_folder: Path to the platform folder (for finding media)
+            
+        Returns:
+            Dict containing the result of the posting operation
+        """
+        try:
+            async with get_transport().async_client() as client:
+                media_ids = []
+                media_files = self.find_media_files(platform_folder) if platform_folder else []
+                if media_files:
+                    media_ids = await self.upload_media_async(client, media_files)
+
+                payload = {"text": content}
+                if media_ids:
+                    payload["media"] = {"media_ids": media_ids}
+                response = await self.rate_limited_async(
+                    "tweets", self._request_async, client, "POST", TWEETS_URL, json=payload
+                )
+                if not response.is_success:
+                    if media_ids:
+                        # The tweet may have been rejected for an expired media ID
+                        self.forget_media(media_files)
+                    raise ValueError(f"{response.status_code} - {response.text}")
+                tweet_id = response.json()["data"]["id"]
+
+                # The tweet is already posted, so a failed username lookup only
+                # changes the URL format
+                try:
+                    tweet_url = f"https://x.com/{await self.get_username_async(client)}/status/{tweet_id}"
+                except (httpx.HTTPError, ValueError, KeyError) as e:
+                    print(f"Could not resolve X username: {str(e)}")
+                    tweet_url = f"https://x.com/i/web/status/{tweet_id}"
+
+            return self.create_success_result(page_name, content, tweet_id, tweet_url)
+
+        except (httpx.HTTPError, ValueError, KeyError, tweepy.TweepyException, MediaUploadError) as e:
             error_msg = f"Twitter API Error: {str(e)}"
             return self.create_error_result(page_name, content, error_msg)
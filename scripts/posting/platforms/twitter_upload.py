@@ -0,0 +1,209 @@
+"""
+Chunked media uploads for X (Twitter).
+
+Videos and GIFs are uploaded with the INIT/APPEND/FINALIZE flow of the v1.1
+media upload endpoint. APPEND segments are sent in parallel, and progress is
+saved in the posting state directory so a failed upload resumes with the
+segments that are still missing. The endpoint can be pointed at a local fake
+server with TWITTER_UPLOAD_URL, such as the one in tests/fake_x_upload.py.
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from requests_oauthlib import OAuth1Session
+
+from ..results_log import write_json_atomic
+from ..state import get_state_dir
+from ..transport import get_transport
+
+DEFAULT_UPLOAD_URL = "https://upload.twitter.com/1.1/media/upload.json"
+
+# X accepts APPEND segments of up to 5 MB
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Uploads not finalized within this many seconds are started over
+UPLOAD_SESSION_TTL = 3600
+
+
+class MediaUploadError(Exception):
+    """Raised when a chunked media upload fails."""
+
+
+class ChunkedMediaUploader:
+    """Uploads large media to X in parallel, resumable chunks."""
+
+    def __init__(
+        self,
+        request_wrapper: Optional[Callable[..., Any]] = None,
+        upload_url: Optional[str] = None,
+        chunk_size: int = CHUNK_SIZE,
+        max_workers: int = 4,
+    ):
+        """
+        Initialize the uploader.
+
+        Args:
+            request_wrapper: Called as request_wrapper(func, *args, **kwargs) around
+                every HTTP request, e.g. to apply rate limiting
+            upload_url: Media upload endpoint; defaults to TWITTER_UPLOAD_URL or X's endpoint
+            chunk_size: Size of each APPEND segment in bytes
+            max_workers: Number of segments uploaded concurrently
+        """
+        self.upload_url = upload_url or os.getenv("TWITTER_UPLOAD_URL", DEFAULT_UPLOAD_URL)
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.request_wrapper = request_wrapper or (lambda func, *a, **kw: func(*a, **kw))
+        self.session = get_transport().session(
+            OAuth1Session(
+                os.getenv("TWITTER_API_KEY"),
+                client_secret=os.getenv("TWITTER_API_SECRET"),
+                resource_owner_key=os.getenv("TWITTER_ACCESS_TOKEN"),
+                resource_owner_secret=os.getenv("TWITTER_ACCESS_SECRET"),
+            )
+        )
+        self.state_dir = get_state_dir() / "x_uploads"
+        self.state_dir.mkdir(exist_ok=True)
+        self._state_lock = threading.Lock()
+
+    @staticmethod
+    def media_category(media_file: str) -> str:
+        """
+        Get X's media category for a file.
+
+        Args:
+            media_file: Path to the media file
+
+        Returns:
+            "tweet_video", "tweet_gif" or "tweet_image"
+        """
+        mime_type, _ = mimetypes.guess_type(media_file)
+        if mime_type == "image/gif":
+            return "tweet_gif"
+        if mime_type and mime_type.startswith("video/"):
+            return "tweet_video"
+        return "tweet_image"
+
+    def _request(self, method: str, **kwargs) -> Dict[str, Any]:
+        response = self.request_wrapper(
+            self.session.request, method, self.upload_url, timeout=(10, 120), **kwargs
+        )
+        if response.status_code >= 400:
+            raise MediaUploadError(
+                f"Media upload failed: {response.status_code} - {response.text}"
+            )
+        return response.json() if response.content else {}
+
+    def _state_file(self, media_file: str):
+        stat = os.stat(media_file)
+        key = f"{os.path.abspath(media_file)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return self.state_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def _load_state(self, state_file) -> Optional[Dict[str, Any]]:
+        if not state_file.exists():
+            return None
+        try:
+            with open(state_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if time.time() - state.get("started_at", 0) > UPLOAD_SESSION_TTL:
+            return None
+        return state
+
+    def upload(self, media_file: str) -> str:
+        """
+        Upload a file with INIT/APPEND/FINALIZE, resuming an earlier attempt if possible.
+
+        Args:
+            media_file: Path to the media file
+
+        Returns:
+            The media ID string
+        """
+        total_bytes = os.path.getsize(media_file)
+        mime_type, _ = mimetypes.guess_type(media_file)
+        segment_count = max((total_bytes + self.chunk_size - 1) // self.chunk_size, 1)
+        state_file = self._state_file(media_file)
+
+        state = self._load_state(state_file)
+        if state:
+            print(f"Resuming upload of {media_file} ({len(state['segments'])}/{segment_count} segments done)")
+        else:
+            init = self._request(
+                "POST",
+                data={
+                    "command": "INIT",
+                    "total_bytes": total_bytes,
+                    "media_type": mime_type or "application/octet-stream",
+                    "media_category": self.media_category(media_file),
+                },
+            )
+            state = {
+                "media_id": init["media_id_string"],
+                "started_at": time.time(),
+                "segments": [],
+            }
+            write_json_atomic(state_file, state)
+
+        media_id = state["media_id"]
+        done = set(state["segments"])
+
+        def append(segment_index: int):
+            with open(media_file, "rb") as f:
+                f.seek(segment_index * self.chunk_size)
+                chunk = f.read(self.chunk_size)
+            self._request(
+                "POST",
+                data={
+                    "command": "APPEND",
+                    "media_id": media_id,
+                    "segment_index": segment_index,
+                },
+                files={"media": chunk},
+            )
+            with self._state_lock:
+                state["segments"].append(segment_index)
+                write_json_atomic(state_file, state)
+
+        missing = [i for i in range(segment_count) if i not in done]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for future in [executor.submit(append, i) for i in missing]:
+                future.result()
+
+        try:
+            finalize = self._request("POST", data={"command": "FINALIZE", "media_id": media_id})
+            self._wait_for_processing(media_id, finalize.get("processing_info"))
+        finally:
+            # A media ID that failed to finalize or process cannot be resumed,
+            # so the next attempt starts a new upload
+            state_file.unlink(missing_ok=True)
+        return media_id
+
+    def _wait_for_processing(self, media_id: str, processing_info: Optional[Dict[str, Any]]):
+        """
+        Poll STATUS until X has finished processing the media.
+
+        Args:
+            media_id: The media ID string
+            processing_info: processing_info from the FINALIZE or STATUS response
+        """
+        while processing_info:
+            state = processing_info.get("state")
+            if state == "succeeded":
+                return
+            if state == "failed":
+                error = processing_info.get("error", {}).get("message", "unknown error")
+                raise MediaUploadError(f"Media processing failed: {error}")
+
+            time.sleep(processing_info.get("check_after_secs", 1))
+            status = self._request(
+                "GET", params={"command": "STATUS", "media_id": media_id}
+            )
+            processing_info = status.get("processing_info")
@@ -0,0 +1,243 @@
+"""
+Index of blog post front matter.
+
+The title, category, date and slug of every post in _posts/ are kept in a
+JSON file in the state directory, each entry stamped with the mtime and size
+of its file. Only posts whose file changed since the index was written are
+parsed again, and lookups after that are a dictionary access.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+from .results_log import write_json_atomic
+from .state import state_path
+
+DEFAULT_POSTS_DIR = "_posts"
+
+INDEX_VERSION = 1
+
+
+def split_page_name(page_name: str) -> Dict[str, str]:
+    """
+    Split a page name into its date prefix and slug.
+
+    Args:
+        page_name: Post filename without extension, e.g. "2024-01-01-my-post"
+
+    Returns:
+        Dict with "date" (YYYY-MM-DD, or empty) and "slug"
+    """
+    if (
+        len(page_name) > 11
+        and page_name[4] == "-"
+        and page_name[7] == "-"
+        and page_name[10] == "-"
+    ):
+        return {"date": page_name[:10], "slug": page_name[11:]}
+    return {"date": "", "slug": page_name}
+
+
+def read_front_matter(path: Path) -> Dict[str, Any]:
+    """
+    Parse the YAML front matter of a post, reading no further than its end.
+
+    Args:
+        path: Path to the post file
+
+    Returns:
+        The front matter, or an empty dict if the post has none
+    """
+    lines = []
+    with open(path, "r", encoding="utf-8") as f:
+        if f.readline().strip() != "---":
+            return {}
+        for line in f:
+            if line.startswith("---"):
+                front_matter = yaml.safe_load("".join(lines))
+                return front_matter if isinstance(front_matter, dict) else {}
+            lines.append(line)
+    return {}
+
+
+def _plain(value: Any) -> Any:
+    """Convert a YAML value, e.g. a date, into something JSON can store."""
+    return json.loads(json.dumps(value, default=str))
+
+
+class PostIndex:
+    """Front matter of the posts in _posts/, kept up to date by file mtime and size."""
+
+    def __init__(self, posts_dir: str = DEFAULT_POSTS_DIR, index_path: Optional[str] = None):
+        """
+        Initialize the index.
+
+        Args:
+            posts_dir: Directory holding the posts
+            index_path: Path to the index file; defaults to post_index.json in the state directory
+        """
+        self.posts_dir = Path(posts_dir)
+        self.index_path = Path(index_path or state_path("post_index.json"))
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._bodies: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION and index.get("posts_dir") == str(self.posts_dir):
+                return index["posts"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return {}
+
+    def _save(self):
+        try:
+            write_json_atomic(
+                self.index_path,
+                {"version": INDEX_VERSION, "posts_dir": str(self.posts_dir), "posts": self._entries},
+            )
+        except OSError as e:
+            print(f"Warning: Could not save post index: {str(e)}")
+
+    def _entry(self, path: Path, stat: os.stat_result) -> Dict[str, Any]:
+        """Build the index entry of a post from its file."""
+        page_name = path.stem
+        entry = {
+            "path": str(path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "title": None,
+            "category": None,
+            **split_page_name(page_name),
+        }
+        try:
+            front_matter = read_front_matter(path)
+        except Exception as e:
+            print(f"Warning: Could not read front matter of {path}: {str(e)}")
+            return entry
+
+        entry["title"] = _plain(front_matter.get("title"))
+        entry["category"] = _plain(front_matter.get("category"))
+        if not entry["date"] and front_matter.get("date"):
+            entry["date"] = str(front_matter["date"])[:10]
+        return entry
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Bring the index up to date with the posts directory.
+
+        Returns:
+            Dict with the number of posts "parsed" again and "removed"
+        """
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+
+            seen = set()
+            parsed = 0
+            if self.posts_dir.is_dir():
+                with os.scandir(self.posts_dir) as it:
+                    for item in it:
+                        if not item.name.endswith(".md") or not item.is_file():
+                            continue
+                        page_name = item.name[:-3]
+                        seen.add(page_name)
+                        stat = item.stat()
+                        entry = self._entries.get(page_name)
+                        if (
+                            entry
+                            and entry["mtime_ns"] == stat.st_mtime_ns
+                            and entry["size"] == stat.st_size
+                        ):
+                            continue
+                        self._entries[page_name] = self._entry(Path(item.path), stat)
+                        parsed += 1
+
+            removed = [name for name in self._entries if name not in seen]
+            for name in removed:
+                del self._entries[name]
+            if parsed or removed:
+                self._save()
+            return {"parsed": parsed, "removed": len(removed)}
+
+    def get(self, page_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a post's front matter.
+
+        The whole directory is checked against the index on first use. After
+        that only the post being looked up is checked, with a single stat.
+
+        Args:
+            page_name: Post filename without extension
+
+        Returns:
+            Dict with "title" and "category" (None when the front matter has
+            none), "date", "slug" and "path", or None if there is no such post
+        """
+        if self._entries is None:
+            self.refresh()
+
+        path = self.posts_dir / f"{page_name}.md"
+        with self._lock:
+            try:
+                stat = path.stat()
+            except OSError:
+                if self._entries.pop(page_name, None) is not None:
+                    self._save()
+                return None
+
+            entry = self._entries.get(page_name)
+            if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                entry = self._entry(path, stat)
+                self._entries[page_name] = entry
+                self._save()
+            return dict(entry)
+
+    def read(self, page_name: str) -> Optional[str]:
+        """
+        Read a post's full text, reusing the copy read earlier in this process
+        if the file has not changed since.
+
+        Args:
+            page_name: Post filename without extension
+
+        Returns:
+            The post's text, or None if there is no such post
+        """
+        path = self.posts_dir / f"{page_name}.md"
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._bodies.get(page_name)
+            if cached and cached[0] == key:
+                return cached[1]
+
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        with self._lock:
+            self._bodies[page_name] = (key, text)
+        return text
+
+
+_post_index: Optional[PostIndex] = None
+_post_index_lock = threading.Lock()
+
+
+def get_post_index() -> PostIndex:
+    """Return the process-wide index of _posts/."""
+    global _post_index
+    with _post_index_lock:
+        if _post_index is None:
+            _post_index = PostIndex()
+        return _post_index
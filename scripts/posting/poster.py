@@ -3,36 +3,79 @@ Social media poster implementation.
 """
 
 import os
-import json
 import time
+import threading
+import importlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Type
 
 from .platforms import SocialMediaPlatform
-from .platforms.twitter import TwitterPlatform
-from .platforms.linkedin import LinkedInPlatform
-from .platforms.resend import ResendPlatform
-from .platforms.instagram import InstagramPlatform
-from .platforms.tiktok import TikTokPlatform
-from .platforms.reddit import RedditPlatform
+from .ledger import PublishLedger
+from .results_log import ResultsLog
+from .outbox import Outbox, DONE, PENDING, LEASED
 from typing import Union, List
 
 
 class SocialMediaPoster:
     """Class for posting content to social media platforms."""
 
-    def __init__(self, output_path: str = "posting_results.json"):
+    # Supported platforms, mapped to "module:Class" under posting.platforms.
+    # Modules are imported only when a platform is first used.
+    SUPPORTED_PLATFORMS = {
+        "X": "twitter:TwitterPlatform",
+        "LinkedIn": "linkedin:LinkedInPlatform",
+        "Resend": "resend:ResendPlatform",
+        "Instagram": "instagram:InstagramPlatform",
+        "TikTok": "tiktok:TikTokPlatform",
+        "Reddit": "reddit:RedditPlatform",
+    }
+
+    def __init__(
+        self,
+        output_path: str = "posting_results.json",
+        ledger: Optional[PublishLedger] = None,
+        outbox: Optional[Outbox] = None,
+    ):
         """
         Initialize the poster.
 
         Args:
             output_path: Path to save the posting results
+            ledger: Ledger of completed publishes; defaults to the one in the state directory
+            outbox: Queue of publish jobs; defaults to the one in the state directory
         """
         self.output_path = output_path
         self.results = []
+        self._results_lock = threading.Lock()
+        # Publish jobs run and results logged by this run, so a folder handled
+        # twice (e.g. by --resume and then by name) is neither retried nor
+        # reported twice
+        self._run_results: Dict[str, Dict[str, Any]] = {}
+        self._logged_keys = set()
+        self.results_log = ResultsLog(f"{os.path.splitext(output_path)[0]}.jsonl")
+        self.ledger = ledger or PublishLedger()
+        self.outbox = outbox or Outbox()
+
+        # Platform instances are created on first use and kept for the run;
+        # None marks a platform that failed to initialize
+        self.platforms: Dict[str, Optional[SocialMediaPlatform]] = {}
+        self._platforms_lock = threading.Lock()
+
+    @classmethod
+    def _load_platform_class(cls, name: str) -> Type[SocialMediaPlatform]:
+        """
+        Import and return the class implementing a platform.
+
+        Args:
+            name: Name of the platform
 
-        # Initialize available platforms
-        self.platforms = self.__class__.get_platforms(keys_only=False)
+        Returns:
+            The platform class
+        """
+        module_name, class_name = cls.SUPPORTED_PLATFORMS[name].split(":")
+        module = importlib.import_module(f".platforms.{module_name}", __package__)
+        return getattr(module, class_name)
 
     @staticmethod
     def get_platforms(
@@ -49,26 +92,16 @@ class SocialMediaPoster:
             If keys_only=True: List of platform names
             If keys_only=False: Dict of platform name to platform instance
         """
-        platforms = {}
-
-        # Define all supported platforms
-        supported_platforms = {
-            "X": TwitterPlatform,
-            "LinkedIn": LinkedInPlatform,
-            "Resend": ResendPlatform,
-            "Instagram": InstagramPlatform,
-            "TikTok": TikTokPlatform,
-            "Reddit": RedditPlatform,
-        }
-
         if keys_only:
             # Return just the platform names without initializing
-            return list(supported_platforms.keys())
+            return list(SocialMediaPoster.SUPPORTED_PLATFORMS.keys())
+
+        platforms = {}
 
         # Initialize platforms with error handling
-        for name, platform_class in supported_platforms.items():
+        for name in SocialMediaPoster.SUPPORTED_PLATFORMS:
             try:
-                platforms[name] = platform_class()
+                platforms[name] = SocialMediaPoster._load_platform_class(name)()
             except Exception as e:
                 print(f"Warning: Could not initialize platform '{name}': {str(e)}")
                 # Skip this platform if initialization fails
@@ -76,6 +109,28 @@ class SocialMediaPoster:
 
         return platforms
 
+    def get_platform(self, name: str) -> Optional[SocialMediaPlatform]:
+        """
+        Get a platform instance, creating it on first use.
+
+        Args:
+            name: Name of the platform
+
+        Returns:
+            The platform instance, or None if it is unsupported or failed to initialize
+        """
+        if name not in self.SUPPORTED_PLATFORMS:
+            return None
+
+        with self._platforms_lock:
+            if name not in self.platforms:
+                try:
+                    self.platforms[name] = self._load_platform_class(name)()
+                except Exception as e:
+                    print(f"Warning: Could not initialize platform '{name}': {str(e)}")
+                    self.platforms[name] = None
+            return self.platforms[name]
+
     def read_content(self, content_path: str) -> str:
         """
         Read content from a file.
@@ -89,7 +144,9 @@ class SocialMediaPoster:
         with open(content_path, "r", encoding="utf-8") as f:
             return f.read().strip()
 
-    def post_from_folder(self, folder_path: str) -> List[Dict[str, Any]]:
+    def post_from_folder(
+        self, folder_path: str, platforms: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Post content from a folder to social media platforms.
 
@@ -105,86 +162,359 @@ class SocialMediaPoster:
                     content.txt
             ...
 
+        Results are appended to the results log as they are collected; call
+        save_results() at the end of the run to write the JSON files.
+
         Args:
             folder_path: Path to the folder containing platform folders
+            platforms: Only post to these platforms; all platforms when omitted
 
         Returns:
             List of posting results
         """
         folder = Path(folder_path)
         page_name = folder.name
+        group_key = str(folder)
 
-        # Get platform folders
-        platform_folders = [p for p in folder.iterdir() if p.is_dir()]
+        # Queue a publish job for each platform's latest content. Jobs that
+        # already exist keep their state, so completed work is not repeated.
+        targets = {}
+        for platform_folder, platform_name, content_file in self._folder_jobs(folder):
+            if platforms is not None and platform_name not in platforms:
+                continue
+            platform = self.get_platform(platform_name)
+            content = self.read_content(str(content_file))
+            version, content_hash = self._publish_key(platform, content_file, content)
+            job_key = f"{page_name}/{platform_name}/{version}/{content_hash}"
+            self.outbox.enqueue(
+                "publish",
+                job_key,
+                group_key,
+                {
+                    "platform": platform_name,
+                    "platform_folder": str(platform_folder),
+                    "content_file": str(content_file),
+                    "version": version,
+                    "content_hash": content_hash,
+                },
+            )
+            targets[job_key] = (platform_folder, platform_name)
+
+        # Lease this folder's outstanding jobs; jobs for content that has since
+        # been replaced by a newer version are retired without posting
+        leased = []
+        results_by_key = {}
+        for job in self.outbox.lease("publish", group_key, limit=len(targets) + 100):
+            with self._results_lock:
+                run_result = self._run_results.get(job["job_key"])
+            if run_result is not None:
+                # Already attempted in this run; leave it for the next one
+                self.outbox.release(job["id"])
+                results_by_key[job["job_key"]] = run_result
+            elif job["job_key"] in targets:
+                leased.append(job)
+            elif platforms is not None and job["payload"]["platform"] not in platforms:
+                # Not ours to post in this call
+                self.outbox.release(job["id"])
+            else:
+                self.outbox.ack(job["id"], {"superseded": True})
+
+        # Platforms use independent APIs, so post to all of them concurrently
+        if leased:
+            with ThreadPoolExecutor(max_workers=len(leased)) as executor:
+                futures = {
+                    job["job_key"]: executor.submit(self._run_publish_job, job, page_name)
+                    for job in leased
+                }
+                for key, future in futures.items():
+                    results_by_key[key] = future.result()
+                    with self._results_lock:
+                        self._run_results[key] = results_by_key[key]
+
+        # Report jobs finished by earlier runs, or still waiting to be retried
+        for job in self.outbox.jobs("publish", group_key):
+            key = job["job_key"]
+            if key not in targets or key in results_by_key:
+                continue
+            if job["status"] == DONE and job["result"]:
+                results_by_key[key] = job["result"]
+            else:
+                results_by_key[key] = self._error_result(
+                    job["payload"]["platform"],
+                    page_name,
+                    job["error"] or "Publish job is leased by another worker",
+                )
 
-        # Store results for each platform
-        platform_results = {}
-        folder_results = []
+        # Log results in platform order regardless of completion order;
+        # the JSON views are written from the log by save_results()
+        for key in sorted(targets, key=lambda k: targets[k][1]):
+            if key not in results_by_key:
+                continue
+            platform_folder, _ = targets[key]
+            result = results_by_key[key]
+            with self._results_lock:
+                if key in self._logged_keys:
+                    continue
+                self._logged_keys.add(key)
+                self.results.append(result)
+            self.results_log.append(folder, platform_folder, result)
 
-        for platform_folder in platform_folders:
-            platform_name = platform_folder.name
+        return self.results
 
-            # Skip if platform is not supported
-            if platform_name not in self.platforms:
-                print(f"Platform '{platform_name}' is not supported")
+    def _run_publish_job(self, job: Dict[str, Any], page_name: str) -> Dict[str, Any]:
+        """
+        Post a leased publish job and acknowledge or release it.
+
+        Args:
+            job: Leased outbox job
+            page_name: Name of the page
+
+        Returns:
+            Dict containing the result of the posting operation
+        """
+        payload = job["payload"]
+        platform = self.get_platform(payload["platform"])
+
+        # Defer straight back to the queue while the platform's circuit is open
+        if platform and not platform.circuit_breaker.allow_request():
+            retry_in = platform.circuit_breaker.retry_in()
+            error = f"{platform.name} circuit open; deferred for {retry_in:.0f}s"
+            print(f"⏸️  {error}: {page_name}")
+            self.outbox.release(job["id"], retry_in, error)
+            return self._error_result(payload["platform"], page_name, error)
+
+        result = self._post_content(
+            Path(payload["content_file"]),
+            payload["platform"],
+            page_name,
+            (payload["version"], payload["content_hash"]),
+        )
+        if result.get("status") == "success":
+            if platform:
+                platform.circuit_breaker.record_success()
+            self.outbox.ack(job["id"], result)
+        elif result.get("retry_in") is not None:
+            # The platform is waiting on work leased elsewhere, e.g. email
+            # batches of a crashed worker; not a failure of this attempt
+            print(f"⏸️  {result.get('error')}: {page_name}")
+            self.outbox.release(job["id"], result["retry_in"], result.get("error"))
+        else:
+            retry_in = 0.0
+            if platform:
+                platform.circuit_breaker.record_failure()
+                retry_in = platform.circuit_breaker.retry_in()
+            self.outbox.fail(job["id"], result.get("error", "Unknown error"), retry_in)
+        return result
+
+    def resume_outbox(self, max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Finish publish jobs left outstanding by earlier or crashed runs.
+
+        Only the platforms with an outstanding job are posted to, so platforms
+        of the same folder that are scheduled for later are left alone.
+
+        Args:
+            max_workers: Maximum number of folders processed concurrently
+
+        Returns:
+            List of posting results
+        """
+        outstanding = {}
+        for group in self.outbox.outstanding_groups("publish"):
+            if not Path(group).is_dir():
                 continue
+            outstanding[group] = sorted({
+                job["payload"]["platform"]
+                for job in self.outbox.jobs("publish", group)
+                if job["status"] in (PENDING, LEASED)
+            })
+        print(f"Resuming {len(outstanding)} folders with outstanding publish jobs")
+        return self.post_from_folders(list(outstanding), max_workers, outstanding)
+
+    def post_from_folders(
+        self,
+        folder_paths: List[str],
+        max_workers: int = 4,
+        platforms: Optional[Dict[str, List[str]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Post content from several page folders through a bounded worker pool.
 
-            # Find the latest version folder
-            version_folders = [
-                v
-                for v in platform_folder.iterdir()
-                if v.is_dir() and v.name.startswith("v")
-            ]
-
-            if not version_folders:
-                # Check for legacy structure (no version folders)
-                content_file = platform_folder / "content.txt"
-                if content_file.exists():
-                    # Post content and get result
-                    result = self._post_content(content_file, platform_name, page_name)
-                else:
-                    print(
-                        f"No version folders or content file found for {page_name}/{platform_name}"
+        Folders share this poster's platform instances, so per-platform rate
+        limits apply across all of them.
+
+        Args:
+            folder_paths: Paths to page folders
+            max_workers: Maximum number of folders processed concurrently
+            platforms: Platforms to post to, keyed by folder path; all
+                platforms of folders not listed
+
+        Returns:
+            List of posting results
+        """
+        if not folder_paths:
+            return self.results
+
+        platforms = platforms or {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = []
+            for folder_path in folder_paths:
+                print(f"\nProcessing folder: {folder_path}")
+                futures.append(
+                    executor.submit(
+                        self.post_from_folder,
+                        str(folder_path),
+                        platforms.get(str(folder_path)),
                     )
-                    continue
-            else:
-                # Sort version folders by version number
-                version_folders.sort(
-                    key=lambda v: int(v.name[1:]) if v.name[1:].isdigit() else 0,
-                    reverse=True,
                 )
+            for future in futures:
+                future.result()
 
-                # Get the latest version folder
-                latest_version = version_folders[0]
-                content_file = latest_version / "content.txt"
+        return self.results
 
-                # Skip if content file doesn't exist
-                if not content_file.exists():
-                    print(
-                        f"Content file not found for {page_name}/{platform_name}/{latest_version.name}"
-                    )
-                    continue
+    def find_pending_folders(self, base_path: str) -> List[Path]:
+        """
+        Find page folders with at least one platform not yet published.
 
-                # Post content and get result
-                result = self._post_content(content_file, platform_name, page_name)
+        Args:
+            base_path: Path to the directory containing page folders
 
-            # Store result for this platform
-            platform_results[platform_name] = result
-            folder_results.append(result)
+        Returns:
+            Sorted list of page folders that still have work to do
+        """
+        pending = []
+        for folder in sorted(p for p in Path(base_path).iterdir() if p.is_dir()):
+            for _, platform_name, content_file in self._folder_jobs(folder, quiet=True):
+                platform = self.get_platform(platform_name)
+                content = self.read_content(str(content_file))
+                version, content_hash = self._publish_key(platform, content_file, content)
+                if not self.ledger.get(folder.name, platform_name, version, content_hash):
+                    pending.append(folder)
+                    break
+        return pending
+
+    def folder_platforms(self, folder_path: str) -> List[str]:
+        """
+        List the platforms a page folder has content for.
 
-            # Save platform-specific result
-            self._save_platform_result(platform_folder, result)
+        Args:
+            folder_path: Path to the page folder
 
-        # Save folder-specific results
-        self._save_folder_results(folder, folder_results)
+        Returns:
+            Names of the platforms, in order
+        """
+        return [name for _, name, _ in self._folder_jobs(Path(folder_path), quiet=True)]
 
-        # Save overall results
-        self.save_results()
+    def _folder_jobs(self, folder: Path, quiet: bool = False) -> List[tuple]:
+        """
+        Resolve the content file to post for each platform in a page folder.
 
-        return self.results
+        Args:
+            folder: Path to the page folder
+            quiet: Suppress messages about skipped platforms
+
+        Returns:
+            List of (platform_folder, platform_name, content_file) tuples,
+            ordered by platform name so results are deterministic
+        """
+        platform_folders = sorted(
+            (p for p in folder.iterdir() if p.is_dir()), key=lambda p: p.name
+        )
+
+        jobs = []
+        for platform_folder in platform_folders:
+            platform_name = platform_folder.name
+
+            # Skip if platform is not supported or could not be initialized
+            if not self.get_platform(platform_name):
+                if not quiet:
+                    print(f"Platform '{platform_name}' is not supported")
+                continue
+
+            content_file = self._find_content_file(platform_folder, folder.name)
+            if content_file:
+                jobs.append((platform_folder, platform_name, content_file))
+        return jobs
+
+    def _publish_key(
+        self, platform: SocialMediaPlatform, content_file: Path, content: str
+    ) -> tuple:
+        """
+        Compute the ledger version and content hash of a publish.
+
+        Args:
+            platform: Platform instance
+            content_file: Path to the content file
+            content: The content being posted
+
+        Returns:
+            Tuple of (version, content_hash); version is empty for legacy folders
+        """
+        version = (
+            content_file.parent.name
+            if content_file.parent.name != platform.name
+            else ""
+        )
+        content_hash = self.ledger.content_hash(
+            content, self._media_files(platform, str(content_file.parent))
+        )
+        return version, content_hash
+
+    def _find_content_file(self, platform_folder: Path, page_name: str) -> Optional[Path]:
+        """
+        Find the content file of the latest version in a platform folder.
+
+        Args:
+            platform_folder: Path to the platform folder
+            page_name: Name of the page
+
+        Returns:
+            Path to the content file, or None if there is nothing to post
+        """
+        platform_name = platform_folder.name
+
+        # Find the latest version folder
+        version_folders = [
+            v
+            for v in platform_folder.iterdir()
+            if v.is_dir() and v.name.startswith("v")
+        ]
+
+        if not version_folders:
+            # Check for legacy structure (no version folders)
+            content_file = platform_folder / "content.txt"
+            if content_file.exists():
+                return content_file
+            print(
+                f"No version folders or content file found for {page_name}/{platform_name}"
+            )
+            return None
+
+        # Sort version folders by version number
+        version_folders.sort(
+            key=lambda v: int(v.name[1:]) if v.name[1:].isdigit() else 0,
+            reverse=True,
+        )
+
+        # Get the latest version folder
+        latest_version = version_folders[0]
+        content_file = latest_version / "content.txt"
+
+        # Skip if content file doesn't exist
+        if not content_file.exists():
+            print(
+                f"Content file not found for {page_name}/{platform_name}/{latest_version.name}"
+            )
+            return None
+
+        return content_file
 
     def _post_content(
-        self, content_file: Path, platform_name: str, page_name: str
+        self,
+        content_file: Path,
+        platform_name: str,
+        page_name: str,
+        publish_key: Optional[tuple] = None,
     ) -> Dict[str, Any]:
         """
         Post content from a file to a platform.
@@ -193,6 +523,7 @@ class SocialMediaPoster:
             content_file: Path to the content file
             platform_name: Name of the platform
             page_name: Name of the page
+            publish_key: Precomputed (version, content_hash), if known
 
         Returns:
             Dict containing the result of the posting operation
@@ -201,19 +532,12 @@ class SocialMediaPoster:
 
         try:
             # Get platform instance
-            platform = self.platforms.get(platform_name)
+            platform = self.get_platform(platform_name)
             if not platform:
                 print(f"Platform '{platform_name}' is not supported")
-                result = {
-                    "platform": platform_name,
-                    "page_name": page_name,
-                    "id": "",
-                    "text": "",
-                    "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
-                    "status": "error",
-                    "error": f"Platform '{platform_name}' is not supported",
-                }
-                return result
+                return self._error_result(
+                    platform_name, page_name, f"Platform '{platform_name}' is not supported"
+                )
 
             # Read content
             content = self.read_content(str(content_file))
@@ -221,20 +545,27 @@ class SocialMediaPoster:
             # Get platform folder (for media files)
             platform_folder = os.path.dirname(content_file)
 
-            # Post content with platform folder for media
+            # Skip publishes the ledger already records as successful
+            version, content_hash = publish_key or self._publish_key(
+                platform, content_file, content
+            )
+            published = self.ledger.get(page_name, platform_name, version, content_hash)
+            if published:
+                print(f"⏭️  Already published {page_name} to {platform_name}, skipping")
+                return published
+
+            # Post content with platform folder for media; each platform
+            # paces its own API calls through its rate limiter
             result = platform.post_content(content, page_name, platform_folder)
 
-            # Add to results
-            self.results.append(result)
-
             if result.get("status") == "success":
+                self.ledger.record_success(
+                    page_name, platform_name, version, content_hash, result
+                )
                 print(f"✅ Posted to {platform_name}: {result.get('url')}")
             else:
                 print(f"❌ Failed to post to {platform_name}: {result.get('error')}")
 
-            # Sleep to avoid rate limiting
-            time.sleep(5)
-
             return result
 
         except Exception as e:
@@ -242,48 +573,58 @@ class SocialMediaPoster:
             print(f"❌ Error publishing to {platform_name}: {error_message}")
 
             # Create error result
-            result = {
-                "platform": platform_name,
-                "page_name": page_name,
-                "id": "",
-                "text": "",
-                "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
-                "status": "error",
-                "error": error_message,
-            }
-
-            # Add error to results
-            self.results.append(result)
+            return self._error_result(platform_name, page_name, error_message)
 
-            return result
-
-    def _save_platform_result(self, platform_folder: Path, result: Dict[str, Any]):
+    def _error_result(
+        self, platform_name: str, page_name: str, error: str
+    ) -> Dict[str, Any]:
         """
-        Save platform-specific result to a JSON file.
+        Create an error result for a platform that could not be posted to.
 
         Args:
-            platform_folder: Path to the platform folder
-            result: Result to save
+            platform_name: Name of the platform
+            page_name: Name of the page
+            error: The error message
+
+        Returns:
+            Dict containing the error result
         """
-        # Create posting_results.json in the platform folder
-        output_path = platform_folder / "posting_results.json"
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2)
+        return {
+            "platform": platform_name,
+            "page_name": page_name,
+            "id": "",
+            "text": "",
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+            "status": "error",
+            "error": error,
+        }
 
-    def _save_folder_results(self, folder: Path, results: List[Dict[str, Any]]):
+    def _media_files(
+        self, platform: SocialMediaPlatform, platform_folder: str
+    ) -> List[str]:
         """
-        Save folder-specific results to a JSON file.
+        List the media files a platform would post from a folder.
 
         Args:
-            folder: Path to the folder
-            results: List of results to save
-        """
-        # Create posting_results.json in the folder itself
-        folder_output_path = folder / "posting_results.json"
-        with open(folder_output_path, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2)
-
-    def save_results(self):
-        """Save overall results to a JSON file."""
-        with open(self.output_path, "w", encoding="utf-8") as f:
-            json.dump(self.results, f, indent=2)
+            platform: Platform instance
+            platform_folder: Path to the version folder
+
+        Returns:
+            List of media file paths
+        """
+        media_files = platform.find_media_files(platform_folder)
+        # Some platforms group their media by kind
+        if isinstance(media_files, dict):
+            media_files = [f for files in media_files.values() for f in files]
+        return list(media_files)
+
+    def save_results(self) -> List[Dict[str, Any]]:
+        """
+        Compact the results log into the overall, per-folder and per-platform
+        posting_results.json files. Call once at the end of the run.
+
+        Returns:
+            List of this run's results
+        """
+        self.results = self.results_log.compact(self.output_path)
+        return self.results
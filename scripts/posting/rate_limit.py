@@ -0,0 +1,479 @@
+"""
+Rate limiting for platform API calls.
+
+Each platform and endpoint gets its own token bucket, configured from
+config/rate_limits.json (or the file named by RATE_LIMIT_CONFIG). Calls made
+through RateLimiter.call (or call_async for coroutines) also honor
+Retry-After and rate-limit response headers and back off with jittered
+exponential delays on 429 responses.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+DEFAULT_CONFIG_PATH = os.path.join("config", "rate_limits.json")
+
+# Header pairs (remaining, reset) understood when a response is received
+RATE_LIMIT_HEADERS = [
+    ("x-rate-limit-remaining", "x-rate-limit-reset"),
+    ("x-ratelimit-remaining", "x-ratelimit-reset"),
+    ("ratelimit-remaining", "ratelimit-reset"),
+]
+
+
+class TokenBucket:
+    """Thread-safe token bucket."""
+
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens the bucket can hold
+        """
+        self.rate = max(float(rate), 1e-6)
+        self.capacity = max(float(capacity), 1.0)
+        self.tokens = self.capacity
+        self.updated_at = self.clock()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        # Clamped in case a wall clock (see SharedTokenBucket) is set back
+        elapsed = max(now - self.updated_at, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, sleeping until they are available.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._take(tokens)
+            if delay is None:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, waiting without blocking the event loop.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._take(tokens)
+            if delay is None:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def _take(self, tokens: float) -> Optional[float]:
+        """Take tokens if available; otherwise return how long to wait before trying again."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return None
+            return (tokens - self.tokens) / self.rate
+
+    def block_for(self, seconds: float):
+        """
+        Stop handing out tokens for the given number of seconds.
+
+        Args:
+            seconds: How long the bucket stays blocked
+        """
+        with self._lock:
+            now = self.clock()
+            self.blocked_until = max(self.blocked_until, now + max(seconds, 0.0))
+            self.tokens = 0.0
+            self.updated_at = now
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket shared by several processes.
+
+    The bucket's state lives in shared memory, so worker processes started
+    with it draw from one budget. It must be handed to them when they start,
+    e.g. through a pool initializer.
+    """
+
+    # The monotonic clock is not guaranteed to agree between processes
+    clock = staticmethod(time.time)
+
+    def __init__(self, rate: float, capacity: float, context: Any = None):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens the bucket can hold
+            context: multiprocessing context the worker processes are started with
+        """
+        self.rate = max(float(rate), 1e-6)
+        self.capacity = max(float(capacity), 1.0)
+        context = context or multiprocessing.get_context()
+        # tokens, updated_at, blocked_until
+        self._state = context.Array("d", [self.capacity, self.clock(), 0.0])
+
+    @property
+    def _lock(self):
+        return self._state.get_lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._state[0]
+
+    @tokens.setter
+    def tokens(self, value: float):
+        self._state[0] = value
+
+    @property
+    def updated_at(self) -> float:
+        return self._state[1]
+
+    @updated_at.setter
+    def updated_at(self, value: float):
+        self._state[1] = value
+
+    @property
+    def blocked_until(self) -> float:
+        return self._state[2]
+
+    @blocked_until.setter
+    def blocked_until(self, value: float):
+        self._state[2] = value
+
+
+class RateLimiter:
+    """Registry of token buckets keyed by platform and endpoint."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            config: Rate limit configuration; loaded from file when omitted
+        """
+        self.config = config if config is not None else self.load_config()
+        backoff = self.config.get("backoff", {})
+        self.base_delay = float(backoff.get("base_delay", 1.0))
+        self.max_delay = float(backoff.get("max_delay", 60.0))
+        self.max_retries = int(backoff.get("max_retries", 5))
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load the rate limit configuration file.
+
+        Args:
+            config_path: Path to the JSON config file
+
+        Returns:
+            Configuration dict, empty if the file does not exist
+        """
+        config_path = config_path or os.getenv("RATE_LIMIT_CONFIG", DEFAULT_CONFIG_PATH)
+        if not os.path.exists(config_path):
+            return {}
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load rate limit config '{config_path}': {str(e)}")
+            return {}
+
+    def _limits_for(self, platform: str, endpoint: str) -> Dict[str, Any]:
+        platform_config = self.config.get("platforms", {}).get(platform, {})
+        return (
+            platform_config.get(endpoint)
+            or platform_config.get("default")
+            or self.config.get("default")
+            or {"rate": 1.0, "capacity": 1}
+        )
+
+    def shared_buckets(
+        self, platform: str, context: Any = None
+    ) -> Dict[Tuple[str, str], SharedTokenBucket]:
+        """
+        Create process-shared buckets for every configured endpoint of a platform.
+
+        Args:
+            platform: Name of the platform
+            context: multiprocessing context the worker processes are started with
+
+        Returns:
+            Buckets keyed by (platform, endpoint), for use_buckets() in each worker
+        """
+        endpoints = set(self.config.get("platforms", {}).get(platform, {})) | {"default"}
+        buckets = {}
+        for endpoint in endpoints:
+            limits = self._limits_for(platform, endpoint)
+            buckets[(platform, endpoint)] = SharedTokenBucket(
+                limits["rate"], limits.get("capacity", 1), context
+            )
+        return buckets
+
+    def use_buckets(self, buckets: Mapping[Tuple[str, str], TokenBucket]):
+        """
+        Use the given buckets in place of this limiter's own.
+
+        Args:
+            buckets: Buckets keyed by (platform, endpoint), e.g. from shared_buckets()
+        """
+        with self._lock:
+            self._buckets.update(buckets)
+
+    def bucket(self, platform: str, endpoint: str = "default") -> TokenBucket:
+        """
+        Get the token bucket for a platform endpoint, creating it on first use.
+
+        Args:
+            platform: Name of the platform
+            endpoint: Name of the endpoint
+
+        Returns:
+            The token bucket
+        """
+        key = (platform, endpoint)
+        with self._lock:
+            if key not in self._buckets:
+                limits = self._limits_for(platform, endpoint)
+                self._buckets[key] = TokenBucket(limits["rate"], limits.get("capacity", 1))
+            return self._buckets[key]
+
+    def acquire(self, platform: str, endpoint: str = "default", tokens: float = 1.0) -> float:
+        """
+        Wait for permission to make a request.
+
+        Args:
+            platform: Name of the platform
+            endpoint: Name of the endpoint
+            tokens: Cost of the request in tokens
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        return self.bucket(platform, endpoint).acquire(tokens)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Compute a jittered exponential backoff delay.
+
+        Args:
+            attempt: Zero-based retry attempt
+
+        Returns:
+            Delay in seconds
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    @staticmethod
+    def retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+        """
+        Read how long to wait from rate limit response headers.
+
+        Args:
+            headers: Response headers
+
+        Returns:
+            Seconds to wait, or None if the headers do not say
+        """
+        if not headers:
+            return None
+        headers = {str(k).lower(): v for k, v in headers.items()}
+
+        value = headers.get("retry-after")
+        if value is not None:
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                try:
+                    return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+                except (TypeError, ValueError):
+                    pass
+
+        for remaining_header, reset_header in RATE_LIMIT_HEADERS:
+            remaining = headers.get(remaining_header)
+            reset = headers.get(reset_header)
+            if remaining is None or reset is None:
+                continue
+            try:
+                if int(float(remaining)) > 0:
+                    return None
+                reset = float(reset)
+            except ValueError:
+                continue
+            # Large values are epoch timestamps, small ones are deltas
+            if reset > 1_000_000_000:
+                reset -= time.time()
+            return max(reset, 0.0)
+
+        return None
+
+    @staticmethod
+    def _status_and_headers(response: Any) -> Tuple[Optional[int], Optional[Mapping[str, str]]]:
+        status = getattr(response, "status_code", None) or getattr(response, "code", None)
+        try:
+            status = int(status) if status is not None else None
+        except (TypeError, ValueError):
+            status = None
+        return status, getattr(response, "headers", None)
+
+    def call(
+        self,
+        platform: str,
+        endpoint: str,
+        func: Callable[..., Any],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """
+        Call an API function under the endpoint's rate limit.
+
+        Responses or exceptions carrying a 429 status are retried with backoff,
+        waiting at least as long as the response headers ask for.
+
+        Args:
+            platform: Name of the platform
+            endpoint: Name of the endpoint
+            func: Function making the request
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Whatever func returns
+        """
+        bucket = self.bucket(platform, endpoint)
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            try:
+                response = func(*args, **kwargs)
+            except Exception as e:
+                if not self._retry(platform, endpoint, bucket, attempt, error=e):
+                    raise
+            else:
+                if not self._retry(platform, endpoint, bucket, attempt, response=response):
+                    return response
+
+    async def call_async(
+        self,
+        platform: str,
+        endpoint: str,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """
+        Await an async API function under the endpoint's rate limit.
+
+        Behaves like call(), but waits for tokens and backoff with asyncio.
+
+        Args:
+            platform: Name of the platform
+            endpoint: Name of the endpoint
+            func: Coroutine function making the request; called again on each retry
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Whatever func returns
+        """
+        bucket = self.bucket(platform, endpoint)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire_async()
+            try:
+                response = await func(*args, **kwargs)
+            except Exception as e:
+                if not self._retry(platform, endpoint, bucket, attempt, error=e):
+                    raise
+            else:
+                if not self._retry(platform, endpoint, bucket, attempt, response=response):
+                    return response
+
+    def _retry(
+        self,
+        platform: str,
+        endpoint: str,
+        bucket: TokenBucket,
+        attempt: int,
+        response: Any = None,
+        error: Optional[Exception] = None,
+    ) -> bool:
+        """
+        Decide whether to retry an attempt, blocking the bucket for as long as needed.
+
+        Args:
+            platform: Name of the platform
+            endpoint: Name of the endpoint
+            bucket: The endpoint's bucket
+            attempt: Zero-based attempt number
+            response: Response of the attempt, if it returned one
+            error: Exception raised by the attempt, if any
+
+        Returns:
+            True to retry, False to return the response or re-raise the error
+        """
+        if error is not None:
+            # Exceptions such as tweepy.TooManyRequests carry the response
+            source = getattr(error, "response", None)
+            if source is None:
+                source = error
+            status, headers = self._status_and_headers(source)
+        else:
+            status, headers = self._status_and_headers(response)
+            if status != 429:
+                wait = self.retry_after(headers)
+                if wait:
+                    # Quota is exhausted; hold further calls until it resets
+                    bucket.block_for(wait)
+                return False
+        if status != 429 or attempt == self.max_retries:
+            return False
+
+        wait = max(self.retry_after(headers) or 0.0, self.backoff_delay(attempt))
+        print(f"Rate limited by {platform} ({endpoint}), retrying in {wait:.1f}s...")
+        bucket.block_for(wait)
+        return True
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter shared by all platforms."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
@@ -0,0 +1,147 @@
+"""
+Append-only log of posting results.
+
+Every result is appended to a JSONL file and flushed to disk as soon as it is
+known, so a killed run never leaves a half-written file behind. The JSON
+views (overall, per-folder and per-platform posting_results.json) are
+produced from the log by compact() at the end of the run, which then drops
+the events of earlier runs, so the log holds at most the last completed run
+and any runs killed since.
+"""
+
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def write_json_atomic(path: Path, data: Any):
+    """
+    Write JSON to a file by replacing it, so readers never see a partial file.
+
+    Args:
+        path: Destination path
+        data: JSON-serializable data
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ResultsLog:
+    """JSONL event log of posting results for one run."""
+
+    def __init__(self, path: str, run_id: Optional[str] = None):
+        """
+        Initialize the log.
+
+        Args:
+            path: Path to the JSONL file; created if missing and appended to otherwise
+            run_id: Identifier of this run; generated when omitted
+        """
+        self.path = Path(path)
+        self.run_id = run_id or uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._tail_checked = False
+
+    def append(self, folder: Path, platform_folder: Path, result: Dict[str, Any]):
+        """
+        Append a result and flush it to disk.
+
+        Args:
+            folder: Page folder the result belongs to
+            platform_folder: Platform folder the result belongs to
+            result: Result returned for the platform
+        """
+        event = {
+            "run_id": self.run_id,
+            "folder": str(folder),
+            "platform_folder": str(platform_folder),
+            "result": result,
+        }
+        line = json.dumps(event) + "\n"
+        with self._lock:
+            if not self._tail_checked:
+                # Start on a new line after a torn line from a killed run
+                if self.path.exists() and self.path.stat().st_size:
+                    with open(self.path, "rb") as f:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            line = "\n" + line
+                self._tail_checked = True
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read(self) -> List[Dict[str, Any]]:
+        """
+        Read this run's events, ignoring a torn final line from a killed run.
+
+        Returns:
+            List of events in the order they were written
+        """
+        if not self.path.exists():
+            return []
+
+        events = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if event.get("run_id") == self.run_id:
+                    events.append(event)
+        return events
+
+    def compact(self, output_path: str) -> List[Dict[str, Any]]:
+        """
+        Write the JSON views of this run's results.
+
+        Args:
+            output_path: Path of the overall results file
+
+        Returns:
+            List of this run's results
+        """
+        events = self.read()
+
+        folder_results: Dict[str, List[Dict[str, Any]]] = {}
+        platform_results: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            folder_results.setdefault(event["folder"], []).append(event["result"])
+            platform_results[event["platform_folder"]] = event["result"]
+
+        for platform_folder, result in platform_results.items():
+            write_json_atomic(Path(platform_folder) / "posting_results.json", result)
+
+        for folder, results in folder_results.items():
+            write_json_atomic(Path(folder) / "posting_results.json", results)
+
+        results = [event["result"] for event in events]
+        write_json_atomic(Path(output_path), results)
+        self._drop_other_runs(events)
+        return results
+
+    def _drop_other_runs(self, events: List[Dict[str, Any]]):
+        """
+        Replace the log with this run's events.
+
+        Args:
+            events: This run's events, as returned by read()
+        """
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,271 @@
+"""
+Scheduled publishing.
+
+Instead of posting the moment content is merged, each page and platform can
+be given a publish time inside the platform's posting windows and at least a
+minimum gap after the previous post to that platform. Schedule entries are
+stored in SQLite and loaded into a priority heap; drain() publishes every due
+entry in one batched pass, so a cron-triggered run never sleeps idle.
+
+Windows and gaps are configured in config/schedule.json (or the file named by
+SCHEDULE_CONFIG).
+"""
+
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from .outbox import DONE
+from .state import state_path
+
+DEFAULT_CONFIG_PATH = os.path.join("config", "schedule.json")
+
+SCHEDULED = "scheduled"
+PUBLISHED = "published"
+
+
+class PublishScheduler:
+    """Assigns publish times to page/platform pairs and publishes due ones."""
+
+    def __init__(
+        self, db_path: Optional[str] = None, config: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            db_path: Path to the SQLite database; defaults to schedule.db in the state directory
+            config: Schedule configuration; loaded from file when omitted
+        """
+        self.config = config if config is not None else self.load_config()
+        self.tz = ZoneInfo(self.config.get("timezone", "UTC"))
+        self.db_path = str(db_path or state_path("schedule.db"))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schedule (
+                folder TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                publish_at REAL NOT NULL,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (folder, platform)
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load the schedule configuration file.
+
+        Args:
+            config_path: Path to the JSON config file
+
+        Returns:
+            Configuration dict, empty if the file does not exist
+        """
+        config_path = config_path or os.getenv("SCHEDULE_CONFIG", DEFAULT_CONFIG_PATH)
+        if not os.path.exists(config_path):
+            return {}
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load schedule config '{config_path}': {str(e)}")
+            return {}
+
+    def _platform_config(self, platform: str) -> Dict[str, Any]:
+        return (
+            self.config.get("platforms", {}).get(platform)
+            or self.config.get("default")
+            or {}
+        )
+
+    def next_slot(self, platform: str, earliest: float) -> float:
+        """
+        Find the first time at or after earliest that respects the platform's
+        minimum gap and falls inside one of its posting windows.
+
+        Args:
+            platform: Name of the platform
+            earliest: Earliest acceptable time as a Unix timestamp
+
+        Returns:
+            Publish time as a Unix timestamp
+        """
+        platform_config = self._platform_config(platform)
+        gap = float(platform_config.get("min_gap_minutes", 0)) * 60
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(publish_at) FROM schedule WHERE platform = ?", (platform,)
+            ).fetchone()
+        if row and row[0] is not None:
+            earliest = max(earliest, row[0] + gap)
+
+        windows = platform_config.get("windows") or []
+        if not windows:
+            return earliest
+
+        candidate = datetime.fromtimestamp(earliest, self.tz)
+        for day_offset in range(8):
+            day = (candidate + timedelta(days=day_offset)).date()
+            starts = []
+            for window in windows:
+                if day.weekday() not in window.get("days", range(7)):
+                    continue
+                start = datetime.combine(
+                    day, datetime.strptime(window["start"], "%H:%M").time(), self.tz
+                )
+                end = datetime.combine(
+                    day, datetime.strptime(window["end"], "%H:%M").time(), self.tz
+                )
+                if candidate < end:
+                    starts.append(max(candidate, start))
+            if starts:
+                return min(starts).timestamp()
+
+        return earliest
+
+    def schedule(
+        self, folder: str, platforms: List[str], earliest: Optional[float] = None
+    ) -> Dict[str, float]:
+        """
+        Schedule a page folder's platforms. Already scheduled pairs keep their time.
+
+        Args:
+            folder: Path to the page folder
+            platforms: Names of the platforms to schedule
+            earliest: Earliest publish time as a Unix timestamp; defaults to now
+
+        Returns:
+            Dict of platform name to publish time
+        """
+        earliest = earliest if earliest is not None else time.time()
+        scheduled = {}
+        for platform in platforms:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT publish_at FROM schedule WHERE folder = ? AND platform = ?",
+                    (folder, platform),
+                ).fetchone()
+            if row:
+                scheduled[platform] = row[0]
+                continue
+
+            publish_at = self.next_slot(platform, earliest)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO schedule VALUES (?, ?, ?, ?, ?)",
+                    (folder, platform, publish_at, SCHEDULED, time.time()),
+                )
+                self._conn.commit()
+            scheduled[platform] = publish_at
+        return scheduled
+
+    def _load_heap(self) -> List[Tuple[float, str, str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT publish_at, folder, platform FROM schedule WHERE status = ?",
+                (SCHEDULED,),
+            ).fetchall()
+        heap = [tuple(row) for row in rows]
+        heapq.heapify(heap)
+        return heap
+
+    def due(self, now: Optional[float] = None) -> Dict[str, List[str]]:
+        """
+        Pop every entry whose publish time has passed.
+
+        Args:
+            now: Current time as a Unix timestamp; defaults to now
+
+        Returns:
+            Dict of folder to the platforms due for it
+        """
+        now = now if now is not None else time.time()
+        heap = self._load_heap()
+        due: Dict[str, List[str]] = {}
+        while heap and heap[0][0] <= now:
+            _, folder, platform = heapq.heappop(heap)
+            due.setdefault(folder, []).append(platform)
+        return due
+
+    def mark_published(self, folder: str, platform: str):
+        """
+        Mark a schedule entry as published.
+
+        Args:
+            folder: Path to the page folder
+            platform: Name of the platform
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE schedule SET status = ?, updated_at = ? WHERE folder = ? AND platform = ?",
+                (PUBLISHED, time.time(), folder, platform),
+            )
+            self._conn.commit()
+
+    def drain(
+        self, poster, max_workers: int = 4, now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Publish every due entry in one pass. Failed entries stay scheduled and
+        are retried by the next drain.
+
+        Args:
+            poster: SocialMediaPoster used to publish
+            max_workers: Maximum number of folders processed concurrently
+            now: Current time as a Unix timestamp; defaults to now
+
+        Returns:
+            List of posting results
+        """
+        due = self.due(now)
+        if not due:
+            print("No scheduled posts are due")
+            return poster.results
+
+        print(f"Publishing {sum(len(p) for p in due.values())} due posts from {len(due)} folders")
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [
+                executor.submit(poster.post_from_folder, folder, platforms)
+                for folder, platforms in due.items()
+                if Path(folder).is_dir()
+            ]
+            for future in futures:
+                future.result()
+
+        # An entry is published once the newest publish job for it is done
+        for folder, platforms in due.items():
+            latest_jobs = {}
+            for job in poster.outbox.jobs("publish", folder):
+                latest_jobs[job["payload"]["platform"]] = job
+            for platform in platforms:
+                job = latest_jobs.get(platform)
+                if job and job["status"] == DONE:
+                    self.mark_published(folder, platform)
+
+        return poster.results
+
+    def upcoming(self) -> List[Tuple[float, str, str]]:
+        """Return scheduled entries ordered by publish time."""
+        heap = self._load_heap()
+        return [heapq.heappop(heap) for _ in range(len(heap))]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,36 @@
+"""
+Location of the posting pipeline's persistent state.
+"""
+
+import os
+from pathlib import Path
+
+DEFAULT_STATE_DIR = ".posting_state"
+
+
+def get_state_dir() -> Path:
+    """
+    Get the directory holding persistent posting state, creating it if needed.
+
+    The location defaults to .posting_state in the working directory and can
+    be overridden with the POSTING_STATE_DIR environment variable.
+
+    Returns:
+        Path to the state directory
+    """
+    state_dir = Path(os.getenv("POSTING_STATE_DIR", DEFAULT_STATE_DIR))
+    state_dir.mkdir(parents=True, exist_ok=True)
+    return state_dir
+
+
+def state_path(filename: str) -> Path:
+    """
+    Get the path of a file inside the state directory.
+
+    Args:
+        filename: Name of the state file
+
+    Returns:
+        Path to the file
+    """
+    return get_state_dir() / filename
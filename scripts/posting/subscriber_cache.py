@@ -0,0 +1,373 @@
+"""
+Local cache of email subscribers.
+
+Subscribers are kept in SQLite and brought up to date with a delta fetch:
+rows changed since the last sync (by updated_at) are upserted, and
+subscribers deleted since then are removed using the tombstones recorded by
+supabase/migrations. A sync therefore costs about as much as the number of
+changes rather than the size of the list. When a delta cannot be fetched,
+e.g. before the migration is applied, the cache is rebuilt from a full
+download of the active subscribers, written to SQLite a page at a time.
+"""
+
+import itertools
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from .email_subscribers import PAGE_SIZE, EmailSubscriberManager
+from .state import state_path
+
+TOMBSTONES_TABLE = "email_subscriber_tombstones"
+
+# Each delta starts this far before the last seen change, so rows committed
+# late with an earlier timestamp are not missed
+SYNC_OVERLAP_SECONDS = 300
+
+# Timestamp column of the delta fetch, added by supabase/migrations
+WATERMARK_COLUMN = "updated_at"
+
+
+def shift_timestamp(timestamp: str, seconds: float) -> str:
+    """
+    Move an ISO 8601 timestamp from PostgREST by a number of seconds.
+
+    Args:
+        timestamp: The timestamp, e.g. "2024-01-01T12:00:00.12345+00:00"
+        seconds: Seconds to add (negative to subtract)
+
+    Returns:
+        The shifted timestamp, or the original one if it cannot be parsed
+    """
+    # Python 3.10's fromisoformat needs "+00:00" and 3 or 6 fraction digits
+    normalized = re.sub(r"Z$", "+00:00", timestamp)
+    normalized = re.sub(
+        r"\.(\d+)", lambda m: "." + (m.group(1) + "000000")[:6], normalized
+    )
+    try:
+        return (datetime.fromisoformat(normalized) + timedelta(seconds=seconds)).isoformat()
+    except ValueError:
+        return timestamp
+
+
+class SubscriberCache:
+    """SQLite copy of the email_subscribers table, synced incrementally."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        manager: Optional[EmailSubscriberManager] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: Path to the SQLite database; defaults to subscribers.db in the state directory
+            manager: Subscriber manager used to fetch from Supabase
+        """
+        self.db_path = str(db_path or state_path("subscribers.db"))
+        self.manager = manager or EmailSubscriberManager()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS subscribers (
+                id TEXT PRIMARY KEY,
+                email TEXT NOT NULL,
+                active INTEGER NOT NULL,
+                changed_at TEXT
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.commit()
+
+    def _get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sync_state WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, values: Dict[str, Optional[str]]):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?)", list(values.items())
+        )
+
+    @staticmethod
+    def _row(subscriber: Dict[str, Any], column: Optional[str]) -> tuple:
+        return (
+            subscriber["id"],
+            subscriber.get("email") or "",
+            1 if subscriber.get("active", True) else 0,
+            subscriber.get(column) if column else None,
+        )
+
+    def synced(self) -> bool:
+        """Whether the cache holds the full list and can be synced with a delta."""
+        return bool(self._get_state("column"))
+
+    def sync(self, full: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Bring the cache up to date with Supabase.
+
+        Args:
+            full: Download the full list when a delta cannot be applied;
+                otherwise the cache is left as it is
+
+        Returns:
+            Dict with the number of "upserted" and "deleted" subscribers and
+            whether a "full" download was needed, or None if nothing was synced
+
+        Raises:
+            ValueError: If Supabase cannot be reached
+        """
+        if self.synced():
+            try:
+                return self._delta_sync()
+            except Exception as e:
+                if not full:
+                    print(f"WARNING: Incremental subscriber sync failed ({str(e)})")
+                    return None
+                print(f"WARNING: Incremental subscriber sync failed ({str(e)}), downloading the full list")
+        return self._full_sync() if full else None
+
+    def stream(self, after_id: str = "") -> Iterator[Dict[str, Any]]:
+        """
+        Stream the active subscribers, bringing the cache up to date on the way.
+
+        A synced cache applies a delta and is read from SQLite. An empty one,
+        as in each CI run, is filled by the download itself, and subscribers
+        are yielded as each page is stored rather than after the whole list.
+
+        Args:
+            after_id: Only return subscribers whose ID sorts after this one
+
+        Yields:
+            Subscriber dictionaries with "id", "email" and "active", in ID order
+
+        Raises:
+            ValueError: If Supabase cannot be reached
+        """
+        if self.synced():
+            try:
+                self._delta_sync()
+            except Exception as e:
+                print(f"WARNING: Incremental subscriber sync failed ({str(e)}), downloading the full list")
+            else:
+                yield from self.iter_subscribers(after_id=after_id)
+                return
+        yield from self._download(after_id)
+
+    def _full_sync(self) -> Dict[str, Any]:
+        """Replace the cache with a full download of the active subscribers."""
+        downloaded = sum(1 for _ in self._download())
+        return {"upserted": downloaded, "deleted": 0, "full": True}
+
+    def _download(self, after_id: str = "") -> Iterator[Dict[str, Any]]:
+        """
+        Download the active subscribers into the cache page by page.
+
+        Each page is written to the cache before its subscribers are yielded,
+        so at most one page is held in memory. A download from the start
+        replaces the cache once it completes: subscribers it did not see are
+        removed and the delta watermarks are set.
+
+        Args:
+            after_id: Only download subscribers whose ID sorts after this one
+
+        Yields:
+            Subscriber dictionaries with "id", "email" and "active"
+
+        Raises:
+            ValueError: If Supabase cannot be reached
+        """
+        started = datetime.utcnow().isoformat() + "+00:00"
+        column = WATERMARK_COLUMN
+        subscribers = self.manager.iter_subscribers(
+            columns=f"id,email,{column}", after_id=after_id
+        )
+        try:
+            first = next(subscribers, None)
+        except ValueError as e:
+            # Before the migration there is no updated_at column, and every
+            # sync downloads the full list
+            print(f"WARNING: Could not download subscribers with {column} ({str(e)}), apply supabase/migrations to sync them incrementally")
+            column = None
+            subscribers = self.manager.iter_subscribers(columns="id,email", after_id=after_id)
+            first = next(subscribers, None)
+
+        with self._lock:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS downloaded (id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM downloaded")
+
+        count = 0
+        page = []
+        for subscriber in itertools.chain([first] if first else [], subscribers):
+            page.append(subscriber)
+            if len(page) == PAGE_SIZE:
+                self._store_page(page, column)
+                count += len(page)
+                yield from page
+                page = []
+        if page:
+            self._store_page(page, column)
+            count += len(page)
+            yield from page
+
+        if not after_id:
+            with self._lock:
+                self._conn.execute(
+                    "DELETE FROM subscribers WHERE id NOT IN (SELECT id FROM downloaded)"
+                )
+                self._set_state({
+                    "column": column or "",
+                    "watermark": started,
+                    "tombstone_watermark": started,
+                })
+                self._conn.commit()
+        print(f"Downloaded {count} subscribers")
+
+    def _store_page(self, subscribers: List[Dict[str, Any]], column: Optional[str]):
+        """Write a page of downloaded subscribers to the cache."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO subscribers VALUES (?, ?, ?, ?)",
+                [self._row(s, column) for s in subscribers],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO downloaded VALUES (?)", [(s["id"],) for s in subscribers]
+            )
+            self._conn.commit()
+
+    def _delta_sync(self) -> Dict[str, Any]:
+        """Apply the changes and deletions since the last sync."""
+        column = self._get_state("column")
+        if not column:
+            raise ValueError("subscribers have no timestamp column")
+        watermark = self._get_state("watermark")
+        tombstone_watermark = self._get_state("tombstone_watermark")
+
+        changed = list(self.manager.iter_changes(
+            "email_subscribers",
+            column,
+            shift_timestamp(watermark, -SYNC_OVERLAP_SECONDS) if watermark else None,
+            columns=f"id,email,active,{column}",
+        ))
+        deleted = list(self.manager.iter_changes(
+            TOMBSTONES_TABLE,
+            "deleted_at",
+            shift_timestamp(tombstone_watermark, -SYNC_OVERLAP_SECONDS) if tombstone_watermark else None,
+        ))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO subscribers VALUES (?, ?, ?, ?)",
+                [self._row(s, column) for s in changed],
+            )
+            self._conn.executemany(
+                "DELETE FROM subscribers WHERE id = ?", [(t["id"],) for t in deleted]
+            )
+            self._set_state({
+                "watermark": max(
+                    [s[column] for s in changed if s.get(column)] + ([watermark] if watermark else []),
+                    default=None,
+                ),
+                "tombstone_watermark": max(
+                    [t["deleted_at"] for t in deleted if t.get("deleted_at")]
+                    + ([tombstone_watermark] if tombstone_watermark else []),
+                    default=None,
+                ),
+            })
+            self._conn.commit()
+
+        return {"upserted": len(changed), "deleted": len(deleted), "full": False}
+
+    def iter_subscribers(
+        self, active_only: bool = True, page_size: int = 1000, after_id: str = ""
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream cached subscribers in ID order.
+
+        Args:
+            active_only: Only return active subscribers
+            page_size: Rows read from SQLite at a time
+            after_id: Only return subscribers whose ID sorts after this one
+
+        Yields:
+            Subscriber dictionaries with "id", "email" and "active"
+        """
+        active_clause = "AND active = 1" if active_only else ""
+        last_id = after_id
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, email, active FROM subscribers WHERE id > ? {active_clause} "
+                    "ORDER BY id LIMIT ?",
+                    (last_id, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            for subscriber_id, email, active in rows:
+                yield {"id": subscriber_id, "email": email, "active": bool(active)}
+            last_id = rows[-1][0]
+
+    def active_emails(self, subscriber_ids: List[str]) -> Dict[str, str]:
+        """
+        Look up the addresses of subscribers cached as active.
+
+        Args:
+            subscriber_ids: Subscriber IDs to look up
+
+        Returns:
+            Dict of active subscriber ID to email address
+
+        Raises:
+            ValueError: If addresses missing from the cache cannot be fetched
+        """
+        if not subscriber_ids:
+            return {}
+        placeholders = ",".join("?" * len(subscriber_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, email FROM subscribers WHERE active = 1 AND email != '' "
+                f"AND id IN ({placeholders})",
+                list(subscriber_ids),
+            ).fetchall()
+        emails = dict(rows)
+
+        # A cache that does not hold the full list, e.g. in a CI run resuming
+        # batches queued by an earlier one, asks Supabase for the rest
+        missing = [i for i in subscriber_ids if i not in emails]
+        if missing and not self.synced():
+            fetched = self.manager.get_subscribers_by_id(missing)
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO subscribers VALUES (?, ?, ?, ?)",
+                    [self._row(s, None) for s in fetched],
+                )
+                self._conn.commit()
+            emails.update((s["id"], s["email"]) for s in fetched if s.get("email"))
+        return emails
+
+    def get_subscribers(self, active_only: bool = True) -> List[Dict[str, Any]]:
+        """
+        Get cached subscribers.
+
+        Args:
+            active_only: Only return active subscribers
+
+        Returns:
+            List of subscriber dictionaries
+        """
+        return list(self.iter_subscribers(active_only))
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
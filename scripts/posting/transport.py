@@ -0,0 +1,353 @@
+"""
+Shared HTTP transport for outbound API calls.
+
+requests sessions and httpx clients are configured from
+config/transport.json (or the file named by TRANSPORT_CONFIG): each host gets
+its own connection pool and pool size, connections are kept alive between
+requests, connect and read timeouts apply by default, and httpx negotiates
+HTTP/2 when the h2 package is installed. Sessions share their connection
+pools, so a Supabase or X connection opened by one caller is reused by the
+next. Every request is counted per host, with whether it reused a pooled
+connection, and metrics() reports the pool hit rates.
+"""
+
+import importlib.util
+import json
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from .results_log import write_json_atomic
+from .state import state_path
+
+DEFAULT_CONFIG_PATH = os.path.join("config", "transport.json")
+
+DEFAULT_SETTINGS = {
+    "pool_size": 10,
+    "connect_timeout": 10.0,
+    "read_timeout": 60.0,
+    "keepalive_expiry": 30.0,
+    "http2": True,
+}
+
+# Hosts without their own pool size share one adapter, which keeps a pool
+# for up to this many hosts
+DEFAULT_POOLED_HOSTS = 32
+
+
+class PoolMetrics:
+    """Per-host counts of requests and of pooled connections they reused."""
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._seen = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def record(self, host: str, connection: Any):
+        """
+        Count a request.
+
+        Args:
+            host: Host the request went to
+            connection: The connection (or network stream) that carried it;
+                a connection seen before was reused from the pool
+        """
+        with self._lock:
+            counts = self._counts.setdefault(host or "", {"requests": 0, "reused": 0})
+            counts["requests"] += 1
+            if connection is None:
+                return
+            try:
+                if connection in self._seen:
+                    counts["reused"] += 1
+                else:
+                    self._seen.add(connection)
+            except TypeError:
+                # Not weak-referenceable; counted as a new connection
+                pass
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the counts so far.
+
+        Returns:
+            Dict of host to "requests", "reused" and "hit_rate" (reused / requests)
+        """
+        with self._lock:
+            return {
+                host: {
+                    **counts,
+                    "hit_rate": round(counts["reused"] / counts["requests"], 4)
+                    if counts["requests"]
+                    else 0.0,
+                }
+                for host, counts in sorted(self._counts.items())
+            }
+
+
+class PooledAdapter(HTTPAdapter):
+    """requests adapter with a default timeout that counts pool reuse."""
+
+    def __init__(self, metrics: PoolMetrics, timeout: tuple, pool_size: int, pooled_hosts: int):
+        """
+        Initialize the adapter.
+
+        Args:
+            metrics: Where requests are counted
+            timeout: Default (connect, read) timeout
+            pool_size: Connections kept per host
+            pooled_hosts: Hosts a pool is kept for
+        """
+        self.metrics = metrics
+        self.timeout = timeout
+        super().__init__(pool_connections=pooled_hosts, pool_maxsize=pool_size)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        response = super().send(
+            request,
+            stream=stream,
+            timeout=self.timeout if timeout is None else timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+        self.metrics.record(
+            urlsplit(request.url).hostname, getattr(response.raw, "connection", None)
+        )
+        return response
+
+    def close(self):
+        # The adapter is shared by every session, and some clients (tweepy's
+        # API) close their session after each call; the pools are closed by
+        # Transport.close() instead
+        pass
+
+    def close_pools(self):
+        """Close the adapter's connection pools."""
+        super().close()
+
+
+class _MeteredTransport(httpx.BaseTransport):
+    """httpx transport that counts pool reuse of the transport it wraps."""
+
+    def __init__(self, transport: httpx.BaseTransport, metrics: PoolMetrics):
+        self.transport = transport
+        self.metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self.transport.handle_request(request)
+        self.metrics.record(request.url.host, response.extensions.get("network_stream"))
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class _MeteredAsyncTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of _MeteredTransport."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: PoolMetrics):
+        self.transport = transport
+        self.metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        self.metrics.record(request.url.host, response.extensions.get("network_stream"))
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class Transport:
+    """Factory for pooled requests sessions and httpx clients."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the transport.
+
+        Args:
+            config: Transport configuration; loaded from file when omitted
+        """
+        self.config = config if config is not None else self.load_config()
+        self.defaults = {**DEFAULT_SETTINGS, **self.config.get("default", {})}
+        self.hosts: Dict[str, Dict[str, Any]] = self.config.get("hosts", {})
+        self.http2 = bool(self.defaults["http2"]) and importlib.util.find_spec("h2") is not None
+        self.metrics = PoolMetrics()
+        self._adapters: Optional[Dict[str, PooledAdapter]] = None
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load the transport configuration file.
+
+        Args:
+            config_path: Path to the JSON config file
+
+        Returns:
+            Configuration dict, empty if the file does not exist
+        """
+        config_path = config_path or os.getenv("TRANSPORT_CONFIG", DEFAULT_CONFIG_PATH)
+        if not os.path.exists(config_path):
+            return {}
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load transport config '{config_path}': {str(e)}")
+            return {}
+
+    def _pool_size(self, host: Optional[str] = None) -> int:
+        settings = self.hosts.get(host, {}) if host else {}
+        return max(int(settings.get("pool_size", self.defaults["pool_size"])), 1)
+
+    @property
+    def timeout(self) -> tuple:
+        """Default (connect, read) timeout in seconds."""
+        return (float(self.defaults["connect_timeout"]), float(self.defaults["read_timeout"]))
+
+    def _get_adapters(self) -> Dict[str, PooledAdapter]:
+        """Create the shared adapters on first use, keyed by mount prefix."""
+        with self._lock:
+            if self._adapters is None:
+                default = PooledAdapter(
+                    self.metrics, self.timeout, self._pool_size(), DEFAULT_POOLED_HOSTS
+                )
+                self._adapters = {"http://": default, "https://": default}
+                for host in self.hosts:
+                    self._adapters[f"https://{host}/"] = PooledAdapter(
+                        self.metrics, self.timeout, self._pool_size(host), 1
+                    )
+            return self._adapters
+
+    def session(self, session: Optional[requests.Session] = None) -> requests.Session:
+        """
+        Get a requests session that uses the shared connection pools.
+
+        Args:
+            session: Session to set up, e.g. one created by an API client
+                library; a new session when omitted
+
+        Returns:
+            The session
+        """
+        session = session if session is not None else requests.Session()
+        for prefix, adapter in self._get_adapters().items():
+            session.mount(prefix, adapter)
+        return session
+
+    def _limits(self, host: Optional[str] = None) -> httpx.Limits:
+        pool_size = self._pool_size(host)
+        return httpx.Limits(
+            max_connections=pool_size if host else None,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=float(self.defaults["keepalive_expiry"]),
+        )
+
+    def _httpx_timeout(self) -> httpx.Timeout:
+        connect, read = self.timeout
+        return httpx.Timeout(read, connect=connect)
+
+    def client(self) -> httpx.Client:
+        """
+        Get the process-wide httpx client.
+
+        Returns:
+            The client, shared by every caller; do not close it
+        """
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    transport=_MeteredTransport(
+                        httpx.HTTPTransport(limits=self._limits(), http2=self.http2),
+                        self.metrics,
+                    ),
+                    mounts={
+                        f"all://{host}": _MeteredTransport(
+                            httpx.HTTPTransport(limits=self._limits(host), http2=self.http2),
+                            self.metrics,
+                        )
+                        for host in self.hosts
+                    },
+                    timeout=self._httpx_timeout(),
+                )
+            return self._client
+
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        Create an httpx client for use in an event loop.
+
+        Connections cannot be shared between event loops, so each call
+        returns a new client; use it as an async context manager.
+
+        Returns:
+            The client
+        """
+        return httpx.AsyncClient(
+            transport=_MeteredAsyncTransport(
+                httpx.AsyncHTTPTransport(limits=self._limits(), http2=self.http2),
+                self.metrics,
+            ),
+            mounts={
+                f"all://{host}": _MeteredAsyncTransport(
+                    httpx.AsyncHTTPTransport(limits=self._limits(host), http2=self.http2),
+                    self.metrics,
+                )
+                for host in self.hosts
+            },
+            timeout=self._httpx_timeout(),
+        )
+
+    def report_metrics(self, metrics_path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Print the pool hit rate of each host and save the metrics to a file.
+
+        Args:
+            metrics_path: Where to save the metrics; defaults to
+                transport_metrics.json in the state directory
+
+        Returns:
+            The metrics, as returned by PoolMetrics.snapshot()
+        """
+        metrics = self.metrics.snapshot()
+        for host, counts in metrics.items():
+            print(
+                f"🔌 {host}: {counts['requests']} requests, "
+                f"{counts['hit_rate']:.0%} on pooled connections"
+            )
+        try:
+            write_json_atomic(metrics_path or state_path("transport_metrics.json"), metrics)
+        except OSError as e:
+            print(f"Warning: Could not save transport metrics: {str(e)}")
+        return metrics
+
+    def close(self):
+        """Close the shared connection pools and client."""
+        with self._lock:
+            for adapter in set((self._adapters or {}).values()):
+                adapter.close_pools()
+            self._adapters = None
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+_transport: Optional[Transport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """Return the process-wide transport."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
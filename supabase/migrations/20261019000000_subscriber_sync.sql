@@ -0,0 +1,47 @@
+-- Support incremental subscriber sync (scripts/posting/subscriber_cache.py)
+
+-- Track when each subscriber row last changed
+ALTER TABLE email_subscribers
+  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+UPDATE email_subscribers SET updated_at = created_at WHERE updated_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS email_subscribers_updated_at_idx
+  ON email_subscribers(updated_at, id);
+
+CREATE OR REPLACE FUNCTION set_email_subscribers_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at = NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS email_subscribers_set_updated_at ON email_subscribers;
+CREATE TRIGGER email_subscribers_set_updated_at
+  BEFORE UPDATE ON email_subscribers
+  FOR EACH ROW EXECUTE FUNCTION set_email_subscribers_updated_at();
+
+-- Record deleted subscribers (e.g. by the unsubscribe function) as tombstones
+CREATE TABLE IF NOT EXISTS email_subscriber_tombstones (
+  id UUID PRIMARY KEY,
+  deleted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS email_subscriber_tombstones_deleted_at_idx
+  ON email_subscriber_tombstones(deleted_at, id);
+
+CREATE OR REPLACE FUNCTION record_email_subscriber_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO email_subscriber_tombstones (id, deleted_at)
+  VALUES (OLD.id, NOW())
+  ON CONFLICT (id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS email_subscribers_record_tombstone ON email_subscribers;
+CREATE TRIGGER email_subscribers_record_tombstone
+  AFTER DELETE ON email_subscribers
+  FOR EACH ROW EXECUTE FUNCTION record_email_subscriber_tombstone();
@@ -0,0 +1,51 @@
+"""
+Shared fixtures for the posting tests.
+
+The scripts are run from the repository root with scripts/ on the path, so
+the tests import the posting package the same way.
+"""
+
+import json
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+# Rate limits that never make a test wait
+FAST_RATE_LIMITS = {
+    "default": {"rate": 1000.0, "capacity": 1000},
+    "backoff": {"base_delay": 0.0, "max_delay": 0.0, "max_retries": 3},
+}
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    """Give each test its own posting state and rate limiter."""
+    from posting import rate_limit
+
+    config_path = tmp_path / "rate_limits.json"
+    config_path.write_text(json.dumps(FAST_RATE_LIMITS))
+    monkeypatch.setenv("RATE_LIMIT_CONFIG", str(config_path))
+    monkeypatch.setenv("POSTING_STATE_DIR", str(tmp_path / "state"))
+    monkeypatch.setattr(rate_limit, "_rate_limiter", None)
+    return tmp_path / "state"
+
+
+@pytest.fixture
+def mock_http(monkeypatch):
+    """
+    Route the shared transport's async clients to a handler.
+
+    Returns:
+        Function taking the handler, a callable from httpx.Request to httpx.Response
+    """
+
+    def route(handler):
+        monkeypatch.setattr(
+            httpx, "AsyncHTTPTransport", lambda **kwargs: httpx.MockTransport(handler)
+        )
+
+    return route
@@ -0,0 +1,74 @@
+"""
+In-memory stand-in for EmailSubscriberManager.
+
+Serves subscribers and tombstones the way the Supabase REST API does for
+SubscriberCache: keyset pages in ID order with the active filter and column
+list applied, and changes ordered by a timestamp column.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class FakeSubscriberManager:
+    """Subscribers held in a dict, with counts of what was fetched."""
+
+    def __init__(self, subscribers: Optional[List[Dict[str, Any]]] = None):
+        self.subscribers = {s["id"]: dict(s) for s in subscribers or []}
+        self.tombstones: List[Dict[str, Any]] = []
+        self.downloads = 0
+        self.lookups: List[List[str]] = []
+
+    def iter_subscribers(
+        self,
+        active_only: bool = True,
+        columns: str = "id,email",
+        page_size: int = 1000,
+        after_id: str = "",
+    ) -> Iterator[Dict[str, Any]]:
+        self.downloads += 1
+        for subscriber_id in sorted(self.subscribers):
+            subscriber = self.subscribers[subscriber_id]
+            if subscriber_id <= after_id or (active_only and not subscriber["active"]):
+                continue
+            yield self._select(subscriber, columns)
+
+    def iter_changes(
+        self,
+        table: str,
+        column: str,
+        since: Optional[str] = None,
+        columns: str = "*",
+        page_size: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        rows = self.subscribers.values() if table == "email_subscribers" else self.tombstones
+        changed = [r for r in rows if since is None or r[column] >= since]
+        for row in sorted(changed, key=lambda r: r[column]):
+            yield self._select(row, columns)
+
+    def get_subscribers_by_id(
+        self, subscriber_ids: List[str], active_only: bool = True, columns: str = "id,email"
+    ) -> List[Dict[str, Any]]:
+        self.lookups.append(list(subscriber_ids))
+        return [
+            {**self._select(self.subscribers[i], columns), "active": True}
+            for i in subscriber_ids
+            if i in self.subscribers and (self.subscribers[i]["active"] or not active_only)
+        ]
+
+    @staticmethod
+    def _select(row: Dict[str, Any], columns: str) -> Dict[str, Any]:
+        if columns == "*":
+            return dict(row)
+        return {c: row[c] for c in columns.split(",") if c in row}
+
+
+def subscriber(
+    i: int, active: bool = True, updated_at: str = "2024-01-01T00:00:00+00:00"
+) -> Dict[str, Any]:
+    """Build subscriber number i."""
+    return {
+        "id": f"sub-{i:04}",
+        "email": f"reader{i}@example.com",
+        "active": active,
+        "updated_at": updated_at,
+    }
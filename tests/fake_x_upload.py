@@ -0,0 +1,178 @@
+"""
+Local fake of X's v1.1 chunked media upload endpoint.
+
+Implements INIT, APPEND, FINALIZE and STATUS closely enough to exercise
+ChunkedMediaUploader, with switches to fail APPEND segments, FINALIZE or
+processing. Run it on its own and point TWITTER_UPLOAD_URL at it to try
+uploads without touching X:
+
+    python tests/fake_x_upload.py 8765
+    TWITTER_UPLOAD_URL=http://127.0.0.1:8765/ python scripts/post_social_media.py ...
+"""
+
+import email
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeXUpload:
+    """The fake endpoint: a threaded HTTP server and what it has received."""
+
+    def __init__(self, port: int = 0):
+        """
+        Initialize the fake.
+
+        Args:
+            port: Port to listen on; any free port when 0
+        """
+        self.commands: List[Dict[str, Any]] = []
+        self.segments: Dict[str, Dict[int, bytes]] = {}
+        self.media: Dict[str, Dict[str, Any]] = {}
+        # Segment indexes whose first APPEND gets a 503
+        self.fail_segments: Set[int] = set()
+        # Status of the FINALIZE response; 200 succeeds
+        self.finalize_status = 200
+        # processing_info states returned by FINALIZE and then each STATUS;
+        # an empty list means the media needs no processing
+        self.processing: List[str] = []
+        self.processing_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._next_id = 1000
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """URL of the endpoint."""
+        return f"http://127.0.0.1:{self.server.server_port}/1.1/media/upload.json"
+
+    def start(self) -> "FakeXUpload":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeXUpload":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def uploaded(self, media_id: str) -> bytes:
+        """Get the bytes appended to a media ID, in segment order."""
+        segments = self.segments.get(media_id, {})
+        return b"".join(segments[i] for i in sorted(segments))
+
+    def _processing_info(self, media_id: str) -> Optional[Dict[str, Any]]:
+        states = self.media[media_id]["processing"]
+        if not states:
+            return None
+        state = states.pop(0) if len(states) > 1 else states[0]
+        info = {"state": state, "check_after_secs": 0}
+        if state == "failed":
+            info["error"] = {"message": self.processing_error or "InvalidMedia"}
+        return info
+
+    def handle(self, method: str, fields: Dict[str, Any]) -> tuple:
+        """
+        Answer one request.
+
+        Args:
+            method: HTTP method
+            fields: Form fields, query parameters or multipart parts
+
+        Returns:
+            Tuple of (status code, JSON body or None)
+        """
+        command = fields.get("command")
+        with self._lock:
+            self.commands.append({"method": method, **{k: v for k, v in fields.items() if k != "media"}})
+            if command == "INIT":
+                media_id = str(self._next_id)
+                self._next_id += 1
+                self.media[media_id] = {
+                    "total_bytes": int(fields["total_bytes"]),
+                    "media_type": fields["media_type"],
+                    "media_category": fields.get("media_category"),
+                    "processing": list(self.processing),
+                }
+                self.segments[media_id] = {}
+                return 202, {"media_id": int(media_id), "media_id_string": media_id}
+
+            media_id = fields.get("media_id")
+            if media_id not in self.media:
+                return 400, {"errors": [{"message": "Invalid media_id"}]}
+
+            if command == "APPEND":
+                index = int(fields["segment_index"])
+                if index in self.fail_segments:
+                    self.fail_segments.discard(index)
+                    return 503, {"errors": [{"message": "Service unavailable"}]}
+                self.segments[media_id][index] = fields["media"]
+                return 204, None
+
+            if command == "FINALIZE":
+                if self.finalize_status != 200:
+                    return self.finalize_status, {"errors": [{"message": "Finalize failed"}]}
+                received = len(self.uploaded(media_id))
+                if received != self.media[media_id]["total_bytes"]:
+                    return 400, {"errors": [{"message": "Segments do not add up"}]}
+                body = {"media_id_string": media_id, "size": received}
+                info = self._processing_info(media_id)
+                if info:
+                    body["processing_info"] = info
+                return 201, body
+
+            if command == "STATUS" and method == "GET":
+                return 200, {"media_id_string": media_id, "processing_info": self._processing_info(media_id)}
+
+        return 400, {"errors": [{"message": f"Unknown command {command}"}]}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: Optional[Dict[str, Any]]):
+                data = json.dumps(body).encode("utf-8") if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                query = parse_qs(urlsplit(self.path).query)
+                self._reply(*fake.handle("GET", {k: v[0] for k, v in query.items()}))
+
+            def do_POST(self):
+                content_type = self.headers.get("Content-Type", "")
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if content_type.startswith("multipart/form-data"):
+                    message = email.message_from_bytes(
+                        f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+                    )
+                    fields = {}
+                    for part in message.get_payload():
+                        name = part.get_param("name", header="content-disposition")
+                        value = part.get_payload(decode=True)
+                        fields[name] = value if name == "media" else value.decode("utf-8")
+                else:
+                    fields = {k: v[0] for k, v in parse_qs(body.decode("utf-8")).items()}
+                self._reply(*fake.handle("POST", fields))
+
+        return Handler
+
+
+if __name__ == "__main__":
+    fake = FakeXUpload(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
+    print(f"Fake X upload endpoint at {fake.url}")
+    fake.server.serve_forever()
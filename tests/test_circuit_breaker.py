@@ -0,0 +1,60 @@
+"""Tests for the per-platform circuit breaker."""
+
+import pytest
+
+from posting import circuit_breaker
+from posting.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 100.0}
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now["t"])
+    return now
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("X", failure_threshold=3, recovery_timeout=60)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    clock["t"] += 20
+    assert breaker.retry_in() == pytest.approx(40)
+
+
+def test_half_open_trial_closes_or_reopens_the_circuit(clock):
+    breaker = CircuitBreaker("X", failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+
+    clock["t"] += 60
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    # Only one trial request at a time
+    assert not breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.retry_in() == pytest.approx(60)
+
+    clock["t"] += 60
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.retry_in() == 0.0
+    assert breaker.allow_request() and breaker.allow_request()
+
+
+def test_thresholds_come_from_the_config(tmp_path, monkeypatch):
+    config_path = tmp_path / "circuit_breakers.json"
+    config_path.write_text('{"default": {"failure_threshold": 4}, "platforms": {"X": {"recovery_timeout": 900}}}')
+    monkeypatch.setattr(circuit_breaker, "_config", None)
+    monkeypatch.setenv("CIRCUIT_BREAKER_CONFIG", str(config_path))
+
+    assert CircuitBreaker.for_platform("X").recovery_timeout == 900
+    assert CircuitBreaker.for_platform("Reddit").failure_threshold == 4
@@ -0,0 +1,100 @@
+"""Tests for the native async LinkedIn client."""
+
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+
+UPLOAD_HOST = "upload.linkedin.test"
+
+
+@pytest.fixture
+def platform(monkeypatch):
+    monkeypatch.setenv("LINKEDIN_ACCESS_TOKEN", "token")
+    monkeypatch.setenv("LINKEDIN_USER_ID", "person-1")
+    from posting.platforms.linkedin import LinkedInPlatform
+
+    return LinkedInPlatform()
+
+
+@pytest.fixture
+def version_folder(tmp_path):
+    media = tmp_path / "v1" / "media"
+    media.mkdir(parents=True)
+    files = {}
+    for name in ("a.png", "b.jpg"):
+        files[name] = os.urandom(1024)
+        (media / name).write_bytes(files[name])
+    return tmp_path / "v1", files
+
+
+def test_post_content_async_uploads_media_and_shares(platform, mock_http, version_folder):
+    folder, files = version_folder
+    assets = []
+    uploads = {}
+    shares = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == UPLOAD_HOST:
+            assert request.method == "PUT"
+            assert request.headers["authorization"] == "Bearer token"
+            uploads[request.url.path] = (request.headers["content-type"], request.read())
+            return httpx.Response(201)
+        assert request.headers["authorization"] == "Bearer token"
+        assert request.headers["x-restli-protocol-version"] == "2.0.0"
+        body = json.loads(request.content)
+        if request.url.path == "/v2/assets":
+            owner = body["registerUploadRequest"]["owner"]
+            assert owner == "urn:li:person:person-1"
+            assets.append(f"urn:li:digitalmediaAsset:{len(assets)}")
+            asset = assets[-1]
+            return httpx.Response(200, json={"value": {
+                "asset": asset,
+                "uploadMechanism": {
+                    "com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest": {
+                        "uploadUrl": f"https://{UPLOAD_HOST}/{asset}",
+                    },
+                },
+            }})
+        if request.url.path == "/v2/ugcPosts":
+            shares.append(body)
+            return httpx.Response(201, json={"id": "urn:li:share:1"})
+        return httpx.Response(404)
+
+    mock_http(handler)
+    result = asyncio.run(platform.post_content_async("hello", "page", str(folder)))
+
+    assert result["status"] == "success", result.get("error")
+    assert result["url"] == "https://www.linkedin.com/feed/update/urn:li:share:1"
+    assert sorted(body for _, body in uploads.values()) == sorted(files.values())
+    assert {content_type for content_type, _ in uploads.values()} == {"image/png", "image/jpeg"}
+
+    share = shares[0]["specificContent"]["com.linkedin.ugc.ShareContent"]
+    assert share["shareCommentary"]["text"] == "hello"
+    assert share["shareMediaCategory"] == "IMAGE"
+    assert {m["media"] for m in share["media"]} == set(assets)
+    assert {path.lstrip("/") for path in uploads} == set(assets)
+
+
+def test_post_content_async_falls_back_to_text_when_upload_fails(
+    platform, mock_http, version_folder
+):
+    folder, _ = version_folder
+    shares = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/v2/assets":
+            return httpx.Response(500, text="unavailable")
+        if request.url.path == "/v2/ugcPosts":
+            shares.append(json.loads(request.content))
+            return httpx.Response(201, json={"id": "urn:li:share:2"})
+        return httpx.Response(404)
+
+    mock_http(handler)
+    result = asyncio.run(platform.post_content_async("hello", "page", str(folder)))
+
+    assert result["status"] == "success", result.get("error")
+    share = shares[0]["specificContent"]["com.linkedin.ugc.ShareContent"]
+    assert share["shareMediaCategory"] == "NONE"
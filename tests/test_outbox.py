@@ -0,0 +1,142 @@
+"""Tests for the SQLite outbox of jobs."""
+
+import time
+
+import pytest
+
+from posting.outbox import DONE, FAILED, LEASED, PENDING, Outbox
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(db_path=tmp_path / "outbox.db", lease_seconds=60, max_attempts=2)
+
+
+def test_enqueue_is_idempotent(outbox):
+    assert outbox.enqueue("publish", "page/Twitter", "page", {"n": 1})
+    assert not outbox.enqueue("publish", "page/Twitter", "page", {"n": 2})
+
+    [job] = outbox.jobs("publish", "page")
+    assert job["payload"] == {"n": 1}
+    assert job["status"] == PENDING
+
+
+def test_leased_job_is_reserved_until_its_lease_expires(outbox, tmp_path):
+    outbox.enqueue("publish", "page/Twitter", "page", {})
+    other = Outbox(db_path=tmp_path / "outbox.db", lease_seconds=60)
+
+    [job] = outbox.lease("publish", "page")
+    assert job["status"] == LEASED and job["attempts"] == 1
+    assert other.lease("publish", "page") == []
+
+    # The worker died: once the lease runs out another worker takes over
+    outbox._conn.execute("UPDATE jobs SET lease_expires = ?", (time.time() - 1,))
+    [taken_over] = other.lease("publish", "page")
+    assert taken_over["id"] == job["id"]
+    assert taken_over["attempts"] == 2
+
+
+def test_ack_finishes_a_job(outbox):
+    outbox.enqueue("publish", "page/Twitter", "page", {})
+    [job] = outbox.lease("publish", "page")
+
+    outbox.ack(job["id"], {"url": "https://x.com/1"})
+
+    [done] = outbox.jobs("publish", "page")
+    assert done["status"] == DONE and done["result"] == {"url": "https://x.com/1"}
+    assert outbox.lease("publish", "page") == []
+    assert outbox.outstanding_groups("publish") == []
+
+
+def test_fail_retries_with_backoff_then_marks_the_job_failed(outbox):
+    outbox.enqueue("publish", "page/Twitter", "page", {})
+
+    [job] = outbox.lease("publish", "page")
+    outbox.fail(job["id"], "timed out", retry_in=30)
+    [job] = outbox.jobs("publish", "page")
+    assert job["status"] == PENDING and job["error"] == "timed out"
+    # Not leased again until the backoff is over
+    assert outbox.lease("publish", "page") == []
+
+    outbox._conn.execute("UPDATE jobs SET available_at = ?", (time.time() - 1,))
+    [job] = outbox.lease("publish", "page")
+    outbox.fail(job["id"], "timed out again")
+    [job] = outbox.jobs("publish", "page")
+    assert job["status"] == FAILED and job["attempts"] == 2
+    assert outbox.lease("publish", "page") == []
+
+
+def test_release_does_not_count_the_attempt(outbox):
+    outbox.enqueue("publish", "page/Twitter", "page", {})
+
+    for _ in range(3):
+        [job] = outbox.lease("publish", "page")
+        outbox.release(job["id"], error="rate limited")
+
+    [job] = outbox.jobs("publish", "page")
+    assert job["status"] == PENDING
+    assert job["attempts"] == 0
+    assert job["error"] == "rate limited"
+
+
+def use_up_attempts(outbox, group):
+    """Lease and fail a group's jobs until they are marked failed."""
+    for _ in range(outbox.max_attempts):
+        for job in outbox.lease("email_batch", group, limit=10):
+            outbox.fail(job["id"], "boom")
+
+
+def test_failed_job_is_queued_again_with_fresh_attempts(outbox):
+    outbox.enqueue("email_batch", "campaign/0", "campaign", {"recipients": ["a"]})
+    use_up_attempts(outbox, "campaign")
+    assert outbox.jobs("email_batch", "campaign")[0]["status"] == FAILED
+
+    assert outbox.enqueue("email_batch", "campaign/0", "campaign", {"recipients": ["b"]})
+    [job] = outbox.jobs("email_batch", "campaign")
+    assert job["status"] == PENDING
+    assert job["attempts"] == 0
+    assert job["error"] is None
+    assert job["payload"] == {"recipients": ["b"]}
+
+
+def test_retry_failed_only_touches_failed_jobs_of_the_groups(outbox):
+    for key, group in (("a/0", "a"), ("a/1", "a"), ("b/0", "b")):
+        outbox.enqueue("email_batch", key, group, {})
+    [sent] = outbox.lease("email_batch", "a")
+    outbox.ack(sent["id"])
+    use_up_attempts(outbox, "a")
+    use_up_attempts(outbox, "b")
+
+    assert outbox.retry_failed("email_batch", ["a"]) == 1
+    statuses = {
+        job["job_key"]: job["status"]
+        for group in "ab"
+        for job in outbox.jobs("email_batch", group)
+    }
+    assert statuses == {"a/0": DONE, "a/1": PENDING, "b/0": FAILED}
+
+
+def test_outstanding_counts_unfinished_jobs_and_when_they_are_ready(outbox):
+    for i in range(3):
+        outbox.enqueue("email_batch", f"campaign/{i}", "campaign", {})
+    leased, retried, done = outbox.lease("email_batch", "campaign", limit=3)
+    outbox.release(retried["id"], retry_in=30)
+    outbox.ack(done["id"])
+
+    summary = outbox.outstanding("email_batch", ["campaign", "other"])
+    assert summary[PENDING] == 1
+    assert summary[LEASED] == 1
+    # The leased job is the last to become available again
+    assert 55 < summary["ready_in"] <= 60
+    assert outbox.outstanding("email_batch", []) == {PENDING: 0, LEASED: 0, "ready_in": 0.0}
+
+
+def test_checkpoint_survives_a_failure(outbox):
+    outbox.enqueue("email_campaign", "campaign", "campaign", {"shards": 1})
+    [job] = outbox.lease("email_campaign", "campaign")
+
+    outbox.checkpoint(job["id"], {"shards": 1, "last_ids": ["sub-0099"]})
+    outbox.fail(job["id"], "subscriber fetch failed")
+
+    [job] = outbox.lease("email_campaign", "campaign")
+    assert job["payload"] == {"shards": 1, "last_ids": ["sub-0099"]}
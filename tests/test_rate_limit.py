@@ -0,0 +1,93 @@
+"""Tests for the token bucket rate limiter."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from posting import rate_limit
+from posting.rate_limit import RateLimiter, TokenBucket
+
+CONFIG = {
+    "default": {"rate": 1.0, "capacity": 1},
+    "backoff": {"base_delay": 1.0, "max_delay": 8.0, "max_retries": 2},
+    "platforms": {"X": {"default": {"rate": 1.0, "capacity": 5}, "tweets": {"rate": 0.5, "capacity": 2}}},
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake clock that time.sleep advances, shared by every bucket."""
+    now = {"t": 1000.0, "slept": []}
+
+    def sleep(seconds):
+        now["slept"].append(seconds)
+        now["t"] += seconds
+
+    monkeypatch.setattr(TokenBucket, "clock", staticmethod(lambda: now["t"]))
+    monkeypatch.setattr(rate_limit.time, "sleep", sleep)
+    return now
+
+
+def response(status, **headers):
+    return SimpleNamespace(status_code=status, headers=headers)
+
+
+def test_bucket_allows_a_burst_then_paces_calls(clock):
+    bucket = TokenBucket(rate=0.5, capacity=2)
+
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(2.0)
+    assert bucket.acquire() == pytest.approx(2.0)
+
+
+def test_endpoints_fall_back_to_the_platform_then_global_default():
+    limiter = RateLimiter(CONFIG)
+
+    assert limiter.bucket("X", "tweets").capacity == 2
+    assert limiter.bucket("X", "media_upload").capacity == 5
+    assert limiter.bucket("Reddit", "submit").rate == 1.0
+    assert limiter.bucket("X", "tweets") is limiter.bucket("X", "tweets")
+
+
+def test_call_retries_a_429_after_retry_after(clock, monkeypatch):
+    limiter = RateLimiter(CONFIG)
+    monkeypatch.setattr(limiter, "backoff_delay", lambda attempt: 1.0)
+    responses = [response(429, **{"Retry-After": "30"}), response(200)]
+
+    result = limiter.call("X", "tweets", responses.pop, 0)
+
+    assert result.status_code == 200
+    # The bucket stays blocked for as long as the server asked
+    assert sum(clock["slept"]) == pytest.approx(30.0)
+
+
+def test_call_gives_up_after_max_retries(clock):
+    limiter = RateLimiter(CONFIG)
+    calls = []
+
+    def request():
+        calls.append(1)
+        return response(429)
+
+    assert limiter.call("X", "tweets", request).status_code == 429
+    assert len(calls) == 3
+
+
+def test_exhausted_quota_holds_the_next_call_until_reset(clock):
+    limiter = RateLimiter(CONFIG)
+    limiter.call("X", "default", lambda: response(200, **{"x-rate-limit-remaining": "0", "x-rate-limit-reset": "45"}))
+
+    assert limiter.acquire("X") == pytest.approx(45.0)
+
+
+def test_shared_buckets_replace_the_limiter_buckets():
+    limiter = RateLimiter(CONFIG)
+    buckets = limiter.shared_buckets("X")
+
+    other = RateLimiter(CONFIG)
+    other.use_buckets(buckets)
+    other.bucket("X", "tweets").acquire()
+    other.bucket("X", "tweets").acquire()
+
+    assert buckets[("X", "tweets")].tokens < 1
+    assert set(buckets) == {("X", "default"), ("X", "tweets")}
@@ -0,0 +1,74 @@
+"""Tests for sending a campaign with ResendPlatform.post_content_async."""
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from fake_subscribers import FakeSubscriberManager
+
+SUBSCRIBERS = {f"sub-{i:04}": f"reader{i}@example.com" for i in range(250)}
+
+
+@pytest.fixture
+def platform(monkeypatch):
+    monkeypatch.setenv("RESEND_API_KEY", "re_test")
+    monkeypatch.setenv("SUPABASE_URL", "https://supabase.test")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "key")
+    from posting.platforms.resend import ResendPlatform
+
+    platform = ResendPlatform()
+    platform.campaign_sender.subscriber_cache.manager = FakeSubscriberManager([
+        {"id": i, "email": e, "active": True, "updated_at": "2024-01-01T00:00:00+00:00"}
+        for i, e in SUBSCRIBERS.items()
+    ])
+    return platform
+
+
+def test_campaign_is_sent_once(platform, mock_http):
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["authorization"] == "Bearer re_test"
+        assert request.headers["idempotency-key"]
+        body = json.loads(request.content)
+        batch = body if isinstance(body, list) else [body]
+        received.extend(m["to"] for m in batch)
+        data = [{"id": f"msg-{m['to']}"} for m in batch]
+        return httpx.Response(200, json={"data": data} if isinstance(body, list) else data[0])
+
+    mock_http(handler)
+    content = "SUBJECT: New post\n# New post\n\nSome text"
+    result = asyncio.run(platform.post_content_async(content, "2024-01-01-post"))
+
+    assert result["status"] == "success", result.get("error")
+    assert result["emails"]["sent"] == len(SUBSCRIBERS)
+    assert sorted(received) == sorted(SUBSCRIBERS.values())
+
+    # Publishing again does not send to anyone twice
+    again = asyncio.run(platform.post_content_async(content, "2024-01-01-post"))
+    assert again["status"] == "success", again.get("error")
+    assert len(received) == len(SUBSCRIBERS)
+
+
+def test_hosted_media_falls_back_to_attachments(platform, monkeypatch, tmp_path):
+    monkeypatch.setenv("EMAIL_MEDIA_MODE", "hosted")
+    monkeypatch.setenv("EMAIL_MEDIA_BASE_URL", "https://blog.test")
+    hosted = tmp_path / 'chart "1".png'
+    missing = tmp_path / "draft.png"
+    hosted.write_bytes(b"png")
+    missing.write_bytes(b"png")
+    monkeypatch.setattr(platform, "media_url", lambda path: f"https://blog.test/{Path(path).name}")
+
+    def head(url, **kwargs):
+        return SimpleNamespace(status_code=404 if url.endswith("draft.png") else 200)
+
+    monkeypatch.setattr(platform.session, "head", head)
+    attachments, media_html = platform._prepare_media([str(hosted), str(missing)])
+
+    assert [a["filename"] for a in attachments] == ["draft.png"]
+    assert 'alt="chart &quot;1&quot;.png"' in media_html
+    assert "draft.png" not in media_html
@@ -0,0 +1,101 @@
+"""Tests for sending Resend batches with the SDK."""
+
+import pytest
+import resend
+
+from posting.platforms.resend_batch import ResendBatchSender, idempotency_key
+
+
+def messages(*recipients):
+    return [
+        {"from": "blog@example.com", "to": to, "subject": "Post", "html": "<p>Post</p>"}
+        for to in recipients
+    ]
+
+
+@pytest.fixture
+def sender():
+    return ResendBatchSender(backoff_delay=lambda attempt: 0)
+
+
+@pytest.fixture
+def resend_api(monkeypatch):
+    """Fake the SDK, answering each request with the error from error_for(recipients)."""
+    requests = []
+    api = {"error_for": lambda to: None, "requests": requests}
+
+    def send(params, options=None):
+        recipients = [m["to"] for m in params] if isinstance(params, list) else [params["to"]]
+        kind = "batch" if isinstance(params, list) else "email"
+        requests.append((kind, recipients, (options or {}).get("idempotency_key")))
+        error = api["error_for"](recipients)
+        if error is not None:
+            raise error
+        if isinstance(params, list):
+            return {"data": [{"id": f"id-{to}"} for to in recipients]}
+        return {"id": f"id-{recipients[0]}"}
+
+    monkeypatch.setattr(resend.Batch, "send", send)
+    monkeypatch.setattr(resend.Emails, "send", send)
+    return api
+
+
+def rejected():
+    return resend.exceptions.ValidationError("Invalid `to` field", "validation_error", 422)
+
+
+def test_rejected_batch_is_split_down_to_the_bad_address(sender, resend_api):
+    resend_api["error_for"] = lambda to: rejected() if "bad@example.com" in to else None
+    batch = messages(*(f"user{i}@example.com" for i in range(7)), "bad@example.com")
+
+    outcomes = sender.send(batch)
+
+    requests = resend_api["requests"]
+    assert [o["status"] for o in outcomes] == ["sent"] * 7 + ["failed"]
+    assert outcomes[0]["id"] == "id-user0@example.com"
+    assert outcomes[-1]["rejected"] is True
+    # A rejected single email is not retried
+    assert [to for kind, to, _ in requests if kind == "email"].count(["bad@example.com"]) == 1
+    assert requests[0][0] == "batch" and len(requests[0][1]) == 8
+    # Every request carries its own idempotency key
+    keys = [key for _, _, key in requests]
+    assert all(keys) and len(set(keys)) == len(keys)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        resend.exceptions.RateLimitError("Too many requests", "rate_limit_exceeded", 429),
+        resend.exceptions.ApplicationError("Internal server error", "application_error", 500),
+        TimeoutError("timed out"),
+    ],
+)
+def test_batch_that_may_have_been_sent_is_not_split(sender, resend_api, error):
+    resend_api["error_for"] = lambda to: error
+    batch = messages("a@example.com", "b@example.com", "c@example.com")
+
+    outcomes = sender.send(batch)
+
+    assert [o["status"] for o in outcomes] == ["failed"] * 3
+    assert not any(o.get("rejected") for o in outcomes)
+    assert [kind for kind, _, _ in resend_api["requests"]] == ["batch"]
+
+
+def test_batch_and_single_keys_come_from_the_message_keys(sender, resend_api):
+    keys = [idempotency_key("campaign", "sub-1"), idempotency_key("campaign", "sub-2")]
+
+    sender.send(messages("a@example.com", "b@example.com"), keys=keys)
+    sender.send(messages("a@example.com", "b@example.com"), use_batch=False, keys=keys)
+
+    assert [key for _, _, key in resend_api["requests"]] == [idempotency_key(*keys)] + keys
+
+
+def test_single_email_is_retried_with_the_same_key(sender, resend_api):
+    attempts = iter([TimeoutError("timed out"), TimeoutError("timed out"), None])
+    resend_api["error_for"] = lambda to: next(attempts)
+    key = idempotency_key("campaign", "sub-1")
+
+    outcomes = sender.send(messages("a@example.com"), keys=[key])
+
+    assert outcomes == [{"status": "sent", "id": "id-a@example.com"}]
+    assert [k for _, _, k in resend_api["requests"]] == [key] * 3
@@ -0,0 +1,106 @@
+"""Tests for sending Resend batches from an event loop."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from posting.platforms.resend_batch import (
+    BATCH_URL,
+    EMAILS_URL,
+    ResendBatchSender,
+    idempotency_key,
+)
+
+
+def messages(*recipients):
+    return [
+        {"from": "blog@example.com", "to": to, "subject": "Post", "html": "<p>Post</p>"}
+        for to in recipients
+    ]
+
+
+def run(handler, sender, batch, keys=None):
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await sender.send_async(client, batch, keys=keys)
+
+    return asyncio.run(send())
+
+
+@pytest.fixture
+def sender():
+    return ResendBatchSender(backoff_delay=lambda attempt: 0)
+
+
+def resend_api(requests, status_for):
+    """Fake Resend API answering each request with status_for(recipients)."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        recipients = [m["to"] for m in body] if isinstance(body, list) else [body["to"]]
+        requests.append((str(request.url), recipients, request.headers.get("idempotency-key")))
+        status = status_for(recipients)
+        if status != 200:
+            return httpx.Response(status, json={"statusCode": status, "message": "error"})
+        if isinstance(body, list):
+            return httpx.Response(200, json={"data": [{"id": f"id-{to}"} for to in recipients]})
+        return httpx.Response(200, json={"id": f"id-{recipients[0]}"})
+
+    return handler
+
+
+def test_rejected_batch_is_split_down_to_the_bad_address(sender):
+    requests = []
+    batch = messages(*(f"user{i}@example.com" for i in range(7)), "bad@example.com")
+    handler = resend_api(requests, lambda to: 422 if "bad@example.com" in to else 200)
+
+    outcomes = run(handler, sender, batch)
+
+    assert [o["status"] for o in outcomes] == ["sent"] * 7 + ["failed"]
+    assert outcomes[0]["id"] == "id-user0@example.com"
+    assert outcomes[-1]["rejected"] is True
+    # A rejected single email is not retried
+    assert [to for url, to, _ in requests if url == EMAILS_URL].count(["bad@example.com"]) == 1
+    assert requests[0][0] == BATCH_URL and len(requests[0][1]) == 8
+    # Every request carries its own idempotency key
+    keys = [key for _, _, key in requests]
+    assert all(keys) and len(set(keys)) == len(keys)
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_batch_that_may_have_been_sent_is_not_split(sender, status):
+    requests = []
+    batch = messages("a@example.com", "b@example.com", "c@example.com")
+
+    outcomes = run(resend_api(requests, lambda to: status), sender, batch)
+
+    assert [o["status"] for o in outcomes] == ["failed"] * 3
+    assert not any(o.get("rejected") for o in outcomes)
+    assert all(url == BATCH_URL for url, _, _ in requests)
+    assert len({key for _, _, key in requests}) == 1
+
+
+def test_idempotency_keys_are_stable_across_retries(sender):
+    keys = [idempotency_key("campaign", "sub-1"), idempotency_key("campaign", "sub-2")]
+    batch = messages("a@example.com", "b@example.com")
+    first, second = [], []
+
+    run(resend_api(first, lambda to: 500), sender, batch, keys)
+    run(resend_api(second, lambda to: 200), sender, batch, keys)
+
+    assert first[0][2] == second[0][2] == idempotency_key(*keys)
+
+
+def test_single_email_is_retried_with_the_same_key(sender):
+    requests = []
+    attempts = iter([500, 500, 200])
+    key = idempotency_key("campaign", "sub-1")
+
+    outcomes = run(
+        resend_api(requests, lambda to: next(attempts)), sender, messages("a@example.com"), [key]
+    )
+
+    assert outcomes == [{"status": "sent", "id": "id-a@example.com"}]
+    assert [k for _, _, k in requests] == [key] * 3
@@ -0,0 +1,62 @@
+"""Tests that the pinned Resend SDK sends through PooledResendClient with idempotency keys."""
+
+from types import SimpleNamespace
+
+import pytest
+import resend
+
+from posting.platforms.resend_batch import is_rejected
+
+
+@pytest.fixture
+def sdk_requests(monkeypatch):
+    """Install ResendPlatform's client and record the requests the SDK makes."""
+    monkeypatch.setenv("RESEND_API_KEY", "re_test")
+    monkeypatch.setattr(resend, "default_http_client", resend.default_http_client)
+    from posting.platforms.resend import PooledResendClient, ResendPlatform
+
+    requests = []
+
+    def request(method, url, headers=None, json=None, files=None, data=None):
+        requests.append({"method": method, "url": url, "headers": headers, "json": json})
+        if any(m["to"] == "bad" for m in (json if isinstance(json, list) else [json])):
+            body = b'{"statusCode": 422, "name": "validation_error", "message": "Invalid to"}'
+            status = 422
+        elif url.endswith("/batch"):
+            body, status = b'{"data": [{"id": "msg-1"}]}', 200
+        else:
+            body, status = b'{"id": "msg-1"}', 200
+        return SimpleNamespace(content=body, status_code=status, headers={"content-type": "application/json"})
+
+    ResendPlatform()
+    assert isinstance(resend.default_http_client, PooledResendClient)
+    monkeypatch.setattr(resend.default_http_client.session, "request", request)
+    return requests
+
+
+def test_batch_send_passes_the_idempotency_key(sdk_requests):
+    params = [{"from": "blog@example.com", "to": "reader@example.com", "subject": "Post", "html": "<p>Post</p>"}]
+
+    response = resend.Batch.send(params, {"idempotency_key": "batch-key"})
+
+    assert response["data"][0]["id"] == "msg-1"
+    assert sdk_requests[0]["url"].endswith("/emails/batch")
+    assert sdk_requests[0]["headers"]["Idempotency-Key"] == "batch-key"
+
+
+def test_email_send_passes_the_idempotency_key(sdk_requests):
+    params = {"from": "blog@example.com", "to": "reader@example.com", "subject": "Post", "html": "<p>Post</p>"}
+
+    response = resend.Emails.send(params, {"idempotency_key": "email-key"})
+
+    assert response["id"] == "msg-1"
+    assert sdk_requests[0]["headers"]["Idempotency-Key"] == "email-key"
+
+
+def test_rejections_carry_their_status(sdk_requests):
+    params = [{"from": "blog@example.com", "to": "bad", "subject": "Post", "html": "<p>Post</p>"}]
+
+    with pytest.raises(resend.exceptions.ResendError) as error:
+        resend.Batch.send(params, {"idempotency_key": "batch-key"})
+
+    assert is_rejected(error.value)
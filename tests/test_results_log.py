@@ -0,0 +1,26 @@
+"""Tests for the JSONL log of posting results."""
+
+import json
+
+from posting.results_log import ResultsLog
+
+
+def test_compact_keeps_only_the_current_run(tmp_path):
+    log_path = tmp_path / "posting_results.jsonl"
+    folder = tmp_path / "page"
+    platform_folder = folder / "Twitter"
+    platform_folder.mkdir(parents=True)
+
+    earlier = ResultsLog(str(log_path), run_id="earlier")
+    earlier.append(folder, platform_folder, {"status": "error"})
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write('{"run_id": "killed", "fol')
+
+    log = ResultsLog(str(log_path), run_id="current")
+    log.append(folder, platform_folder, {"status": "success"})
+    results = log.compact(str(tmp_path / "posting_results.json"))
+
+    assert results == [{"status": "success"}]
+    assert json.loads((platform_folder / "posting_results.json").read_text()) == {"status": "success"}
+    assert [json.loads(line)["run_id"] for line in log_path.read_text().splitlines()] == ["current"]
+    assert earlier.read() == []
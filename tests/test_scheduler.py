@@ -0,0 +1,94 @@
+"""Tests for scheduled publishing."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from posting.outbox import Outbox
+from posting.scheduler import PublishScheduler
+
+CONFIG = {
+    "timezone": "UTC",
+    "platforms": {
+        "X": {
+            "min_gap_minutes": 60,
+            "windows": [{"days": [0, 1, 2, 3, 4], "start": "09:00", "end": "11:00"}],
+        },
+    },
+}
+
+# Monday 2024-01-01
+MONDAY_8AM = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc).timestamp()
+
+
+def at(day, hour, minute=0):
+    return datetime(2024, 1, day, hour, minute, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return PublishScheduler(db_path=tmp_path / "schedule.db", config=CONFIG)
+
+
+def test_posts_are_spaced_by_the_gap_inside_the_windows(scheduler):
+    times = [
+        scheduler.schedule(f"posts/page-{i}", ["X", "Reddit"], earliest=MONDAY_8AM)
+        for i in range(3)
+    ]
+
+    assert [t["X"] for t in times] == [at(1, 9), at(1, 10), at(2, 9)]
+    # Platforms without windows or a gap are due straight away
+    assert all(t["Reddit"] == MONDAY_8AM for t in times)
+
+
+def test_weekend_posts_wait_for_monday(scheduler):
+    saturday = datetime(2024, 1, 6, 12, 0, tzinfo=timezone.utc).timestamp()
+
+    assert scheduler.schedule("posts/page", ["X"], earliest=saturday)["X"] == at(8, 9)
+
+
+def test_scheduled_pairs_keep_their_time(scheduler):
+    first = scheduler.schedule("posts/page", ["X"], earliest=MONDAY_8AM)
+    again = scheduler.schedule("posts/page", ["X"], earliest=at(3, 10))
+
+    assert again == first
+    assert len(scheduler.upcoming()) == 1
+
+
+class FakePoster:
+    """Publishes by acknowledging publish jobs, except for failing platforms."""
+
+    def __init__(self, outbox, failing=()):
+        self.outbox = outbox
+        self.failing = set(failing)
+        self.results = []
+        self.published = []
+
+    def post_from_folder(self, folder, platforms):
+        for platform in platforms:
+            self.outbox.enqueue("publish", f"{folder}/{platform}", folder, {"platform": platform})
+        for job in self.outbox.lease("publish", folder, limit=len(platforms)):
+            if job["payload"]["platform"] in self.failing:
+                self.outbox.fail(job["id"], "outage")
+            else:
+                self.outbox.ack(job["id"])
+                self.published.append((folder, job["payload"]["platform"]))
+
+
+def test_drain_publishes_due_entries_and_keeps_failed_ones(scheduler, tmp_path):
+    for name in ("early", "late"):
+        (tmp_path / name).mkdir()
+    early, late = str(tmp_path / "early"), str(tmp_path / "late")
+    scheduler.schedule(early, ["X", "Reddit"], earliest=MONDAY_8AM)
+    scheduler.schedule(late, ["X"], earliest=MONDAY_8AM)
+    poster = FakePoster(Outbox(db_path=tmp_path / "outbox.db"), failing={"Reddit"})
+
+    scheduler.drain(poster, now=at(1, 9, 30))
+
+    assert sorted(poster.published) == [(early, "X")]
+    # The failed entry stays scheduled, the later one is not due yet
+    assert [(folder, platform) for _, folder, platform in scheduler.upcoming()] == [
+        (early, "Reddit"),
+        (late, "X"),
+    ]
+    assert scheduler.due(now=at(1, 9, 30)) == {early: ["Reddit"]}
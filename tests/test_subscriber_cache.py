@@ -0,0 +1,78 @@
+"""Tests for the local subscriber cache."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from fake_subscribers import FakeSubscriberManager as FakeManager, subscriber
+from posting.subscriber_cache import SubscriberCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    def make(manager):
+        return SubscriberCache(db_path=tmp_path / "subscribers.db", manager=manager)
+
+    return make
+
+
+def test_empty_table_syncs_incrementally(cache):
+    manager = FakeManager()
+    subscribers = cache(manager)
+
+    assert subscribers.sync()["full"] is True
+    manager.subscribers["sub-0001"] = subscriber(1, updated_at=datetime.now(timezone.utc).isoformat())
+
+    result = subscribers.sync()
+    assert result == {"upserted": 1, "deleted": 0, "full": False}
+    assert manager.downloads == 1
+    assert subscribers.active_emails(["sub-0001"]) == {"sub-0001": "reader1@example.com"}
+
+
+def test_full_sync_streams_active_subscribers_into_the_cache(cache):
+    manager = FakeManager([subscriber(i, active=i % 10 != 0) for i in range(2500)])
+    subscribers = cache(manager)
+    stale = FakeManager([subscriber(9999)])
+    cache(stale).sync()
+
+    downloaded = subscribers._download()
+    first = next(downloaded)
+    # The first page is in the cache before any subscriber is handed out
+    assert len(subscribers.active_emails([f"sub-{i:04}" for i in range(1, 1000)])) > 800
+    assert first["id"] == "sub-0001"
+
+    rest = list(downloaded)
+    assert len(rest) + 1 == 2250
+    # Subscribers the download did not see are dropped from the cache
+    assert subscribers.active_emails(["sub-9999", "sub-0010"]) == {}
+    assert len(subscribers.get_subscribers(active_only=False)) == 2250
+
+
+def test_stream_queues_from_the_first_page_of_an_empty_cache(cache):
+    manager = FakeManager([subscriber(i) for i in range(1500)])
+    subscribers = cache(manager)
+
+    stream = subscribers.stream(after_id="sub-0499")
+    assert next(stream)["id"] == "sub-0500"
+    assert not subscribers.synced()
+    assert len(list(stream)) == 999
+    # A partial download does not make the cache look complete, so
+    # subscribers before it are looked up in Supabase
+    assert subscribers.active_emails(["sub-0001", "sub-0600"]) == {
+        "sub-0001": "reader1@example.com",
+        "sub-0600": "reader600@example.com",
+    }
+    assert manager.lookups == [["sub-0001"]]
+
+
+def test_stream_reads_a_synced_cache_after_a_delta(cache):
+    manager = FakeManager([subscriber(i) for i in range(3)])
+    subscribers = cache(manager)
+    subscribers.sync()
+    del manager.subscribers["sub-0001"]
+    manager.tombstones.append({"id": "sub-0001", "deleted_at": datetime.now(timezone.utc).isoformat()})
+
+    assert [s["id"] for s in subscribers.stream()] == ["sub-0000", "sub-0002"]
+    assert manager.downloads == 1
+    assert subscribers.active_emails(["sub-0001"]) == {}
+    assert manager.lookups == []
@@ -0,0 +1,135 @@
+"""Tests for the native async X client."""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from urllib.parse import unquote, urlsplit
+
+import httpx
+import pytest
+from oauthlib.oauth1.rfc5849 import signature
+
+CREDENTIALS = {
+    "TWITTER_API_KEY": "consumer-key",
+    "TWITTER_API_SECRET": "consumer-secret",
+    "TWITTER_ACCESS_TOKEN": "access-token",
+    "TWITTER_ACCESS_SECRET": "access-secret",
+}
+
+
+@pytest.fixture
+def platform(monkeypatch):
+    for name, value in CREDENTIALS.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv("TWITTER_USERNAME", raising=False)
+    from posting.platforms.twitter import TwitterPlatform
+
+    return TwitterPlatform()
+
+
+def verify_oauth(request: httpx.Request):
+    """Check a request's OAuth 1.0a HMAC-SHA1 signature against the test credentials."""
+    authorization = request.headers["authorization"]
+    assert authorization.startswith("OAuth ")
+    params = signature.collect_parameters(
+        uri_query=urlsplit(str(request.url)).query,
+        headers={"Authorization": authorization},
+        exclude_oauth_signature=False,
+    )
+    oauth = dict(params)
+    assert oauth["oauth_consumer_key"] == CREDENTIALS["TWITTER_API_KEY"]
+    assert oauth["oauth_token"] == CREDENTIALS["TWITTER_ACCESS_TOKEN"]
+    assert oauth["oauth_signature_method"] == "HMAC-SHA1"
+
+    unsigned = [(k, v) for k, v in params if k != "oauth_signature"]
+    base_string = signature.signature_base_string(
+        request.method,
+        signature.base_string_uri(str(request.url)),
+        signature.normalize_parameters(unsigned),
+    )
+    expected = signature.sign_hmac_sha1_with_client(
+        base_string,
+        SimpleNamespace(
+            client_secret=CREDENTIALS["TWITTER_API_SECRET"],
+            resource_owner_secret=CREDENTIALS["TWITTER_ACCESS_SECRET"],
+        ),
+    )
+    assert unquote(oauth["oauth_signature"]) == expected
+
+
+def test_oauth_headers_sign_the_request(platform):
+    url = "https://api.twitter.com/2/users/me?user.fields=username"
+    request = httpx.Request("GET", url, headers=platform._oauth_headers("GET", url))
+    verify_oauth(request)
+
+
+def test_post_content_async_uploads_images_and_posts_tweet(
+    platform, mock_http, tmp_path
+):
+    media = tmp_path / "v1" / "media"
+    media.mkdir(parents=True)
+    for name in ("a.png", "b.jpg"):
+        (media / name).write_bytes(os.urandom(64))
+
+    requests = []
+    rate_limited = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        verify_oauth(request)
+        requests.append(request)
+        if request.url.path == "/1.1/media/upload.json":
+            return httpx.Response(200, json={"media_id_string": f"media-{len(requests)}"})
+        if request.url.path == "/2/tweets":
+            if not rate_limited:
+                rate_limited.append(request)
+                return httpx.Response(429, headers={"retry-after": "0"})
+            body = json.loads(request.content)
+            return httpx.Response(201, json={"data": {"id": "123", "text": body["text"]}})
+        if request.url.path == "/2/users/me":
+            return httpx.Response(200, json={"data": {"username": "blog"}})
+        return httpx.Response(404)
+
+    mock_http(handler)
+    result = asyncio.run(platform.post_content_async("hello", "page", str(tmp_path / "v1")))
+
+    assert result["status"] == "success", result.get("error")
+    assert result["url"] == "https://x.com/blog/status/123"
+    uploads = [r for r in requests if r.url.path == "/1.1/media/upload.json"]
+    assert len(uploads) == 2
+    tweet = json.loads([r for r in requests if r.url.path == "/2/tweets"][-1].content)
+    assert tweet["text"] == "hello"
+    assert len(tweet["media"]["media_ids"]) == 2
+    # The retried tweet is signed afresh
+    tweets = [r for r in requests if r.url.path == "/2/tweets"]
+    assert tweets[0].headers["authorization"] != tweets[1].headers["authorization"]
+
+
+def test_post_content_async_reports_rejected_tweet(platform, mock_http):
+    mock_http(lambda request: httpx.Response(403, json={"detail": "duplicate content"}))
+    result = asyncio.run(platform.post_content_async("hello", "page"))
+
+    assert result["status"] == "error"
+    assert "403" in result["error"]
+
+
+def test_concurrent_posts_look_up_the_username_once(platform):
+    lookups = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        lookups.append(request)
+        time.sleep(0.05)
+        return httpx.Response(200, json={"data": {"username": "blog"}})
+
+    async def lookup():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await platform.get_username_async(client)
+
+    # Each post runs its own event loop on a thread of the pool
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        usernames = list(executor.map(lambda _: asyncio.run(lookup()), range(4)))
+
+    assert usernames == ["blog"] * 4
+    assert len(lookups) == 1
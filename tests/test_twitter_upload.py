@@ -0,0 +1,102 @@
+"""Tests for the chunked X media uploader against a local fake endpoint."""
+
+import os
+
+import pytest
+
+from fake_x_upload import FakeXUpload
+
+CHUNK_SIZE = 64 * 1024
+
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    for name in ("TWITTER_API_KEY", "TWITTER_API_SECRET", "TWITTER_ACCESS_TOKEN", "TWITTER_ACCESS_SECRET"):
+        monkeypatch.setenv(name, name.lower())
+
+
+@pytest.fixture
+def fake():
+    with FakeXUpload() as fake:
+        yield fake
+
+
+@pytest.fixture
+def uploader(fake):
+    from posting.platforms.twitter_upload import ChunkedMediaUploader
+
+    return ChunkedMediaUploader(upload_url=fake.url, chunk_size=CHUNK_SIZE)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(os.urandom(CHUNK_SIZE * 5 + 123))
+    return path
+
+
+def test_upload_sends_every_segment_and_waits_for_processing(fake, uploader, video):
+    fake.processing = ["pending", "in_progress", "succeeded"]
+
+    media_id = uploader.upload(str(video))
+
+    assert fake.uploaded(media_id) == video.read_bytes()
+    assert fake.media[media_id]["media_category"] == "tweet_video"
+    assert fake.media[media_id]["media_type"] == "video/mp4"
+    statuses = [c for c in fake.commands if c["command"] == "STATUS"]
+    assert len(statuses) == 2
+    assert not list(uploader.state_dir.iterdir())
+
+
+def test_failed_append_resumes_with_missing_segments(fake, uploader, video):
+    from posting.platforms.twitter_upload import MediaUploadError
+
+    fake.fail_segments = {3}
+    with pytest.raises(MediaUploadError):
+        uploader.upload(str(video))
+    assert len(list(uploader.state_dir.iterdir())) == 1
+    fake.commands.clear()
+
+    media_id = uploader.upload(str(video))
+
+    assert fake.uploaded(media_id) == video.read_bytes()
+    assert [c["command"] for c in fake.commands] == ["APPEND", "FINALIZE"]
+    assert fake.commands[0]["segment_index"] == "3"
+    assert not list(uploader.state_dir.iterdir())
+
+
+@pytest.mark.parametrize("failure", ["finalize", "processing"])
+def test_failed_finalize_or_processing_starts_over(fake, uploader, video, failure):
+    from posting.platforms.twitter_upload import MediaUploadError
+
+    if failure == "finalize":
+        fake.finalize_status = 500
+    else:
+        fake.processing = ["in_progress", "failed"]
+    with pytest.raises(MediaUploadError):
+        uploader.upload(str(video))
+    assert not list(uploader.state_dir.iterdir())
+
+    fake.finalize_status = 200
+    fake.processing = []
+    media_id = uploader.upload(str(video))
+
+    assert [c["command"] for c in fake.commands].count("INIT") == 2
+    assert fake.uploaded(media_id) == video.read_bytes()
+
+
+def test_tweet_with_video_and_images_warns_about_dropped_media(
+    fake, video, tmp_path, monkeypatch, capsys
+):
+    monkeypatch.setenv("TWITTER_UPLOAD_URL", fake.url)
+    from posting.platforms.twitter import TwitterPlatform
+
+    image = tmp_path / "photo.png"
+    image.write_bytes(os.urandom(100))
+
+    media_ids = TwitterPlatform().upload_media([str(image), str(video)])
+
+    assert len(media_ids) == 1
+    assert fake.uploaded(media_ids[0]) == video.read_bytes()
+    output = capsys.readouterr().out
+    assert "WARNING" in output and str(image) in output